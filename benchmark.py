@@ -0,0 +1,152 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+from typing import List, Tuple
+import numpy as np
+import pandas as pd
+from src.attribute import Attribute, Attribute_Numerical
+from src.dataset import DataSet
+from src.decisionTree import DecisionTree
+
+
+def benchmark_fit(dataset: DataSet, engine: str, max_depth: int, workers: int, parallel_depth: int = 2) -> Tuple[float, DecisionTree]:
+    '''
+    Fits a decision tree with the given engine and number of worker processes.
+
+    Returns:
+    Tuple[float, DecisionTree]: The time the fit took in seconds and the fitted decision tree.
+    '''
+    decision_tree = DecisionTree(dataset, max_depth=max_depth, engine=engine)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        decision_tree.fit(workers=workers, parallel_depth=parallel_depth)
+    return time.perf_counter() - start, decision_tree
+
+
+def benchmark_materialized_fit(dataset: DataSet, max_depth: int) -> Tuple[float, int]:
+    '''
+    Fits a decision tree on the materialized constellations like the tree did before the engines: the constellations are expanded
+    into one dataframe, which pandas filters for every answer to every candidate attribute at every node. The splits are scored
+    and the split values picked like by the engines, but subtrees are not shared, so the tree only serves as the baseline.
+
+    Returns:
+    Tuple[float, int]: The time the fit took in seconds and the number of leaves of the tree.
+    '''
+    decision_tree = DecisionTree(dataset, max_depth=max_depth)
+    constellations = decision_tree.get_constellations()
+    start = time.perf_counter()
+
+    def reduce(dataframe: pd.DataFrame, attribute: Attribute, value) -> pd.DataFrame:
+        columns = [column for column in decision_tree._get_attribute_columns(attribute) if column in dataframe.columns]
+        mask = pd.Series(True, index=dataframe.index)
+        if isinstance(attribute, Attribute_Numerical):
+            if attribute.lower_column in columns:
+                mask &= dataframe[attribute.lower_column].isna() | (dataframe[attribute.lower_column] <= value)
+            if attribute.upper_column in columns:
+                mask &= dataframe[attribute.upper_column].isna() | (dataframe[attribute.upper_column] >= value)
+        else:
+            bitmasks = dataframe[attribute.title]
+            bit = attribute.get_bitmask([value])
+            mask &= bitmasks.isna() | (bitmasks.fillna(0).astype('int64') & bit != 0)
+        return dataframe[mask].drop(columns=columns).dropna(axis='columns', how='all')
+
+    def split(dataframe: pd.DataFrame, attribute: Attribute) -> List[pd.DataFrame]:
+        if isinstance(attribute, Attribute_Numerical):
+            bounds = decision_tree._get_elementary_bounds(constellations, attribute)
+            lower_codes, upper_codes = (np.searchsorted(bounds, dataframe[column].dropna().unique()) if column in dataframe.columns else np.array([], dtype=np.int64)
+                                        for column in (attribute.lower_column, attribute.upper_column))
+            values = decision_tree._get_interval_values(lower_codes, upper_codes, decision_tree._get_piece_values(constellations, attribute), attribute)
+        else:
+            values = attribute.answer_options
+        return [reduce(dataframe, attribute, value) for value in values]
+
+    # the attributes in the order of their columns, as ties go to the first of them
+    attribute_of_column = {column: attribute for attribute in dataset.attribute_list for column in decision_tree._get_attribute_columns(attribute)}
+
+    def get_attributes(dataframe: pd.DataFrame) -> List[Attribute]:
+        return list(dict.fromkeys(attribute_of_column[column] for column in dataframe.columns if column in attribute_of_column))
+
+    leaf_count = 0
+    dataframes = [(dataset.get_dataframes(), 1)]
+    while dataframes:
+        dataframe, depth = dataframes.pop()
+        attributes = get_attributes(dataframe)
+        if (max_depth is not None and depth >= max_depth) or len(dataframe) == 0 or len(attributes) == 0:
+            leaf_count += 1
+            continue
+        splits = {attribute.title: split(dataframe, attribute) for attribute in attributes}
+        best_title = min(splits, key=lambda title: sum(len(get_attributes(reduced)) for reduced in splits[title]) / len(splits[title]))
+        dataframes.extend((reduced, depth + 1) for reduced in splits[best_title])
+    return time.perf_counter() - start, leaf_count
+
+
+def benchmark_scaling(dataset: DataSet, engine: str, max_depth: int, workers: int, parallel_depth: int, repeat: int) -> Tuple[float, float]:
+    '''
+    Fits a decision tree in this process and with a pool of worker processes, see DecisionTree.fit.
+
+    Returns:
+    Tuple[float, float]: The fastest serial and the fastest parallel fit in seconds.
+    '''
+    serial_time = min(benchmark_fit(dataset, engine, max_depth, None)[0] for _ in range(repeat))
+    parallel_time = min(benchmark_fit(dataset, engine, max_depth, workers, parallel_depth)[0] for _ in range(repeat))
+    return serial_time, parallel_time
+
+
+def benchmark_dialogues(decision_tree: DecisionTree, dialogue_count: int) -> float:
+    '''
+    Runs dialogues with random answers like CLI.start_dialogue, see DecisionTree.walk.
+    The numerical answers are drawn from the bounds of the attribute and the midpoints between them, so they hit every piece.
+
+    Returns:
+    float: The time the dialogues took in seconds.
+    '''
+    random_generator = random.Random(0)
+    constellations = decision_tree.get_constellations()
+    numerical_answers = {}
+    for attribute in decision_tree.dataset.attribute_list:
+        if isinstance(attribute, Attribute_Numerical):
+            bounds = decision_tree._get_elementary_bounds(constellations, attribute)
+            numerical_answers[attribute.title] = list(bounds) + list((bounds[1:] + bounds[:-1]) / 2)
+
+    def get_answer(attribute):
+        if isinstance(attribute, Attribute_Numerical):
+            return random_generator.choice(numerical_answers[attribute.title])
+        return random_generator.choice(attribute.answer_options)
+
+    start = time.perf_counter()
+    for _ in range(dialogue_count):
+        decision_tree.walk(get_answer)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Compares the engines of the decision tree on the default data.')
+    parser.add_argument('--max-depth', type=int, default=None, help='The maximum depth of the fitted trees.')
+    parser.add_argument('--repeat', type=int, default=3, help='How often every measurement is repeated, the fastest run is reported.')
+    parser.add_argument('--workers', type=int, default=None, help='The number of processes fitting the trees.')
+    parser.add_argument('--parallel-depth', type=int, default=2, help='The number of levels fitted before the subtrees are handed to the processes.')
+    parser.add_argument('--scaling', action='store_true', help='Compare the fit in this process with the fit by --workers processes instead of the engines.')
+    parser.add_argument('--dialogues', type=int, default=20, help='The number of dialogues per measurement.')
+    parser.add_argument('--materialized', action='store_true', help='Also fit on the materialized constellations with pandas as a baseline, which is slow without --max-depth.')
+    arguments = parser.parse_args()
+
+    dataset = DataSet()
+    if arguments.scaling:
+        workers = arguments.workers if arguments.workers is not None else os.cpu_count()
+        print(f"{os.cpu_count()} CPUs, {workers} workers, parallel depth {arguments.parallel_depth}")
+        for engine in DecisionTree.engines:
+            serial_time, parallel_time = benchmark_scaling(dataset, engine, arguments.max_depth, workers, arguments.parallel_depth, arguments.repeat)
+            print(f"{engine:>8}: serial fit {serial_time:.3f}s, parallel fit {parallel_time:.3f}s, speed-up {serial_time / parallel_time:.2f}x")
+    else:
+        if arguments.materialized:
+            fit_time, leaf_count = min(benchmark_materialized_fit(dataset, arguments.max_depth) for _ in range(arguments.repeat))
+            print(f"{'pandas':>8}: fit {fit_time:.3f}s, {leaf_count} leaves without shared subtrees")
+        for engine in DecisionTree.engines:
+            fits = [benchmark_fit(dataset, engine, arguments.max_depth, arguments.workers, arguments.parallel_depth) for _ in range(arguments.repeat)]
+            fit_time = min(fit_time for fit_time, _ in fits)
+            dialogue_time = min(benchmark_dialogues(fits[-1][1], arguments.dialogues) for _ in range(arguments.repeat))
+            print(f"{engine:>8}: fit {fit_time:.3f}s, {arguments.dialogues} dialogues {dialogue_time:.3f}s")
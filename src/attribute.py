@@ -1,4 +1,6 @@
 from typing import List
+import numpy as np
+import pandas as pd
 
 class Attribute:
     """
@@ -20,7 +22,14 @@ class Attribute:
 class Attribute_Categorical(Attribute):
     """
     A subclass of Attribute for attributes that have categorical answers.
+
+    In a constellation dataframe a categorical attribute is carried by one int64 column holding a bitmask of the
+    accepted answer options, where bit i stands for answer_options[i]. A table without the column has no constraint on
+    the attribute, where such tables are concatenated with others the column turns float and NaN means no constraint.
+    The bitmask of every answer option has to fit into the signed int64 column, so an attribute has at most max_answer_options answer options.
     """
+
+    max_answer_options = 63
     
     def __init__(self, title: str,question:str, answer_options: List[str]):
         """
@@ -29,12 +38,54 @@ class Attribute_Categorical(Attribute):
         Parameters:
         - title (str): The title of the categorical attribute.
         - question (str): The question related to the categorical attribute.
-        - answer_options (List[str]): A list of strings representing the answer options for the categorical attribute.
+        - answer_options (List[str]): A list of strings representing the answer options for the categorical attribute, at most max_answer_options.
         """
 
         super().__init__(title,question)
         self.answer_options = answer_options
 
+    @property
+    def answer_options(self) -> List[str]:
+        """
+        The answer options of the attribute, bit i of the bitmasks stands for answer_options[i].
+        Setting more than max_answer_options answer options raises a ValueError and keeps the previous ones.
+        """
+        return self._answer_options
+
+    @answer_options.setter
+    def answer_options(self, answer_options: List[str]) -> None:
+        if len(answer_options) > self.max_answer_options:
+            raise ValueError(f"The attribute '{self.title}' has {len(answer_options)} answer options, but at most {self.max_answer_options} fit into its bitmasks.")
+        self._answer_options = answer_options
+
+    def get_bitmask(self, answers: List[str]) -> int:
+        """
+        Returns the bitmask of the given answers, answers that are not an answer option are ignored.
+
+        Parameters:
+        - answers (List[str]): The answers to encode.
+
+        Returns:
+        int: The bitmask with the bits of the indices of the answers in answer_options set.
+        """
+        bitmask = 0
+        for index, answer_option in enumerate(self.answer_options):
+            if answer_option in answers:
+                bitmask |= 1 << index
+        return bitmask
+
+    def encode_answers(self, answers) -> np.ndarray:
+        """
+        Encodes the answers of many applicants at once as the indices of the answers in answer_options.
+
+        Parameters:
+        - answers (array-like): The answers, one per applicant.
+
+        Returns:
+        np.ndarray: The integer index per answer, -1 for missing answers and answers that are not an answer option.
+        """
+        return pd.Categorical(np.asarray(answers, dtype=object), categories=self.answer_options).codes.astype(np.int64)
+
 
     def export(self) -> dict:
         """
@@ -53,7 +104,18 @@ class Attribute_Categorical(Attribute):
 class Attribute_Numerical(Attribute):
     """
     A subclass of Attribute for attributes that are numerical.
+
+    In a constellation dataframe a numerical attribute is carried by two float columns holding the
+    lower and the upper bound of the required interval, NaN meaning that there is no constraint.
     """
+
+    lower_suffix = '_lower'
+    upper_suffix = '_upper'
+
+    # the range of new attributes and of attributes loaded without one
+    default_min = 0
+    default_max = 100000
+
     def __init__(self, title: str, question:str, min, max):
         """
         Initializes the Attribute_Numerical object with a title and question.
@@ -68,6 +130,32 @@ class Attribute_Numerical(Attribute):
         self.min = min
         self.max = max
 
+    @property
+    def lower_column(self) -> str:
+        """
+        Returns the name of the dataframe column holding the lower bounds for this attribute.
+        """
+        return f'{self.title}{self.lower_suffix}'
+
+    @property
+    def upper_column(self) -> str:
+        """
+        Returns the name of the dataframe column holding the upper bounds for this attribute.
+        """
+        return f'{self.title}{self.upper_suffix}'
+
+    def encode_answers(self, answers) -> np.ndarray:
+        """
+        Encodes the answers of many applicants at once as floats.
+
+        Parameters:
+        - answers (array-like): The answers, one per applicant.
+
+        Returns:
+        np.ndarray: The answer per applicant, NaN for missing answers and answers that are not a number.
+        """
+        return pd.to_numeric(pd.Series(answers), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
     def export(self) -> dict:
 
         """
@@ -1,5 +1,5 @@
 import inquirer
-from typing import List
+from typing import List, Optional
 from src.attribute import Attribute, Attribute_Categorical, Attribute_Numerical
 from src.requirement import Requirement,Requirement_Logical, Logical_AND, Logical_OR, Requirement_Categorical, Requirement_Numerical
 from src.socialBenefit import SocialBenefit
@@ -11,23 +11,34 @@ from src.decisionTree import DecisionTree
 
 class CLI:
 
-    def __init__(self,dataset:DataSet):
+    def __init__(self,dataset:DataSet,engine:str = 'view',split_workers:Optional[int] = None):
         """
         Initializes the CLI object with a dataset.
 
         Parameters:
         - dataset (DataSet): The dataset object to be used for the CLI.
+        - engine (str): The engine the decision tree tracks the remaining constellations with, 'view' or 'bitset'.
+        - split_workers (Optional[int]): The number of threads scoring the candidate questions of the dialogue concurrently, None to score them one after another.
         """
 
         self.dataset = dataset
+        self.engine = engine
+        self.split_workers = split_workers
+        # the tree fitted on the dataset, patched when social benefits are edited and reset when attributes are edited
+        self.decision_tree = None
 
     def run(self):
 
         """
         Runs the CLI application. Starts the main menu.
+
+        Every menu returns the menu to open next instead of opening it itself, so a long session doesn't pile up the frames of all visited menus.
         """
 
-        self.open_main_menu()
+        menu = (self.open_main_menu,())
+        while menu is not None:
+            selected_function,parameters = menu
+            menu = selected_function(*parameters)
 
 
     # Basic User Input
@@ -138,10 +149,10 @@ class CLI:
 
         Parameters:
         - message (str): The message to display to the user.
-        - choices (List[Tuple[str,Callable]]): A list of choices for the user to choose from.
+        - choices (List[Tuple[str,Tuple[Callable,tuple]]]): A list of choices for the user to choose from, each with a function and its parameters.
 
         Returns:
-        The user's choice.
+        The user's choice, i.e. the function and parameters of the chosen menu.
         """
         questions = [
             inquirer.List('choice',
@@ -171,23 +182,21 @@ class CLI:
         The user can select an option by typing the corresponding number and pressing enter.
 
         Returns:
-        None        
+        The menu to open next, as a function with its parameters, None to exit.
         '''
 
         message = "🏡 Main Menu"
 
         choices = [
-            ("Start Dialogue", self.start_dialogue),
-            ("Calculate Decision Tree", self.calculate_decision_tree),
-            ("Edit Attributes", self.show_attributes_in_navigation),
-            ("Edit Social Benefits", self.show_social_benefits_in_navigation),
-            ("Export Data", self.export_data),
-            ("<Exit>", exit)
+            ("Start Dialogue", (self.start_dialogue,())),
+            ("Calculate Decision Tree", (self.calculate_decision_tree,())),
+            ("Edit Attributes", (self.show_attributes_in_navigation,())),
+            ("Edit Social Benefits", (self.show_social_benefits_in_navigation,())),
+            ("Export Data", (self.export_data,())),
+            ("<Exit>", None)
         ]
 
-        chosen_answer = self.get_user_input_menu_navigation(message=message,choices=choices)
-
-        chosen_answer()
+        return self.get_user_input_menu_navigation(message=message,choices=choices)
 
     def calculate_decision_tree(self):
         '''
@@ -196,10 +205,9 @@ class CLI:
         '''
 
         print("Calculating decision tree...")
-        decision_tree = DecisionTree(self.dataset)
-        decision_tree.fit()
+        self.fit_decision_tree(refit=True)
         time.sleep(1)
-        self.open_main_menu()
+        return (self.open_main_menu,())
 
     def export_data(self):
         '''
@@ -208,7 +216,7 @@ class CLI:
         '''
         self.dataset.export()
         time.sleep(1)
-        self.open_main_menu()
+        return (self.open_main_menu,())
         
     def show_social_benefits_in_navigation(self):
 
@@ -223,7 +231,7 @@ class CLI:
         The user can select an option by typing the corresponding number and pressing enter.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         
         '''
 
@@ -236,26 +244,24 @@ class CLI:
         choices += [("<Add Social Benefit>", (self.add_social_benefit,()))]
         choices += [("<Back>", (self.open_main_menu,()))]
 
-        chosen_answer = self.get_user_input_menu_navigation(message,choices)
-
-        selected_function, parameters = chosen_answer
-        selected_function(*parameters)
+        return self.get_user_input_menu_navigation(message,choices)
         
     def add_social_benefit(self):
         '''
         Adds a new social benefit to the dataset and opens the menu for editing the social benefit afterwards. 
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         
         '''
             
         new_social_benefit = SocialBenefit(name="New_Social_Benefit",requirement=Logical_AND(requirements=[]))
         self.dataset.add_social_benefit(new_social_benefit)
+        self.update_decision_tree(added_social_benefit=new_social_benefit)
 
         print(f"New social benefit '{new_social_benefit.name}' added.")
 
-        self.edit_social_benefit(new_social_benefit)
+        return (self.edit_social_benefit,(new_social_benefit,))
 
     # Menu for editing social benefits
             
@@ -273,7 +279,7 @@ class CLI:
         The user can select an option by typing the corresponding number and pressing enter.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         
         '''
                 
@@ -286,10 +292,7 @@ class CLI:
             ("<Back>", (self.show_social_benefits_in_navigation,()))
         ]
 
-        chosen_answer = self.get_user_input_menu_navigation(message,choices)
-
-        selected_function,parameters = chosen_answer
-        selected_function(*parameters)
+        return self.get_user_input_menu_navigation(message,choices)
 
     def delete_social_benefit(self,social_benefit:SocialBenefit):
 
@@ -300,16 +303,17 @@ class CLI:
         - social_benefit (SocialBenefit): The social benefit to be removed.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
         confirmation = self.get_user_input_confirm("Are you sure you want to remove this social benefit?")
         if confirmation:
             self.dataset.remove_social_benefit(social_benefit)
+            self.update_decision_tree(removed_social_benefit=social_benefit)
             time.sleep(1)
-            self.show_social_benefits_in_navigation()
+            return (self.show_social_benefits_in_navigation,())
         else:
             print(f"Social benefit '{social_benefit.name}' not removed.")
-            self.edit_social_benefit(social_benefit)
+            return (self.edit_social_benefit,(social_benefit,))
 
     # Menu for editing social benefit-name
                 
@@ -322,13 +326,14 @@ class CLI:
         - social_benefit (SocialBenefit): The social benefit to be edited.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         new_name = self.get_user_input_text(question=f"Enter a new name for the social benefit '{social_benefit.name}'")
-        social_benefit.name = new_name
+        self.dataset.rename_social_benefit(social_benefit,new_name)
+        self.save_decision_tree()
 
-        self.edit_social_benefit(social_benefit)
+        return (self.edit_social_benefit,(social_benefit,))
 
     # Menu for editing social benefit-requirement-tree
         
@@ -341,7 +346,7 @@ class CLI:
         - social_benefit (SocialBenefit): The social benefit to be edited.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         def calculate_requirement_tree(requirement, list,level=0, prefix="    "):
@@ -379,10 +384,7 @@ class CLI:
             ("<Back>", (self.edit_social_benefit,(social_benefit,)))
         ]
 
-        chosen_answer = self.get_user_input_menu_navigation(message,choices)
-        
-        selected_function,parameters = chosen_answer
-        selected_function(*parameters)
+        return self.get_user_input_menu_navigation(message,choices)
 
     # Logic for menu for editing requirements
         
@@ -396,17 +398,17 @@ class CLI:
         - social_benefit (SocialBenefit): The social benefit to which the requirement belongs.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         if isinstance(requirement,Requirement_Logical):
-            self.edit_requirement_logical(requirement=requirement,social_benefit=social_benefit)
+            return (self.edit_requirement_logical,(requirement,social_benefit))
         elif isinstance(requirement,Requirement_Categorical):
-            self.edit_requirement_categorical(requirement=requirement,social_benefit=social_benefit)
+            return (self.edit_requirement_categorical,(requirement,social_benefit))
         elif isinstance(requirement,Requirement_Numerical):
-            self.edit_requirement_numerical(requirement=requirement,social_benefit=social_benefit)
+            return (self.edit_requirement_numerical,(requirement,social_benefit))
         else:
-            self.edit_social_benefit_requirement(social_benefit=social_benefit)
+            return (self.edit_social_benefit_requirement,(social_benefit,))
 
     # Menu for editing logical requirements
     
@@ -420,7 +422,7 @@ class CLI:
         - social_benefit (SocialBenefit): The social benefit to which the requirement belongs.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
             
@@ -436,10 +438,7 @@ class CLI:
             ("<Back>", (self.edit_social_benefit_requirement,(social_benefit,)))
         ]
 
-        chosen_answer = self.get_user_input_menu_navigation(message,choices)
-
-        selected_function,parameters = chosen_answer
-        selected_function(*parameters)
+        return self.get_user_input_menu_navigation(message,choices)
 
     def add_requirement_and(self,requirement:Requirement_Logical,social_benefit:SocialBenefit):
 
@@ -451,14 +450,15 @@ class CLI:
         - social_benefit (SocialBenefit): The social benefit to which the requirement belongs.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         new_logical_requirement = Logical_AND(requirements=[])
 
         requirement.add_requirement(new_logical_requirement)
+        self.update_decision_tree(edited_social_benefit=social_benefit)
 
-        self.edit_social_benefit_requirement(social_benefit=social_benefit)
+        return (self.edit_social_benefit_requirement,(social_benefit,))
 
     def add_requirement_or(self,requirement:Requirement_Logical,social_benefit:SocialBenefit):
 
@@ -470,14 +470,15 @@ class CLI:
         - social_benefit (SocialBenefit): The social benefit to which the requirement belongs.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         new_logical_requirement = Logical_OR(requirements=[])
 
         requirement.add_requirement(new_logical_requirement)
+        self.update_decision_tree(edited_social_benefit=social_benefit)
 
-        self.edit_social_benefit_requirement(social_benefit=social_benefit)
+        return (self.edit_social_benefit_requirement,(social_benefit,))
 
     # Menu for editing concrete requirements
 
@@ -491,7 +492,7 @@ class CLI:
         - social_benefit (SocialBenefit): The social benefit to which the requirement belongs.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         def add_requirement_concrete_attribute(requirement:Requirement,social_benefit:SocialBenefit,attribute:Attribute):
@@ -505,18 +506,18 @@ class CLI:
             - attribute (Attribute): The attribute to be used for the new requirement.
 
             Returns:
-            None
+            The menu to open next, as a function with its parameters.
             '''
 
             if isinstance(attribute,Attribute_Categorical):
                 new_requirement = Requirement_Categorical(attribute=attribute,required_value=[attribute.answer_options[0]])
             else:
-                new_requirement = Requirement_Numerical(attribute=attribute,comparison_operator='==',required_value=0)
+                new_requirement = Requirement_Numerical(attribute=attribute,comparison_operator='==',required_value=[0])
 
             requirement.add_requirement(new_requirement)
-            new_requirement.parent = requirement
+            self.update_decision_tree(edited_social_benefit=social_benefit)
 
-            self.edit_requirement(new_requirement,social_benefit)
+            return (self.edit_requirement,(new_requirement,social_benefit))
         
         message = f"Add concrete requirement to '{requirement.get_tree_string()}'"
 
@@ -529,10 +530,7 @@ class CLI:
 
         choices += [("<Back>", (self.edit_social_benefit_requirement,(social_benefit,)))]
 
-        chosen_answer = self.get_user_input_menu_navigation(message,choices)
-
-        selected_function,parameters = chosen_answer
-        selected_function(*parameters)
+        return self.get_user_input_menu_navigation(message,choices)
 
     # Confirmation for removing requirements
 
@@ -546,18 +544,20 @@ class CLI:
         - social_benefit (SocialBenefit): The social benefit to which the requirement belongs.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         confirmation = self.get_user_input_confirm("Are you sure you want to remove this requirement?")
         if confirmation:
             if requirement.parent is not None:
                 requirement.parent.remove_requirement(requirement)
+                self.update_decision_tree(edited_social_benefit=social_benefit)
             else:
                 social_benefit.remove_requirement(requirement)
+                self.update_decision_tree(edited_social_benefit=social_benefit)
 
         
-        self.edit_social_benefit_requirement(social_benefit=social_benefit)
+        return (self.edit_social_benefit_requirement,(social_benefit,))
 
     def edit_requirement_categorical(self,requirement:Requirement_Categorical,social_benefit:SocialBenefit):
 
@@ -569,7 +569,7 @@ class CLI:
         - social_benefit (SocialBenefit): The social benefit to which the requirement belongs.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         message = f"Edit categorical requirement '{requirement.attribute.title}' in {requirement.required_value}'"
@@ -580,10 +580,7 @@ class CLI:
             ("<Back>", (self.edit_social_benefit_requirement,(social_benefit,)))
         ]
 
-        chosen_answer = self.get_user_input_menu_navigation(message=message,choices=choices)
-
-        selected_function,parameters = chosen_answer
-        selected_function(*parameters)
+        return self.get_user_input_menu_navigation(message=message,choices=choices)
 
     def edit_requirement_categorical_required_value(self,requirement:Requirement_Categorical,social_benefit:SocialBenefit):
 
@@ -595,7 +592,7 @@ class CLI:
         - social_benefit (SocialBenefit): The social benefit to which the requirement belongs.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         message = f"Edit required value(s) for attribute '{requirement.attribute.title}' (select with spacebar, confirm with enter)"
@@ -605,8 +602,10 @@ class CLI:
         chosen_answers = self.get_user_input_checkbox(message,choices)
 
         requirement.required_value = chosen_answers
+        requirement.invalidate()
+        self.update_decision_tree(edited_social_benefit=social_benefit)
 
-        self.edit_requirement_categorical(requirement=requirement,social_benefit=social_benefit)
+        return (self.edit_requirement_categorical,(requirement,social_benefit))
 
 
     # Menu for editing numerical requirements
@@ -621,7 +620,7 @@ class CLI:
         - social_benefit (SocialBenefit): The social benefit to which the requirement belongs.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         def edit_comparison_operator(requirement:Requirement_Numerical,social_benefit:SocialBenefit):
@@ -635,7 +634,7 @@ class CLI:
             - social_benefit (SocialBenefit): The social benefit to which the requirement belongs.
 
             Returns:
-            None
+            The menu to open next, as a function with its parameters.
 
             '''
 
@@ -643,12 +642,11 @@ class CLI:
 
             choices = [(operator,(requirement.set_comparison_operator,(operator,))) for operator in Requirement_Numerical.comparison_operators]
 
-            chosen_answer = self.get_user_input_menu_navigation(message=message,choices=choices)
-
-            selected_function,parameters = chosen_answer
+            selected_function,parameters = self.get_user_input_menu_navigation(message=message,choices=choices)
             selected_function(*parameters)
+            self.update_decision_tree(edited_social_benefit=social_benefit)
 
-            self.edit_requirement_numerical(requirement=requirement,social_benefit=social_benefit)
+            return (self.edit_requirement_numerical,(requirement,social_benefit))
 
         def edit_requirement_numerical_required_value(requirement:Requirement_Numerical,social_benefit:SocialBenefit):
 
@@ -660,7 +658,7 @@ class CLI:
             - social_benefit (SocialBenefit): The social benefit to which the requirement belongs.
 
             Returns:
-            None
+            The menu to open next, as a function with its parameters.
             '''
 
             # in case of a range the who numbers are entered at once, separated by a comma
@@ -677,8 +675,10 @@ class CLI:
                 print("Required value not changed.")
             else:
                 requirement.required_value = new_required_value
+                requirement.invalidate()
+                self.update_decision_tree(edited_social_benefit=social_benefit)
 
-            self.edit_requirement_numerical(requirement=requirement,social_benefit=social_benefit)
+            return (self.edit_requirement_numerical,(requirement,social_benefit))
             
         message = f"Edit numerical requirement '{requirement.attribute.title} {requirement.comparison_operator} {requirement.required_value}'"
 
@@ -689,10 +689,7 @@ class CLI:
             ("<Back>", (self.edit_social_benefit_requirement,(social_benefit,)))
         ]
 
-        chosen_answer = self.get_user_input_menu_navigation(message=message,choices=choices)
-
-        selected_function,parameters = chosen_answer
-        selected_function(*parameters)
+        return self.get_user_input_menu_navigation(message=message,choices=choices)
 
     # Menu for selection of attributes
         
@@ -709,7 +706,7 @@ class CLI:
         The user can select an option by typing the corresponding number and pressing enter.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
  
         message = "Attributes"
@@ -722,10 +719,7 @@ class CLI:
 
         choices += [("<Back>", (self.open_main_menu,()))]
 
-        chosen_answer = self.get_user_input_menu_navigation(message,choices)
-
-        selected_function,parameters = chosen_answer
-        selected_function(*parameters)
+        return self.get_user_input_menu_navigation(message,choices)
 
     # Menu for editing attributes
             
@@ -738,7 +732,7 @@ class CLI:
         - attribute (Attribute): The attribute to be edited.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
             
@@ -755,10 +749,7 @@ class CLI:
         if isinstance(attribute,Attribute_Categorical):
             choices.insert(2,(f"Edit possible answers: '{attribute.answer_options}'", (self.edit_attribute_answer_options,(attribute,))))
 
-        chosen_answer = self.get_user_input_menu_navigation(message,choices)
-
-        selected_function,parameters = chosen_answer
-        selected_function(*parameters)
+        return self.get_user_input_menu_navigation(message,choices)
 
     # Menu for editing attribute-title
             
@@ -771,7 +762,7 @@ class CLI:
         - attribute (Attribute): The attribute to be edited.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         new_title = self.get_user_input_text(question=f"Enter a new title for the attribute '{attribute.title}'")
@@ -781,10 +772,11 @@ class CLI:
         elif self.dataset.check_attribute_title(new_title):
             print("Title already exists.")
         else:
-            attribute.title = new_title
+            self.dataset.rename_attribute(attribute,new_title)
+            self.decision_tree = None
             print(f"Title changed to '{attribute.title}'.")
 
-        self.edit_attribute(attribute)
+        return (self.edit_attribute,(attribute,))
 
     # Menu for editing attribute-question
         
@@ -797,13 +789,14 @@ class CLI:
         - attribute (Attribute): The attribute to be edited.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         new_question = self.get_user_input_text(question=f"Enter a new question for the attribute '{attribute.question}'")
         attribute.question = new_question
+        self.save_decision_tree()
 
-        self.edit_attribute(attribute)
+        return (self.edit_attribute,(attribute,))
 
     # Menu for editing attribute-answer-options
         
@@ -815,13 +808,20 @@ class CLI:
         - attribute (Attribute_Categorical): The categorical attribute to be edited.
 
         Returns:
+        The menu to open next, as a function with its parameters.
         '''
 
         if isinstance(attribute,Attribute_Categorical):
             new_answer_options = self.get_user_input_text(question=f"Enter new answer options for the attribute, separated by a comma (,) '{attribute.title}'").split(',')
-            attribute.answer_options = new_answer_options
+            try:
+                attribute.answer_options = new_answer_options
+            except ValueError as error:
+                print(f"{error} Answer options not changed.")
+                return (self.edit_attribute,(attribute,))
+            self.dataset.invalidate_attribute(attribute)
+            self.decision_tree = None
 
-        self.edit_attribute(attribute)
+        return (self.edit_attribute,(attribute,))
 
     # Menu for adding new attributes
     
@@ -831,19 +831,20 @@ class CLI:
         Opens the menu for adding a new attribute.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
         def add_attribute_numerical():
             '''
             Adds a new numerical attribute to the dataset and opens the menu for editing the new attribute.
             '''
-            new_attribute = Attribute_Numerical(title="New_Attribute_Numerical",question="New Question",min=0,max=100000)
+            new_attribute = Attribute_Numerical(title="New_Attribute_Numerical",question="New Question",min=Attribute_Numerical.default_min,max=Attribute_Numerical.default_max)
             self.dataset.add_attribute(new_attribute)
+            self.decision_tree = None
 
             print(f"New attribute '{new_attribute.title}' added.")
 
-            self.edit_attribute(new_attribute)
+            return (self.edit_attribute,(new_attribute,))
         
         def add_attribute_categorical():
             '''
@@ -851,10 +852,11 @@ class CLI:
             '''
             new_attribute = Attribute_Categorical(title="New_Attribute_Categorical",question="New Question",answer_options=["Option1","Option2"])
             self.dataset.add_attribute(new_attribute)
+            self.decision_tree = None
 
             print(f"New attribute '{new_attribute.title}' added.")
 
-            self.edit_attribute(new_attribute)
+            return (self.edit_attribute,(new_attribute,))
 
 
         message = "What kind of attribute do you want to add?"
@@ -864,10 +866,7 @@ class CLI:
             ("<Back>", (self.show_attributes_in_navigation,()))
         ]
 
-        chosen_answer = self.get_user_input_menu_navigation(message,choices)
-
-        selected_function,parameters = chosen_answer
-        selected_function(*parameters)
+        return self.get_user_input_menu_navigation(message,choices)
 
     def remove_attribute(self,attribute:Attribute):
 
@@ -878,60 +877,137 @@ class CLI:
         - attribute (Attribute): The attribute to be removed.
 
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
         
         confirmation = self.get_user_input_confirm("Are you sure you want to remove this attribute? (This will also remove all requirements that use this attribute.)")
         if confirmation:
-            self.dataset.remove_attribute(attribute)
+            changed_social_benefits = self.dataset.remove_attribute(attribute)
+            if self.decision_tree is not None:
+                self.decision_tree.remove_attribute(attribute,changed_social_benefits)
+                self.save_decision_tree()
             time.sleep(1)
-            self.show_attributes_in_navigation()
+            return (self.show_attributes_in_navigation,())
         else:
             print(f"Attribute '{attribute.title}' not removed.")
-            self.edit_attribute(attribute)
+            return (self.edit_attribute,(attribute,))
 
         
+    def update_decision_tree(self,added_social_benefit:SocialBenefit = None,removed_social_benefit:SocialBenefit = None,edited_social_benefit:SocialBenefit = None):
+        '''
+        Patches the fitted decision tree after a social benefit was added, removed or edited, instead of fitting it again,
+        and saves it to the model file, which then matches the edited dataset, so the patched tree is loaded instead of fitted once the dataset is exported and loaded again.
+        Renaming a social benefit needs no patch, the leaves of the tree refer to social benefits by their ids.
+
+        Parameters:
+        - added_social_benefit (SocialBenefit): A social benefit added to the dataset.
+        - removed_social_benefit (SocialBenefit): A social benefit removed from the dataset.
+        - edited_social_benefit (SocialBenefit): A social benefit whose requirements were edited.
+
+        Returns:
+        None
+        '''
+
+        if self.decision_tree is None:
+            return
+        if added_social_benefit is not None:
+            self.decision_tree.add_social_benefit(added_social_benefit)
+        if removed_social_benefit is not None:
+            self.decision_tree.remove_social_benefit(removed_social_benefit)
+        if edited_social_benefit is not None:
+            self.decision_tree.update_social_benefit(edited_social_benefit)
+        self.save_decision_tree()
+
+    def save_decision_tree(self):
+        '''
+        Saves the fitted decision tree to the model file after the dataset was edited, so the hash of the file matches the dataset again.
+        Edits that don't change the tree, like a new name or question, only need the tree to be saved.
+
+        Returns:
+        None
+        '''
+
+        if self.decision_tree is not None:
+            self.decision_tree.save()
+
+    def fit_decision_tree(self,refit:bool = False) -> DecisionTree:
+        '''
+        Fits the decision tree on the current dataset and keeps it for the dialogue.
+
+        The tree is loaded from the model file instead if that was fitted on the current dataset. A fitted tree is saved to the model file.
+
+        Parameters:
+        - refit (bool): If True, the tree is fitted even if the model file matches the dataset.
+
+        Returns:
+        DecisionTree: The fitted decision tree.
+        '''
+
+        self.decision_tree = DecisionTree(self.dataset, engine=self.engine, split_workers=self.split_workers)
+        if refit:
+            self.decision_tree.fit()
+            self.decision_tree.save()
+        else:
+            self.decision_tree.load_or_fit()
+        return self.decision_tree
+
     def start_dialogue(self):
 
         '''
         Starts the dialogue with the user to calculate the social benefits.
 
+        The dialogue walks the fitted decision tree, which is loaded from the model file or fitted if the dataset changed since the last fit.
+        If a numerical answer matches no branch of the tree, the dialogue continues by splitting the constellations reduced by the given answers.
+
         Returns:
-        None
+        The menu to open next, as a function with its parameters.
         '''
 
-        decision_tree = DecisionTree(self.dataset)
-        dataframe = self.dataset.get_dataframes()
+        decision_tree = self.decision_tree if self.decision_tree is not None else self.fit_decision_tree()
         question_count = 1
 
-        # Repeat until only the social benefit column is left
-        while dataframe.shape[1] > 1:
+        def get_answer(attribute:Attribute):
+            # Only valid answers count as questions
+            nonlocal question_count
+            answer = self.get_user_answer(question_count=question_count,attribute=attribute)
+            if answer is not None:
+                question_count += 1
+            return answer
 
-            # Find the best attribute to split the dataframe
-            best_attribute = decision_tree._find_best_split_attribute(dataframe=dataframe)
+        # Walk the tree along the answers, see DecisionTree.walk
+        social_benefit_mask = decision_tree.walk(get_answer)
 
-            if isinstance(best_attribute,Attribute_Categorical):
-                answer = self.get_user_input_categorical(question_count=question_count,question=best_attribute.question,choices=best_attribute.answer_options)
-            else:
-                try:
-                    answer = self.get_user_input_numerical(question_count=question_count,question=best_attribute.question)
-                except:
-                    print("Please enter a valid number.")
-                    continue
-            
-            # Reduce the dataframe based on the user's answer
-            dataframe = decision_tree._reduce_dataframe(dataframe,best_attribute,answer)
+        # The leaves only hold the ids of the social benefits, their names are looked up for the result
+        social_benefits = [social_benefit.name for social_benefit in self.dataset.get_social_benefits_from_mask(social_benefit_mask)]
 
-            # Increase question count
-            question_count += 1
-        
         # Print the result
-        if len(dataframe) == 0:
+        if len(social_benefits) == 0:
             print("Result is in. From the given data, you are not eligable for any social benefit.")
         else:
             # Print the social benefits for which the user is eligable
-            print(f"Result is in. From the given data, you are eligable for the following social benefits: {dataframe['social_benefit'].unique()}")
+            print(f"Result is in. From the given data, you are eligable for the following social benefits: {social_benefits}")
 
         time.sleep(1)
 
-        self.open_main_menu()
\ No newline at end of file
+        return (self.open_main_menu,())
+
+    def get_user_answer(self,question_count:int,attribute:Attribute):
+
+        '''
+        Asks the user the question of an attribute.
+
+        Parameters:
+        - question_count (int): The number of the question.
+        - attribute (Attribute): The attribute to ask the question of.
+
+        Returns:
+        The answer of the user, None if the answer was invalid.
+        '''
+
+        if isinstance(attribute,Attribute_Categorical):
+            return self.get_user_input_categorical(question_count=question_count,question=attribute.question,choices=attribute.answer_options)
+        try:
+            return self.get_user_input_numerical(question_count=question_count,question=attribute.question)
+        except:
+            print("Please enter a valid number.")
+            return None
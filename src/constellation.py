@@ -0,0 +1,615 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import copy
+import operator
+from functools import reduce
+import numpy as np
+import pandas as pd
+from src.attribute import Attribute, Attribute_Numerical
+
+# row indices per table, describing which rows of the immutable tables of a constellation remain
+Rows = Dict['Constellation_Table', np.ndarray]
+
+# function returning for the columns of an attribute (restricted to some rows) which rows match the answers
+CompatibilityFunction = Callable[[Dict[str, np.ndarray]], np.ndarray]
+
+
+class Constellation:
+    '''
+    Base class for a table of requirement constellations that is only expanded on demand.
+
+    A constellation table is built from the requirement tree of the social benefits: concrete requirements
+    are small tables, an AND is the cartesian product of its children and an OR is the concatenation of its
+    children. Instead of materializing the product, the factors are kept apart, so that the number of rows,
+    the remaining columns and the reduction by an answer can be computed on the factors alone.
+
+    Constellations are immutable. A reduction is described by the remaining rows of each table (see ConstellationView),
+    so all methods take an optional mapping from the tables to their remaining row indices; None stands for all rows.
+
+    Methods:
+    - __len__(): Returns the number of rows of the expanded table.
+    - columns: The columns of the expanded table.
+    - get_tables(): Returns the tables the constellation consists of.
+    - get_length(rows): Returns the number of remaining rows of the expanded table.
+    - get_unique(column, rows): Returns the distinct values of a column in the order of the expanded table.
+    - to_dataframe(rows): Expands the constellations into a dataframe.
+    '''
+
+    def __len__(self) -> int:
+        return self.get_length(None)
+
+    @property
+    def columns(self) -> List[str]:
+        raise NotImplementedError
+
+    def get_tables(self) -> List['Constellation_Table']:
+        raise NotImplementedError
+
+    def get_length(self, rows: Optional[Rows]) -> int:
+        raise NotImplementedError
+
+    def get_unique(self, column: str, rows: Optional[Rows] = None) -> np.ndarray:
+        raise NotImplementedError
+
+    def to_dataframe(self, rows: Optional[Rows] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class Constellation_Table(Constellation):
+    '''
+    A materialized table of constellations, as created by a concrete requirement.
+
+    Besides the dataframe, the table keeps its columns as numpy arrays and a matrix telling which cells have a value,
+    which are the encoded base the reductions refer to. The attribute of the requirement the table was created by tells
+    how its columns are merged with the same columns of other factors of a product, see _merge_columns.
+    '''
+
+    def __init__(self, dataframe: pd.DataFrame, attribute: Optional[Attribute] = None):
+        self.dataframe = dataframe
+        self.attribute = attribute
+        self._length = len(dataframe)
+        self._columns = list(dataframe.columns)
+        self.column_values = {column: dataframe[column].to_numpy() for column in self._columns}
+        self.non_null = dataframe.notna().to_numpy(dtype='float64')
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def columns(self) -> List[str]:
+        return self._columns
+
+    def get_tables(self) -> List['Constellation_Table']:
+        return [self]
+
+    def get_length(self, rows: Optional[Rows]) -> int:
+        if rows is None:
+            return self._length
+        return len(rows[self])
+
+    def get_unique(self, column: str, rows: Optional[Rows] = None) -> np.ndarray:
+        '''
+        Returns the distinct values of a column in the order of the table.
+
+        Parameters:
+        - column (str): The column to get the values of.
+        - rows (Rows): The remaining rows of the tables, None for all rows.
+
+        Returns:
+        np.ndarray: The distinct values of the column, or an empty array if the column does not exist.
+        '''
+        if column not in self.column_values:
+            return np.array([], dtype=object)
+
+        values = self.column_values[column]
+        if rows is not None:
+            values = values[rows[self]]
+        return pd.unique(values)
+
+    def to_dataframe(self, rows: Optional[Rows] = None) -> pd.DataFrame:
+        if rows is None:
+            return self.dataframe
+        return self.dataframe.iloc[rows[self]]
+
+
+class Constellation_Product(Constellation):
+    '''
+    The cartesian product of the constellations of the children of a logical AND.
+
+    The expanded table contains one row for every combination of rows of the factors, with the first factor varying slowest.
+    If several factors carry the same column, like an AND with a requirement on an attribute and an OR with another one on it,
+    the expanded table has the column once with the intersection of their constraints, see _merge_columns.
+    '''
+
+    def __init__(self, factors: List[Constellation]):
+        self.factors = factors
+        self._columns = list(dict.fromkeys(column for factor in factors for column in factor.columns))
+
+    @property
+    def columns(self) -> List[str]:
+        return self._columns
+
+    def get_tables(self) -> List[Constellation_Table]:
+        return [table for factor in self.factors for table in factor.get_tables()]
+
+    def get_length(self, rows: Optional[Rows]) -> int:
+        return reduce(operator.mul, (factor.get_length(rows) for factor in self.factors), 1)
+
+    def get_unique(self, column: str, rows: Optional[Rows] = None) -> np.ndarray:
+        '''
+        Returns the distinct values of a column in the order of the expanded table.
+
+        Parameters:
+        - column (str): The column to get the values of.
+        - rows (Rows): The remaining rows of the tables, None for all rows.
+
+        Returns:
+        np.ndarray: The distinct values of the column.
+        '''
+        if self.get_length(rows) == 0:
+            return np.array([], dtype=object)
+
+        # every row of a factor appears in the product, so the values of the factor are the values of the product
+        values = [factor.get_unique(column, rows) for factor in self.factors if column in factor.columns]
+        if len(values) == 0:
+            return np.array([], dtype=object)
+        return pd.unique(np.concatenate(values))
+
+    def to_dataframe(self, rows: Optional[Rows] = None) -> pd.DataFrame:
+        '''
+        Expands the product into a dataframe.
+
+        Parameters:
+        - rows (Rows): The remaining rows of the tables, None for all rows.
+
+        Returns:
+        DataFrame: A dataframe with one row for every combination of rows of the factors.
+        '''
+
+        dataframes = [factor.to_dataframe(rows) for factor in self.factors]
+        constellations = self.get_length(rows)
+
+        if constellations == 0:
+            return pd.DataFrame()
+
+        # each factor is repeated row by row for the factors after it and as a whole for the factors before it
+        expanded_dataframes = []
+        inner = constellations
+        for dataframe in dataframes:
+            inner //= len(dataframe)
+            outer = constellations // (inner * len(dataframe))
+            positions = np.tile(np.repeat(np.arange(len(dataframe)), inner), outer)
+            expanded_dataframes.append(dataframe.iloc[positions].reset_index(drop=True))
+
+        if len(expanded_dataframes) == 0:
+            return pd.DataFrame(index=range(constellations))
+        dataframe = pd.concat(expanded_dataframes, axis=1)
+        if not dataframe.columns.has_duplicates:
+            return dataframe
+        attributes = {column: table.attribute for table in self.get_tables() for column in table.columns}
+        return pd.DataFrame({column: _merge_columns(column, attributes[column], dataframe.loc[:, dataframe.columns == column]) for column in dict.fromkeys(dataframe.columns)})
+
+
+class Constellation_Union(Constellation):
+    '''
+    The concatenation of the constellations of the children of a logical OR, or of all social benefits.
+
+    The columns are in the order in which they appear in the parts.
+    '''
+
+    def __init__(self, parts: List[Constellation]):
+        self.parts = parts
+        self._columns = list(dict.fromkeys(column for part in parts for column in part.columns))
+
+    @property
+    def columns(self) -> List[str]:
+        return self._columns
+
+    def get_tables(self) -> List[Constellation_Table]:
+        return [table for part in self.parts for table in part.get_tables()]
+
+    def get_length(self, rows: Optional[Rows]) -> int:
+        return sum(part.get_length(rows) for part in self.parts)
+
+    def get_unique(self, column: str, rows: Optional[Rows] = None) -> np.ndarray:
+        '''
+        Returns the distinct values of a column in the order of the expanded table.
+
+        Parameters:
+        - column (str): The column to get the values of.
+        - rows (Rows): The remaining rows of the tables, None for all rows.
+
+        Returns:
+        np.ndarray: The distinct values of the column.
+        '''
+        values = [part.get_unique(column, rows) for part in self.parts if column in part.columns]
+        if len(values) == 0:
+            return np.array([], dtype=object)
+        return pd.unique(np.concatenate(values))
+
+    def to_dataframe(self, rows: Optional[Rows] = None) -> pd.DataFrame:
+        '''
+        Expands the union into a dataframe.
+
+        Parameters:
+        - rows (Rows): The remaining rows of the tables, None for all rows.
+
+        Returns:
+        DataFrame: The concatenated dataframes of the parts.
+        '''
+        dataframes = [part.to_dataframe(rows) for part in self.parts if part.get_length(rows) > 0]
+        if len(dataframes) == 0:
+            return pd.DataFrame()
+        return pd.concat(dataframes, ignore_index=True)
+
+
+class ConstellationView:
+    '''
+    A constellation reduced by answers, which refers to the rows of its immutable tables by index arrays.
+
+    The reduction never copies a table: the view keeps the remaining row indices of every table and a mask of the
+    columns that are still active, i.e. that were not answered yet and still contain at least one value.
+    Reducing a view only replaces the row indices of the tables containing the answered attribute.
+
+    Whether a column still contains a value is tracked with counters instead of counting all cells again: the view
+    keeps the number of remaining rows of every node of the constellation, the number of remaining values per column
+    of every table, and per column the sum over the tables that are part of the expanded table, i.e. that are not in a
+    product with an empty factor. A reduction only updates the counters of the changed tables and of the nodes above
+    them, and a column is dead once its counter drops to zero.
+
+    Methods:
+    - __len__(): Returns the number of remaining rows of the expanded table.
+    - columns: The active columns.
+    - unique(column): Returns the distinct values of a column in the order of the expanded table.
+    - reduce(columns, mask_function, table_rows): Removes the rows that don't match an answer and deactivates the answered columns.
+    - count_non_null(columns, compatibility_function, value_count): Counts the values per active column that remain for each of several answers.
+    - encode(): Encodes the remaining rows and active columns compactly, e.g. to send them to another process.
+    - decode(encoded): Returns the view of the same constellation with encoded rows and active columns.
+    - to_dataframe(): Expands the remaining constellations into a dataframe.
+    '''
+
+    def __init__(self, constellation: Constellation, rows: Optional[Rows] = None, active: Optional[np.ndarray] = None):
+        '''
+        Initializes the view on a constellation.
+
+        Parameters:
+        - constellation (Constellation): The constellation the view refers to.
+        - rows (Rows): The remaining rows of the tables, None for all rows.
+        - active (np.ndarray): A boolean mask over constellation.columns, None for all columns that contain a value.
+        '''
+
+        self.constellation = constellation
+        self._column_positions = {column: position for position, column in enumerate(constellation.columns)}
+
+        # the structure of the constellation as a list of nodes, children before their parents, shared by all views reduced from this one
+        self._tables = constellation.get_tables()
+        self._table_indices = {table: index for index, table in enumerate(self._tables)}
+        self._table_positions = [np.array([self._column_positions[column] for column in table.columns], dtype=np.int64) for table in self._tables]
+        self._column_tables: Dict[str, List[int]] = {column: [] for column in self._column_positions}
+        for index, table in enumerate(self._tables):
+            for column in table.columns:
+                self._column_tables[column].append(index)
+        self._kinds: List[str] = []
+        self._children: List[List[int]] = []
+        self._node_tables: List[List[int]] = []
+        self._table_nodes = np.zeros(len(self._tables), dtype=np.int64)
+        self._compile(constellation)
+        self._parents = {child: parent for parent, children in enumerate(self._children) for child in children}
+        self._ancestors = [self._get_ancestors(node) for node in self._table_nodes]
+
+        self._set_rows(rows if rows is not None else {table: np.arange(len(table)) for table in self._tables})
+        self._set_active(active if active is not None else self._column_counts > 0)
+
+    def _compile(self, constellation: Constellation) -> int:
+        '''
+        Appends the nodes of a constellation to the compiled structure.
+
+        Parameters:
+        - constellation (Constellation): The constellation to compile.
+
+        Returns:
+        int: The index of the node of the constellation.
+        '''
+
+        if isinstance(constellation, Constellation_Table):
+            kind, children = 'table', []
+        else:
+            kind = 'product' if isinstance(constellation, Constellation_Product) else 'union'
+            children = [self._compile(child) for child in (constellation.factors if kind == 'product' else constellation.parts)]
+
+        index = len(self._kinds)
+        self._kinds.append(kind)
+        self._children.append(children)
+        if kind == 'table':
+            self._table_nodes[self._table_indices[constellation]] = index
+            self._node_tables.append([self._table_indices[constellation]])
+        else:
+            self._node_tables.append([table for child in children for table in self._node_tables[child]])
+        return index
+
+    def _get_ancestors(self, node: int) -> List[int]:
+        '''
+        Returns the nodes above a node, from its parent up to the root.
+        '''
+        ancestors = []
+        while node in self._parents:
+            node = self._parents[node]
+            ancestors.append(node)
+        return ancestors
+
+    def _get_node_length(self, node: int, lengths: Dict[int, np.ndarray], default_lengths: np.ndarray) -> np.ndarray:
+        '''
+        Computes the number of rows of the expanded table of a composite node from the lengths of its children.
+
+        Parameters:
+        - node (int): The index of a product or union node.
+        - lengths (Dict[int, np.ndarray]): The changed lengths of nodes.
+        - default_lengths (np.ndarray): The lengths of all nodes before the change.
+
+        Returns:
+        np.ndarray: The length of the node, per answer if the changed lengths are given per answer.
+        '''
+        child_lengths = [lengths[child] if child in lengths else default_lengths[child] for child in self._children[node]]
+        if self._kinds[node] == 'product':
+            return reduce(operator.mul, child_lengths, np.float64(1))
+        return reduce(operator.add, child_lengths, np.float64(0))
+
+    def _set_rows(self, rows: Rows) -> None:
+        '''
+        Sets the remaining rows and counts the rows of every node and the values of every table and column from scratch.
+
+        Parameters:
+        - rows (Rows): The remaining rows of the tables.
+        '''
+        self.rows = rows
+        self._table_counts = [table.non_null[rows[table]].sum(axis=0) for table in self._tables]
+
+        self._lengths = np.zeros(len(self._kinds))
+        for node, kind in enumerate(self._kinds):
+            self._lengths[node] = len(rows[self._tables[self._node_tables[node][0]]]) if kind == 'table' else self._get_node_length(node, {}, self._lengths)
+
+        self._contained = np.array([all(self._lengths[ancestor] > 0 for ancestor in ancestors if self._kinds[ancestor] == 'product') for ancestors in self._ancestors], dtype=bool)
+        self._column_counts = np.zeros(len(self._column_positions))
+        for index in np.flatnonzero(self._contained):
+            self._column_counts[self._table_positions[index]] += self._table_counts[index]
+
+    def _set_active(self, active: np.ndarray) -> None:
+        self.active = active
+        self._columns = [column for column, is_active in zip(self.constellation.columns, active) if is_active]
+        self._length = int(self._lengths[-1]) if len(self._kinds) > 0 else 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def columns(self) -> List[str]:
+        return self._columns
+
+    def unique(self, column: str) -> np.ndarray:
+        '''
+        Returns the distinct values of an active column in the order of the expanded table.
+
+        Parameters:
+        - column (str): The column to get the values of.
+
+        Returns:
+        np.ndarray: The distinct values of the column.
+        '''
+        if column not in self._columns:
+            return np.array([], dtype=object)
+
+        # the values of the expanded table are the remaining values of the tables that are part of it
+        values = [self._tables[index].column_values[column][self.rows[self._tables[index]]] for index in self._column_tables[column] if self._contained[index]]
+        if len(values) == 0:
+            return np.array([], dtype=object)
+        return pd.unique(np.concatenate(values))
+
+    def count_non_null(self, columns: List[str], compatibility_function: CompatibilityFunction, value_count: int) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Counts for each of several answers the rows matching the answer and their values per active column.
+
+        Like ConstellationBitset, the values are counted in the rows of the tables that are part of the expanded table,
+        not in the rows of the expanded table, which is enough to tell which columns remain after the answer. Only the
+        counters of the tables with the answered attribute and of the nodes above them are recomputed.
+
+        Parameters:
+        - columns (List[str]): The columns of the answered attribute.
+        - compatibility_function (CompatibilityFunction): A function returning for the columns of the attribute a boolean matrix with a column per answer, telling which rows match the answer.
+        - value_count (int): The number of answers.
+
+        Returns:
+        Tuple[np.ndarray, np.ndarray]: The number of matching rows of the expanded table per answer and a matrix with
+        the number of matching rows with a value per answer and active column.
+        '''
+
+        lengths: Dict[int, np.ndarray] = {}
+        table_counts: Dict[int, np.ndarray] = {}
+        column_counts = np.tile(self._column_counts, (value_count, 1))
+
+        for index in self._get_answered_tables(columns):
+            table = self._tables[index]
+            row_indices = self.rows[table]
+            compatibility = compatibility_function({column: table.column_values[column][row_indices] for column in columns if column in table.column_values}).astype('float64')
+            table_counts[index] = compatibility.T @ table.non_null[row_indices]
+            lengths[self._table_nodes[index]] = compatibility.sum(axis=0)
+            if self._contained[index]:
+                column_counts[:, self._table_positions[index]] -= self._table_counts[index] - table_counts[index]
+
+        # tables below a product that became empty for an answer are no longer part of its expanded table
+        removed: Dict[int, np.ndarray] = {}
+        for node in sorted({ancestor for node in lengths for ancestor in self._ancestors_of_node(node)}):
+            lengths[node] = self._get_node_length(node, lengths, self._lengths) * np.ones(value_count)
+            if self._kinds[node] != 'product' or self._lengths[node] == 0:
+                continue
+            emptied = lengths[node] == 0
+            if not emptied.any():
+                continue
+            for index in self._node_tables[node]:
+                if not self._contained[index]:
+                    continue
+                answers = np.flatnonzero(emptied & ~removed.get(index, np.zeros(value_count, dtype=bool)))
+                counts = table_counts[index][answers] if index in table_counts else self._table_counts[index]
+                column_counts[np.ix_(answers, self._table_positions[index])] -= counts
+                removed[index] = removed.get(index, np.zeros(value_count, dtype=bool)) | emptied
+
+        root = len(self._kinds) - 1
+        row_counts = lengths[root] if root in lengths else np.full(value_count, self._lengths[root])
+        return row_counts, column_counts[:, self.active]
+
+    def _get_answered_tables(self, columns: List[str]) -> List[int]:
+        '''
+        Returns the indices of the tables holding any of the given columns, in the order of the tables.
+        '''
+        return sorted({index for column in columns for index in self._column_tables.get(column, [])})
+
+    def _ancestors_of_node(self, node: int) -> List[int]:
+        '''
+        Returns the nodes above a table node, from its parent up to the root.
+        '''
+        return self._ancestors[self._node_tables[node][0]]
+
+    def reduce(self, columns: List[str], mask_function: Callable[[Dict[str, np.ndarray]], np.ndarray], table_rows: Optional[Rows] = None) -> 'ConstellationView':
+        '''
+        Removes the rows that don't match an answer, deactivates the answered columns and all columns without remaining values.
+
+        Only the counters of the tables with the answered attribute and of the nodes above them are updated.
+
+        Parameters:
+        - columns (List[str]): The columns of the answered attribute.
+        - mask_function (Callable): A function returning for the columns of the attribute which rows match the answer.
+        - table_rows (Rows): Precomputed sorted indices of the rows of tables matching the answer, e.g. from an IntervalIndex. The mask function is only called for the other tables.
+
+        Returns:
+        ConstellationView: The reduced view, sharing the row indices of all unaffected tables.
+        '''
+
+        rows = dict(self.rows)
+        lengths: Dict[int, np.ndarray] = {}
+        table_counts = list(self._table_counts)
+        contained = self._contained.copy()
+        column_counts = self._column_counts.copy()
+
+        for index in self._get_answered_tables(columns):
+            table = self._tables[index]
+            row_indices = self.rows[table]
+            if table_rows is not None and table in table_rows:
+                rows[table] = _intersect_rows(row_indices, table_rows[table])
+            else:
+                rows[table] = row_indices[mask_function({column: table.column_values[column][row_indices] for column in columns if column in table.column_values})]
+            table_counts[index] = table.non_null[rows[table]].sum(axis=0)
+            lengths[self._table_nodes[index]] = np.float64(len(rows[table]))
+            if contained[index]:
+                column_counts[self._table_positions[index]] -= self._table_counts[index] - table_counts[index]
+
+        # tables below a product that became empty are no longer part of the expanded table
+        for node in sorted({ancestor for node in lengths for ancestor in self._ancestors_of_node(node)}):
+            lengths[node] = self._get_node_length(node, lengths, self._lengths)
+            if self._kinds[node] == 'product' and self._lengths[node] > 0 and lengths[node] == 0:
+                for index in self._node_tables[node]:
+                    if contained[index]:
+                        contained[index] = False
+                        column_counts[self._table_positions[index]] -= table_counts[index]
+
+        active = self.active.copy()
+        for column in columns:
+            if column in self._column_positions:
+                active[self._column_positions[column]] = False
+
+        reduced = copy.copy(self)
+        reduced.rows = rows
+        reduced._lengths = self._lengths.copy()
+        reduced._lengths[list(lengths)] = list(lengths.values())
+        reduced._table_counts = table_counts
+        reduced._contained = contained
+        reduced._column_counts = column_counts
+        reduced._set_active(active & (column_counts > 0))
+        return reduced
+
+    def encode(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        '''
+        Encodes the remaining rows and active columns compactly, e.g. to send them to another process.
+
+        Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The remaining row indices of all tables in the order of get_tables(),
+        the number of remaining rows per table and the packed mask of the active columns.
+        '''
+        row_indices = [self.rows[table] for table in self._tables]
+        return (np.concatenate(row_indices).astype(np.int32) if row_indices else np.array([], dtype=np.int32),
+                np.array([len(indices) for indices in row_indices], dtype=np.int32),
+                np.packbits(self.active))
+
+    def decode(self, encoded: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> 'ConstellationView':
+        '''
+        Returns the view of the same constellation with encoded rows and active columns.
+
+        Parameters:
+        - encoded (Tuple[np.ndarray, np.ndarray, np.ndarray]): The rows and active columns as returned by encode() of a view of an equal constellation.
+
+        Returns:
+        ConstellationView: The decoded view, sharing the compiled structure of this view.
+        '''
+        row_indices, row_counts, active = encoded
+        decoded = copy.copy(self)
+        decoded._set_rows(dict(zip(self._tables, np.split(row_indices.astype(np.int64), np.cumsum(row_counts)[:-1]) if self._tables else [])))
+        decoded._set_active(np.unpackbits(active, count=len(self._column_positions)).astype(bool))
+        return decoded
+
+    def to_dataframe(self) -> pd.DataFrame:
+        '''
+        Expands the remaining constellations into a dataframe.
+
+        Returns:
+        DataFrame: A dataframe with the remaining rows and the active columns.
+        '''
+        dataframe = self.constellation.to_dataframe(self.rows)
+        return dataframe[[column for column in self._columns if column in dataframe.columns]]
+
+
+def _intersect_rows(rows: np.ndarray, other_rows: np.ndarray) -> np.ndarray:
+    '''
+    Returns the row indices found in both sorted arrays of distinct row indices, looking up the shorter array in the longer one.
+
+    Parameters:
+    - rows (np.ndarray): The sorted row indices.
+    - other_rows (np.ndarray): The other sorted row indices.
+
+    Returns:
+    np.ndarray: The sorted row indices in both arrays.
+    '''
+    if len(rows) > len(other_rows):
+        rows, other_rows = other_rows, rows
+    if len(other_rows) == 0:
+        return rows[:0]
+    positions = np.minimum(np.searchsorted(other_rows, rows), len(other_rows) - 1)
+    return rows[other_rows[positions] == rows]
+
+
+def _merge_columns(column: str, attribute: Optional[Attribute], dataframe: pd.DataFrame) -> pd.Series:
+    '''
+    Merges the cells of several factors of a product in the same column into the intersection of their constraints, NaN meaning no constraint.
+    Lower bounds are merged into the largest, upper bounds into the smallest and the bitmasks of categorical attributes by a bitwise AND.
+    The kind of the column is told by the type of its attribute rather than by its name, as the title of a categorical attribute may end like a bound column.
+
+    Parameters:
+    - column (str): The name of the column.
+    - attribute (Optional[Attribute]): The attribute the column belongs to.
+    - dataframe (pd.DataFrame): The columns of the factors with that name.
+
+    Returns:
+    pd.Series: The merged column.
+    '''
+    numerical = isinstance(attribute, Attribute_Numerical)
+    merged = dataframe.iloc[:, 0]
+    for index in range(1, dataframe.shape[1]):
+        other = dataframe.iloc[:, index]
+        if numerical and column == attribute.lower_column:
+            merged = pd.Series(np.fmax(merged, other), index=merged.index)
+        elif numerical and column == attribute.upper_column:
+            merged = pd.Series(np.fmin(merged, other), index=merged.index)
+        else:
+            values = merged.to_numpy(dtype='float64', na_value=np.nan)
+            other_values = other.to_numpy(dtype='float64', na_value=np.nan)
+            both = ~np.isnan(values) & ~np.isnan(other_values)
+            merged_values = np.where(np.isnan(values), other_values, values)
+            merged_values[both] = values[both].astype('int64') & other_values[both].astype('int64')
+            merged = pd.Series(merged_values if np.isnan(merged_values).any() else merged_values.astype('int64'), index=merged.index)
+    return merged
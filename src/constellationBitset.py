@@ -0,0 +1,364 @@
+import copy
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.constellation import Constellation, Constellation_Table, Constellation_Product, Rows, CompatibilityFunction
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    '''
+    Counts the set bits of every uint64 word, summing the bits of ever wider groups within the word.
+
+    Parameters:
+    - words (np.ndarray): An array of uint64 words.
+
+    Returns:
+    np.ndarray: The number of set bits per word, in the shape of words.
+    '''
+    words = words - ((words >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    words = (words & np.uint64(0x3333333333333333)) + ((words >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    words = (words + (words >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((words * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+
+class ConstellationBitset:
+    '''
+    A reduced constellation whose remaining rows are kept as a packed bitset, an alternative to ConstellationView.
+
+    All rows of the tables of a constellation are numbered, every table starting at a new uint64 word. For each
+    answer, the rows compatible with it are packed into a bitset once and cached, so reducing by an answer is an AND
+    of two bitsets. The rows of a table and the rows with a value in a column are counted with popcounts.
+
+    The bitsets of the answers are cached by a key, which callers choose so that answers with the same compatible
+    rows share it (e.g. all values between the same two bounds of a numerical attribute).
+
+    Methods:
+    - __len__(): Returns the number of remaining rows of the expanded table.
+    - columns: The active columns.
+    - unique(column): Returns the distinct values of a column in the order of the expanded table.
+    - reduce(columns, mask_function, key): Removes the rows that don't match an answer and deactivates the answered columns.
+    - count_non_null(columns, compatibility_function, value_count, keys): Counts the values per active column that remain for each of several answers.
+    - encode(): Encodes the remaining rows and active columns compactly, e.g. to send them to another process.
+    - decode(encoded): Returns the bitset of the same constellation with encoded rows and active columns.
+    - get_rows(): Returns the remaining row indices of every table.
+    - to_dataframe(): Expands the remaining constellations into a dataframe.
+    '''
+
+    def __init__(self, constellation: Constellation):
+        '''
+        Compiles the constellation into bitsets, with all rows remaining and all columns with a value active.
+
+        Parameters:
+        - constellation (Constellation): The constellation to compile.
+        '''
+
+        self.constellation = constellation
+        self._column_positions = {column: position for position, column in enumerate(constellation.columns)}
+
+        # the structure of the constellation as a list of nodes, children before their parents
+        self._tables: List[Constellation_Table] = []
+        self._nodes: List[Tuple[str, Optional[int], List[int]]] = []
+        self._compile(constellation)
+
+        # every table starts at a new word
+        word_counts = np.array([(len(table) + 63) // 64 for table in self._tables], dtype=np.int64)
+        self._word_ends = np.cumsum(word_counts)
+        self._word_starts = self._word_ends - word_counts
+        self._word_counts = word_counts
+        self._word_count = int(self._word_ends[-1]) if len(self._tables) > 0 else 0
+
+        # rows with a value per column, and the rows and values of the tables holding each column
+        non_null = np.zeros((len(self._column_positions), self._word_count * 64), dtype=bool)
+        rows = np.zeros(self._word_count * 64, dtype=bool)
+        column_rows: Dict[str, List[np.ndarray]] = {column: [] for column in self._column_positions}
+        column_values: Dict[str, List[np.ndarray]] = {column: [] for column in self._column_positions}
+        for table, start in zip(self._tables, self._word_starts):
+            offset = start * 64
+            rows[offset:offset + len(table)] = True
+            for position, column in enumerate(table.columns):
+                non_null[self._column_positions[column], offset:offset + len(table)] = table.non_null[:, position] > 0
+                column_rows[column].append(np.arange(offset, offset + len(table)))
+                column_values[column].append(table.column_values[column])
+        self._non_null = self._pack(non_null)
+        self._column_rows = {column: np.concatenate(column_rows[column]) for column in self._column_positions}
+        self._column_values = {column: np.concatenate(column_values[column]) for column in self._column_positions}
+
+        self._compile_structure()
+
+        self._answer_bitsets: Dict[Tuple[Tuple[str, ...], Hashable], np.ndarray] = {}
+
+        self.rows = self._pack(rows)
+        self.active = np.zeros(len(self._column_positions), dtype=bool)
+        self._update(self.rows, np.ones(len(self._column_positions), dtype=bool))
+
+    def _compile(self, constellation: Constellation) -> int:
+        '''
+        Appends the nodes of a constellation to the compiled structure.
+
+        Parameters:
+        - constellation (Constellation): The constellation to compile.
+
+        Returns:
+        int: The index of the node of the constellation.
+        '''
+
+        if isinstance(constellation, Constellation_Table):
+            self._tables.append(constellation)
+            self._nodes.append(('table', len(self._tables) - 1, []))
+        else:
+            kind = 'product' if isinstance(constellation, Constellation_Product) else 'union'
+            children = constellation.factors if kind == 'product' else constellation.parts
+            self._nodes.append((kind, None, [self._compile(child) for child in children]))
+        return len(self._nodes) - 1
+
+    def _compile_structure(self) -> None:
+        '''
+        Groups the nodes of the compiled structure so it can be evaluated with one operation per level instead of one per node.
+
+        Nodes of the same kind and height are combined together, children always having a lower height than their
+        parents. For every table, the products above it are recorded, as a table is only part of the expanded table
+        if none of them has an empty factor.
+        '''
+
+        heights = []
+        parents = [None] * len(self._nodes)
+        for index, (kind, table, children) in enumerate(self._nodes):
+            heights.append(1 + max((heights[child] for child in children), default=0) if kind != 'table' else 0)
+            for child in children:
+                parents[child] = index
+
+        self._table_nodes = np.array([index for index, (kind, _, _) in enumerate(self._nodes) if kind == 'table'], dtype=np.int64)
+        self._empty_products = np.array([index for index, (kind, _, children) in enumerate(self._nodes) if kind == 'product' and not children], dtype=np.int64)
+
+        self._levels = []
+        for height in range(1, max(heights, default=0) + 1):
+            for kind in ('product', 'union'):
+                nodes = [index for index, (node_kind, _, children) in enumerate(self._nodes) if node_kind == kind and heights[index] == height and children]
+                if nodes:
+                    children = [child for node in nodes for child in self._nodes[node][2]]
+                    offsets = np.cumsum([0] + [len(self._nodes[node][2]) for node in nodes[:-1]])
+                    self._levels.append((np.multiply if kind == 'product' else np.add, np.array(nodes), np.array(children), offsets))
+
+        self._product_nodes = np.array([index for index, (kind, _, _) in enumerate(self._nodes) if kind == 'product'], dtype=np.int64)
+        product_positions = {node: position for position, node in enumerate(self._product_nodes)}
+        self._table_products = np.zeros((len(self._product_nodes), len(self._tables)))
+        for table, node in enumerate(self._table_nodes):
+            parent = parents[node]
+            while parent is not None:
+                if parent in product_positions:
+                    self._table_products[product_positions[parent], table] = 1
+                parent = parents[parent]
+
+    def _pack(self, bits: np.ndarray) -> np.ndarray:
+        '''
+        Packs boolean arrays over all rows into uint64 words.
+
+        Parameters:
+        - bits (np.ndarray): A boolean array whose last axis runs over the rows of all tables.
+
+        Returns:
+        np.ndarray: The packed words, the first row being the lowest bit of the first word.
+        '''
+        return np.packbits(bits, axis=-1, bitorder='little').view(np.uint64)
+
+    def _evaluate(self, states: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Evaluates the structure of the constellation for several sets of remaining rows.
+
+        Parameters:
+        - states (np.ndarray): A matrix with a bitset of remaining rows per row.
+
+        Returns:
+        Tuple[np.ndarray, np.ndarray]: The number of rows of the expanded table per state and a boolean matrix telling
+        per state which tables are part of the expanded table, i.e. are not in a product with an empty factor.
+        '''
+
+        # number of remaining rows of every table
+        cumulative_counts = np.zeros((len(states), self._word_count + 1), dtype=np.int64)
+        np.cumsum(popcount(states), axis=1, out=cumulative_counts[:, 1:])
+        table_lengths = (cumulative_counts[:, self._word_ends] - cumulative_counts[:, self._word_starts]).astype('float64')
+
+        lengths = np.zeros((len(states), len(self._nodes)))
+        lengths[:, self._table_nodes] = table_lengths
+        lengths[:, self._empty_products] = 1
+        for operation, nodes, children, offsets in self._levels:
+            lengths[:, nodes] = operation.reduceat(lengths[:, children], offsets, axis=1)
+
+        # a table is only part of the expanded table if no product above it has an empty factor
+        contained_tables = ((lengths[:, self._product_nodes] == 0) @ self._table_products) == 0
+
+        return lengths[:, -1], contained_tables
+
+    def _count_non_null(self, states: np.ndarray, contained_tables: np.ndarray) -> np.ndarray:
+        '''
+        Counts for several sets of remaining rows the rows with a value per column.
+
+        Parameters:
+        - states (np.ndarray): A matrix with a bitset of remaining rows per row.
+        - contained_tables (np.ndarray): A boolean matrix telling per state which tables are part of the expanded table.
+
+        Returns:
+        np.ndarray: A matrix with the number of remaining rows with a value per state and column.
+        '''
+
+        contained_words = np.repeat(contained_tables, self._word_counts, axis=1)
+        contained_states = np.where(contained_words, states, np.uint64(0))
+
+        return popcount(contained_states[:, np.newaxis, :] & self._non_null).sum(axis=2)
+
+    def _update(self, rows: np.ndarray, active: np.ndarray) -> None:
+        '''
+        Sets the remaining rows and deactivates all columns without a remaining value.
+
+        Parameters:
+        - rows (np.ndarray): The bitset of the remaining rows.
+        - active (np.ndarray): A boolean mask of the columns that were not answered yet.
+        '''
+        lengths, contained_tables = self._evaluate(rows[np.newaxis])
+        self.rows = rows
+        self.active = active & (self._count_non_null(rows[np.newaxis], contained_tables)[0] > 0)
+        self._length = int(lengths[0])
+        self._contained_tables = contained_tables[0]
+        self._columns = [column for column, is_active in zip(self.constellation.columns, self.active) if is_active]
+
+    def _get_answer_bitsets(self, columns: List[str], compatibility_function: CompatibilityFunction, value_count: int, keys: Optional[List[Hashable]]) -> np.ndarray:
+        '''
+        Returns for each of several answers the bitset of the rows compatible with it, computing it only if its key is not cached.
+
+        Parameters:
+        - columns (List[str]): The columns of the answered attribute.
+        - compatibility_function (CompatibilityFunction): A function returning for the columns of the attribute a boolean matrix with a column per answer, telling which rows match the answer.
+        - value_count (int): The number of answers.
+        - keys (List[Hashable]): A key per answer, None to not cache the bitsets.
+
+        Returns:
+        np.ndarray: A matrix with a bitset per answer.
+        '''
+
+        cache_keys = [(tuple(columns), key) for key in keys] if keys is not None else None
+        if cache_keys is not None and all(cache_key in self._answer_bitsets for cache_key in cache_keys):
+            return np.array([self._answer_bitsets[cache_key] for cache_key in cache_keys])
+
+        # rows of tables without the answered attribute are compatible with every answer
+        compatibility = np.ones((value_count, self._word_count * 64), dtype=bool)
+        for table, start in zip(self._tables, self._word_starts):
+            answered_columns = {column: table.column_values[column] for column in columns if column in table.column_values}
+            if len(answered_columns) > 0:
+                compatibility[:, start * 64:start * 64 + len(table)] = compatibility_function(answered_columns).T
+
+        bitsets = self._pack(compatibility)
+        if cache_keys is not None:
+            self._answer_bitsets.update(zip(cache_keys, bitsets))
+        return bitsets
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def columns(self) -> List[str]:
+        return self._columns
+
+    def unique(self, column: str) -> np.ndarray:
+        '''
+        Returns the distinct values of an active column in the order of the expanded table.
+
+        Parameters:
+        - column (str): The column to get the values of.
+
+        Returns:
+        np.ndarray: The distinct values of the column.
+        '''
+        if column not in self._columns:
+            return np.array([], dtype=object)
+
+        contained_rows = np.where(np.repeat(self._contained_tables, self._word_counts), self.rows, np.uint64(0))
+        bits = np.unpackbits(contained_rows.view(np.uint8), bitorder='little').astype(bool)
+        return pd.unique(self._column_values[column][bits[self._column_rows[column]]])
+
+    def count_non_null(self, columns: List[str], compatibility_function: CompatibilityFunction, value_count: int, keys: Optional[List[Hashable]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Counts for each of several answers the rows matching the answer and their values per active column.
+
+        Unlike ConstellationView, the values are counted in rows of the tables, not of the expanded table, which is
+        enough to tell which columns remain after the answer.
+
+        Parameters:
+        - columns (List[str]): The columns of the answered attribute.
+        - compatibility_function (CompatibilityFunction): A function returning for the columns of the attribute a boolean matrix with a column per answer, telling which rows match the answer.
+        - value_count (int): The number of answers.
+        - keys (List[Hashable]): A key per answer to cache the bitsets of the answers by, None to not cache them.
+
+        Returns:
+        Tuple[np.ndarray, np.ndarray]: The number of matching rows of the expanded table per answer and a matrix with
+        the number of matching rows with a value per answer and active column.
+        '''
+        states = self.rows & self._get_answer_bitsets(columns, compatibility_function, value_count, keys)
+        lengths, contained_tables = self._evaluate(states)
+        return lengths, self._count_non_null(states, contained_tables)[:, self.active]
+
+    def reduce(self, columns: List[str], mask_function: Callable[[Dict[str, np.ndarray]], np.ndarray], key: Optional[Hashable] = None) -> 'ConstellationBitset':
+        '''
+        Removes the rows that don't match an answer, deactivates the answered columns and all columns without remaining values.
+
+        Parameters:
+        - columns (List[str]): The columns of the answered attribute.
+        - mask_function (Callable): A function returning for the columns of the attribute which rows match the answer.
+        - key (Hashable): A key to cache the bitset of the answer by, None to not cache it.
+
+        Returns:
+        ConstellationBitset: The reduced bitset, sharing the compiled constellation.
+        '''
+
+        answer_bitset = self._get_answer_bitsets(columns, lambda answered_columns: mask_function(answered_columns)[:, np.newaxis], 1, None if key is None else [key])[0]
+
+        active = self.active.copy()
+        for column in columns:
+            if column in self._column_positions:
+                active[self._column_positions[column]] = False
+
+        reduced = copy.copy(self)
+        reduced._update(self.rows & answer_bitset, active)
+        return reduced
+
+    def encode(self) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Encodes the remaining rows and active columns compactly, e.g. to send them to another process.
+
+        Returns:
+        Tuple[np.ndarray, np.ndarray]: The bitset of the remaining rows and the packed mask of the active columns.
+        '''
+        return self.rows, np.packbits(self.active)
+
+    def decode(self, encoded: Tuple[np.ndarray, np.ndarray]) -> 'ConstellationBitset':
+        '''
+        Returns the bitset of the same constellation with encoded rows and active columns.
+
+        Parameters:
+        - encoded (Tuple[np.ndarray, np.ndarray]): The rows and active columns as returned by encode() of a bitset of an equal constellation.
+
+        Returns:
+        ConstellationBitset: The decoded bitset, sharing the compiled constellation.
+        '''
+        rows, active = encoded
+        decoded = copy.copy(self)
+        decoded._update(rows, np.unpackbits(active, count=len(self._column_positions)).astype(bool))
+        return decoded
+
+    def get_rows(self) -> Rows:
+        '''
+        Returns the remaining row indices of every table.
+
+        Returns:
+        Rows: The remaining row indices per table.
+        '''
+        bits = np.unpackbits(self.rows.view(np.uint8), bitorder='little').astype(bool)
+        return {table: np.flatnonzero(bits[start * 64:start * 64 + len(table)]) for table, start in zip(self._tables, self._word_starts)}
+
+    def to_dataframe(self) -> pd.DataFrame:
+        '''
+        Expands the remaining constellations into a dataframe.
+
+        Returns:
+        DataFrame: A dataframe with the remaining rows and the active columns.
+        '''
+        dataframe = self.constellation.to_dataframe(self.get_rows())
+        return dataframe[[column for column in self._columns if column in dataframe.columns]]
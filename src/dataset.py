@@ -1,8 +1,10 @@
-from typing import List
+from typing import Dict, List, Union
 
 from src.attribute import Attribute
 from src.socialBenefit import SocialBenefit
+from src.constellation import Constellation_Union, ConstellationView
 import src.datasetIo as io
+import numpy as np
 import pandas as pd
 
 
@@ -19,18 +21,69 @@ class DataSet:
         data_path = "data/exported_data/exported_data.json"
 
         self.attribute_list,self.social_benefit_list = io.load_data_from_json(data_path)
+
+        # indices for the lookups by title and name, kept in sync by the methods changing the lists, titles and names
+        self._attributes: Dict[str, Attribute] = {attribute.title: attribute for attribute in self.attribute_list}
+        self._social_benefits: Dict[str, SocialBenefit] = {}
+        for social_benefit in self.social_benefit_list:
+            self._social_benefits.setdefault(social_benefit.name, social_benefit)
+        self._social_benefit_ids: Dict[int, SocialBenefit] = {}
+        for social_benefit in self.social_benefit_list:
+            self._assign_id(social_benefit)
     
-    def get_dataframes(self) -> List[pd.DataFrame]:
+    def get_dataframes(self, materialize: bool = True) -> Union[pd.DataFrame, ConstellationView]:
+        """
+        Returns the constellations of all social benefits, where each row contains the relevant attributes for a social benefit.
+        The 'social_benefit' column holds the ids of the social benefits, see get_social_benefit_from_id.
+
+        Parameters:
+        - materialize (bool): If False, the constellations are returned as a view on the factorized constellations, which is only expanded on demand.
+
+        Returns:
+        Union[pd.DataFrame, ConstellationView]: The constellations of all social benefits.
+        """
+
+        constellation = Constellation_Union([social_benefit.get_constellation() for social_benefit in self.social_benefit_list])
+
+        if not materialize:
+            return ConstellationView(constellation)
+
+        return constellation.to_dataframe()
+
+    def get_eligibility(self, applicants: Union[pd.DataFrame, Dict[str, List]]) -> np.ndarray:
         """
-        Returns a list of dataframes, where each dataframe contains the relevant attributes for a social benefit.
+        Checks many applicants against the requirements of all social benefits at once.
+
+        The answers are encoded once per attribute and every social benefit is checked by its predicate, which works on whole columns, see SocialBenefit.get_predicate.
+        Applicants without an answer for an attribute don't meet requirements on it.
+
+        Parameters:
+        - applicants (Union[pd.DataFrame, Dict[str, List]]): The answers of the applicants, one column per attribute title and one row per applicant.
 
         Returns:
-        List[pd.DataFrame]: A list of dataframes.
+        np.ndarray: A boolean matrix with a row per applicant and a column per social benefit in the order of social_benefit_list, telling whether the applicant is eligible.
         """
 
-        dataframes = [social_benefit.get_dataframe() for social_benefit in self.social_benefit_list]
+        applicants = pd.DataFrame(applicants)
+        answers = {attribute.title: attribute.encode_answers(applicants[attribute.title]) for attribute in self.attribute_list if attribute.title in applicants.columns}
+
+        eligibility = np.empty((len(applicants), len(self.social_benefit_list)), dtype=bool)
+        for index, social_benefit in enumerate(self.social_benefit_list):
+            eligibility[:, index] = social_benefit.get_predicate()(answers, len(applicants))
+        return eligibility
 
-        return pd.concat(dataframes, ignore_index=True)
+    def get_eligible_social_benefits(self, answers: Dict[str, object]) -> List[SocialBenefit]:
+        """
+        Returns the social benefits a single applicant is eligible for, see SocialBenefit.is_eligible.
+
+        Parameters:
+        - answers (Dict[str, object]): The answers of the applicant per attribute title, numbers for numerical attributes and answer options for categorical ones.
+
+        Returns:
+        List[SocialBenefit]: The social benefits the applicant is eligible for, in the order of social_benefit_list.
+        """
+
+        return [social_benefit for social_benefit in self.social_benefit_list if social_benefit.is_eligible(answers)]
     
     def get_attribute_from_title(self,attribute_title: str) -> Attribute:
 
@@ -45,10 +98,59 @@ class DataSet:
 
         '''
 
-        for attribute in self.attribute_list:
-            if attribute.title == attribute_title:
-                return attribute
-        return None
+        return self._attributes.get(attribute_title)
+
+    def get_social_benefit_from_name(self,social_benefit_name: str) -> SocialBenefit:
+
+        '''
+        Returns the social benefit with the given name.
+
+        Parameters:
+        - social_benefit_name (str): The name of the social benefit to return.
+
+        Returns:
+        SocialBenefit: The first social benefit with the given name, or None if no social benefit with the given name exists.
+
+        '''
+
+        return self._social_benefits.get(social_benefit_name)
+
+    def get_social_benefit_from_id(self,social_benefit_id: int) -> SocialBenefit:
+
+        '''
+        Returns the social benefit with the given id, as found in the 'social_benefit' column of the constellations.
+
+        Parameters:
+        - social_benefit_id (int): The id of the social benefit to return.
+
+        Returns:
+        SocialBenefit: The social benefit with the given id, or None if it is not part of the dataset.
+
+        '''
+
+        return self._social_benefit_ids.get(social_benefit_id)
+
+    def get_social_benefits_from_mask(self,social_benefit_mask: int) -> List[SocialBenefit]:
+
+        '''
+        Returns the social benefits in a bitmask of social benefit ids, as held by the leaves of the decision tree.
+
+        Parameters:
+        - social_benefit_mask (int): The bitmask with bit i set for the social benefit with id i.
+
+        Returns:
+        List[SocialBenefit]: The social benefits of the dataset in the bitmask, by ascending id.
+
+        '''
+
+        social_benefits = []
+        while social_benefit_mask:
+            social_benefit_bit = social_benefit_mask & -social_benefit_mask
+            social_benefit = self._social_benefit_ids.get(social_benefit_bit.bit_length() - 1)
+            if social_benefit is not None:
+                social_benefits.append(social_benefit)
+            social_benefit_mask ^= social_benefit_bit
+        return social_benefits
         
     
     def export(self):
@@ -57,10 +159,19 @@ class DataSet:
         """
         io.export_data_to_json(self.attribute_list,self.social_benefit_list)
 
+    def get_hash(self) -> str:
+        """
+        Returns a content hash of the exported attributes and social benefits, which fitted decision trees are stamped with.
+
+        Returns:
+        str: The hash of the data.
+        """
+        return io.get_data_hash(self.attribute_list,self.social_benefit_list)
+
     def add_social_benefit(self,social_benefit: SocialBenefit) -> None:
 
         '''
-        Adds a social benefit to the dataset.
+        Adds a social benefit to the dataset, which gives it the smallest id not taken by another social benefit, see _assign_id.
 
         Parameters:
         - social_benefit (SocialBenefit): The social benefit to add.
@@ -69,13 +180,14 @@ class DataSet:
 
 
         self.social_benefit_list.append(social_benefit)
-        self.set_relevant_attributes()
+        self._social_benefits.setdefault(social_benefit.name, social_benefit)
+        self._assign_id(social_benefit)
         print(f"Social Benefit {social_benefit.name} successfully added.")
 
     def remove_social_benefit(self,social_benefit: SocialBenefit) -> None:
 
         '''
-        Removes a social benefit from the dataset.
+        Removes a social benefit from the dataset. Its id is given to the next social benefit added, the social benefit keeps it until then.
 
         Parameters:
         - social_benefit (SocialBenefit): The social benefit to remove.
@@ -83,7 +195,8 @@ class DataSet:
         '''
 
         self.social_benefit_list.remove(social_benefit)
-        self.set_relevant_attributes()
+        self._unindex_social_benefit(social_benefit)
+        del self._social_benefit_ids[social_benefit.id]
         print(f"Social Benefit {social_benefit.name} successfully removed.")
 
     def add_attribute(self,attribute: Attribute) -> None:
@@ -99,22 +212,114 @@ class DataSet:
         if self.check_attribute_title(attribute.title):
             print(f"Attribute {attribute.title} already exists.")
             return
-        self.attributes.append(attribute)
+        self.attribute_list.append(attribute)
+        self._attributes[attribute.title] = attribute
 
-    def remove_attribute(self,attribute: Attribute):
+    def remove_attribute(self,attribute: Attribute) -> List[SocialBenefit]:
         '''
         Removes an attribute from the dataset.
 
         Parameters:
         - attribute (Attribute): The attribute to remove.
 
+        Returns:
+        List[SocialBenefit]: The social benefits whose requirements changed because they referenced the attribute.
+
         '''
 
         self.attribute_list.remove(attribute)
+        del self._attributes[attribute.title]
+        changed_social_benefits = []
         for social_benefit in self.social_benefit_list:
+            requirement = social_benefit.export()
             social_benefit.remove_requirement_by_attribute(attribute)
+            if social_benefit.export() != requirement:
+                changed_social_benefits.append(social_benefit)
         print(f"Attribute {attribute.title} successfully removed.")
+        return changed_social_benefits
     
+    def rename_attribute(self,attribute: Attribute,title: str) -> None:
+
+        '''
+        Changes the title of an attribute.
+
+        Parameters:
+        - attribute (Attribute): The attribute to rename.
+        - title (str): The new title, which must not be taken by another attribute.
+
+        '''
+
+        del self._attributes[attribute.title]
+        attribute.title = title
+        self._attributes[title] = attribute
+        self.invalidate_attribute(attribute)
+
+    def rename_social_benefit(self,social_benefit: SocialBenefit,name: str) -> None:
+
+        '''
+        Changes the name of a social benefit.
+
+        Parameters:
+        - social_benefit (SocialBenefit): The social benefit to rename.
+        - name (str): The new name.
+
+        '''
+
+        self._unindex_social_benefit(social_benefit)
+        social_benefit.name = name
+        social_benefit.invalidate()
+        self._social_benefits.setdefault(name, social_benefit)
+
+    def _assign_id(self,social_benefit: SocialBenefit) -> None:
+
+        '''
+        Gives a social benefit the smallest id no other social benefit of the dataset has, reusing the ids of removed social benefits.
+        The bitmasks of social benefits, as held by the leaves of the decision tree, are as wide as the largest id, so they stay as narrow as the dataset.
+
+        Parameters:
+        - social_benefit (SocialBenefit): The social benefit to give an id.
+
+        '''
+
+        social_benefit_id = 0
+        while social_benefit_id in self._social_benefit_ids:
+            social_benefit_id += 1
+        if social_benefit.id != social_benefit_id:
+            # the constellations are labelled with the id
+            social_benefit.id = social_benefit_id
+            social_benefit.invalidate()
+        self._social_benefit_ids[social_benefit_id] = social_benefit
+
+    def _unindex_social_benefit(self,social_benefit: SocialBenefit) -> None:
+
+        '''
+        Removes a social benefit from the name index, which then points to the next social benefit with the same name if there is one.
+
+        Parameters:
+        - social_benefit (SocialBenefit): The social benefit to remove from the index.
+
+        '''
+
+        if self._social_benefits.get(social_benefit.name) is not social_benefit:
+            return
+        del self._social_benefits[social_benefit.name]
+        for other_social_benefit in self.social_benefit_list:
+            if other_social_benefit is not social_benefit and other_social_benefit.name == social_benefit.name:
+                self._social_benefits[social_benefit.name] = other_social_benefit
+                break
+
+    def invalidate_attribute(self,attribute: Attribute) -> None:
+        '''
+        Discards the cached constellations of all requirements on the attribute, after its title, answer options or bounds changed.
+
+        Parameters:
+        - attribute (Attribute): The changed attribute.
+
+        '''
+
+        for social_benefit in self.social_benefit_list:
+            social_benefit.requirement.invalidate_attribute(attribute)
+
     def check_attribute_title(self,title: str) -> bool:
 
         '''
@@ -127,7 +332,4 @@ class DataSet:
         bool: True if an attribute with the given title exists, False otherwise.
 
         '''
-        for attribute in self.attribute_list:
-            if attribute.title == title:
-                return True
-        return False
\ No newline at end of file
+        return title in self._attributes
\ No newline at end of file
@@ -1,4 +1,5 @@
 import json
+import hashlib
 from src.attribute import Attribute_Numerical, Attribute_Categorical,Attribute
 from src.socialBenefit import SocialBenefit
 from src.requirement import Logical_AND, Logical_OR, Requirement_Categorical, Requirement_Numerical, Requirement
@@ -44,6 +45,8 @@ def load_social_benefits_from_json(json_data: List[Dict], attribute_list: List[A
     List[SocialBenefit]: A list of SocialBenefit objects.
     """
 
+    attributes = {attribute.title: attribute for attribute in attribute_list}
+
     def from_json(json_data: Dict) -> 'Requirement':
         # Factory method to instantiate the correct type based on the 'type' field in JSON
         type_mapping = {
@@ -63,11 +66,11 @@ def load_social_benefits_from_json(json_data: List[Dict], attribute_list: List[A
 
     # Constructor function for categorical requirements
     def requirement_categorical_from_json(json_data: Dict) -> 'Requirement_Categorical':
-        return Requirement_Categorical(attribute=get_attribute_from_title(json_data['title'],attribute_list), required_value=json_data['required_value'])
+        return Requirement_Categorical(attribute=attributes.get(json_data['title']), required_value=json_data['required_value'])
 
     # Constructor function for numerical requirements
     def requirement_numerical_from_json(json_data: Dict) -> 'Requirement_Numerical':
-        return Requirement_Numerical(attribute=get_attribute_from_title(json_data['title'], attribute_list), comparison_operator=json_data['comparison_operator'], required_value=json_data['required_value'])
+        return Requirement_Numerical(attribute=attributes.get(json_data['title']), comparison_operator=json_data['comparison_operator'], required_value=json_data['required_value'])
 
     # Constructor function for logical OR requirements
     def logical_or_from_json(json_data: Dict) -> 'Logical_OR':
@@ -83,13 +86,6 @@ def load_social_benefits_from_json(json_data: List[Dict], attribute_list: List[A
             req.parent = requirement    
         return requirement
     
-    # Helper function to get an attribute from the attribute list based on its title
-    def get_attribute_from_title(title: str,attribute_list) -> Attribute:
-        for attribute in attribute_list:
-            if attribute.title == title:
-                return attribute
-        return None
-
     return [SocialBenefit(v['name'], from_json(v['requirements'])) for v in json_data]
 
 def load_attributes_from_json(json_data: List[Dict]) -> List[Attribute]:
@@ -127,22 +123,25 @@ def load_attributes_from_json(json_data: List[Dict]) -> List[Attribute]:
     
     # Constructor function for numerical attributes
     def attribute_numerical_from_json(json_data: Dict) -> 'Attribute_Numerical':
-        # Instantiate and return an Attribute_Numerical object
-        return Attribute_Numerical(json_data['title'], json_data['question'], json_data['min'], json_data['max'])
+        # Instantiate and return an Attribute_Numerical object, the default data leaves out the range of its attributes
+        return Attribute_Numerical(json_data['title'], json_data['question'], json_data.get('min', Attribute_Numerical.default_min), json_data.get('max', Attribute_Numerical.default_max))
 
     # Use list comprehension with the factory method to instantiate attributes based on their type
     return [from_json(attribute) for attribute in json_data]
 
 
-def export_data_to_json(attribute_list:List[Attribute], social_benefits_list:List[SocialBenefit]) -> None:
+def get_export_data(attribute_list:List[Attribute], social_benefits_list:List[SocialBenefit]) -> Dict:
     """
-    Exports the provided attributes and social benefits to a JSON file.
+    Returns the provided attributes and social benefits in the structure of the exported JSON file.
 
     Parameters:
     - attribute_list (List[Attribute]): A list of attributes to export.
     - social_benefits_list (List[SocialBenefit]): A list of social benefits to export.
+
+    Returns:
+    Dict: The data of the exported JSON file.
     """
-    data = {
+    return {
         'attributes': [
             attribute.export() for attribute in attribute_list
         ],
@@ -151,6 +150,30 @@ def export_data_to_json(attribute_list:List[Attribute], social_benefits_list:Lis
         ]
     }
 
+def get_data_hash(attribute_list:List[Attribute], social_benefits_list:List[SocialBenefit]) -> str:
+    """
+    Returns a content hash of the exported attributes and social benefits, which changes with every edit of the data.
+
+    Parameters:
+    - attribute_list (List[Attribute]): A list of attributes.
+    - social_benefits_list (List[SocialBenefit]): A list of social benefits.
+
+    Returns:
+    str: The SHA-256 hex digest of the exported data.
+    """
+    data = json.dumps(get_export_data(attribute_list, social_benefits_list), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+def export_data_to_json(attribute_list:List[Attribute], social_benefits_list:List[SocialBenefit]) -> None:
+    """
+    Exports the provided attributes and social benefits to a JSON file.
+
+    Parameters:
+    - attribute_list (List[Attribute]): A list of attributes to export.
+    - social_benefits_list (List[SocialBenefit]): A list of social benefits to export.
+    """
+    data = get_export_data(attribute_list, social_benefits_list)
+
     file_path = './data/exported_data/exported_data.json'
 
     with open(file_path, 'w',encoding='utf-8') as json_file:
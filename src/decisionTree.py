@@ -1,10 +1,17 @@
-from typing import Any, List, Optional, Tuple, Dict
+from typing import Any, Callable, Hashable, Iterator, List, Optional, Tuple, Dict, Union
 from src.treeNode import TreeNode
 from src.dataset import DataSet
-from math import log2
-from collections import Counter
-from src.attribute import Attribute, Attribute_Numerical, Attribute_Categorical
+from src.constellation import Constellation_Union, ConstellationView, CompatibilityFunction
+from src.socialBenefit import SocialBenefit
+from src.constellationBitset import ConstellationBitset
+from src.intervalIndex import IntervalIndex
+from src.flatTree import FlatTree, NO_CHILD
+import src.modelIo as model_io
+from src.attribute import Attribute, Attribute_Numerical
 import pandas as pd
+import numpy as np
+import hashlib
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 
 class DecisionTree:
     '''
@@ -15,43 +22,147 @@ class DecisionTree:
     - root (TreeNode): The root node of the decision tree.
     - max_depth (Optional[int]): The maximum depth of the tree. None for no limit.
     - current_max_depth (int): The current maximum depth of the tree.
-    - leaf_depths (List[int]): A list of all leaf depths in the tree.
+    - leaf_depths (List[int]): A list of all leaf depths in the tree. Both are counted by a fit and collected from the tree on first use after a load or a patch.
+    - engine (str): How the remaining constellations are tracked, 'view' for row indices per table, 'bitset' for a packed bitset of rows.
 
     Methods:
-    - fit(): Fits the decision tree on the training data.
-    - _build_tree(dataframe, depth, single_step): Recursively builds the decision tree from the training data.
+    - fit(workers, parallel_depth): Fits the decision tree on the training data, optionally building subtrees in a process pool.
+    - fit_to_file(file_path): Fits the decision tree and streams its nodes to a model file while it is built.
+    - _print_summary(): Prints the depths and the number of leaves of the fitted tree.
+    - close(): Shuts down the pool scoring the candidate attributes of splits.
+    - _get_split_executor(): Gets the pool scoring the candidate attributes of splits, starting it on first use.
+    - save(file_path): Saves the fitted decision tree to a model file, stamped with the hash of the dataset.
+    - load(file_path): Loads the decision tree from a model file if it was fitted on the current dataset.
+    - load_or_fit(file_path, workers, parallel_depth): Loads the decision tree from a model file, or fits and saves it.
+    - add_social_benefit(social_benefit): Patches the fitted tree for a social benefit that was added to the dataset.
+    - remove_social_benefit(social_benefit): Patches the fitted tree for a social benefit that was removed from the dataset.
+    - update_social_benefit(social_benefit): Patches the fitted tree for a social benefit whose requirements were edited.
+    - remove_attribute(attribute, changed_social_benefits): Patches the fitted tree for an attribute that was removed from the dataset.
+    - _add_social_benefits(social_benefits): Patches the fitted tree for social benefits that were added to the dataset.
+    - _remove_social_benefits(mask): Removes social benefits from the leaves of the tree and collapses nodes whose children became equivalent.
+    - _share_patched_node(node, patched): Gets the node that replaces a node of the tree after a patch, sharing the children of the patched node.
+    - _insert_social_benefit(node, dataframe, social_benefit_constellations, depth, patched, subtrees): Passes the constellations of added social benefits down a subtree, rebuilding the leaves they reach.
+    - _remove_social_benefit(node, mask, patched, keys): Removes social benefits from the leaves of a subtree and collapses nodes whose children became equivalent.
+    - _covers_answers(node): Tells whether every answer to the attribute of a node leads to a child.
+    - _remove_attribute_nodes(node, attribute, patched): Replaces the nodes of a subtree splitting on the given attribute by their first child.
+    - _discard_leaf_depths(): Discards the leaf depths and the maximum depth, which are collected again on first use.
+    - _update_leaf_depths(): Collects the leaf depths and the maximum depth from the tree.
+    - get_constellations(): Gets the constellations of the dataset in the representation of the engine.
+    - _build_tree(dataframe, depth, subtrees): Builds the decision tree from the training data.
+    - _iterate_tree(dataframe, depth, release, subtrees): Builds the decision tree with an explicit stack, sharing equal subtrees and yielding every node once it is finished.
+    - _get_state_key(dataframe, depth): Gets a key that is equal for constellations leading to the same subtree.
+    - _share_subtree(node, node_depth, first_leaf, last_leaf, depth): Gets a node for a subtree that was already built, sharing its children.
+    - _start_node(dataframe, depth): Creates a leaf or the node splitting on the best attribute.
+    - _build_tree_parallel(workers, parallel_depth): Builds the first levels of the decision tree in this process and the subtrees below them in a process pool.
+    - _submit_subtrees(dataframe, depth, levels, executor, subtrees): Builds the given number of levels and submits the subtrees below them to the process pool.
+    - _adopt_subtree(node, children_keys, shared_children): Replaces the attributes of a subtree built in another process by the attributes of the dataset and shares equal subtrees.
     - _calculate_leaf_node(dataframe, depth): Calculates the leaf node of the decision tree based on the given dataset.
+    - get_social_benefits(dataframe): Gets the bitmask of the social benefits with remaining constellations.
     - _entropy(dataframe): Calculates the entropy of the given dataset.
     - _gain_ratio(dataframe, attribute_name, current_entropy): Calculates the gain ratio of the given attribute in the given dataset.
-    - _check_numeric_range_or_nan(row, attribute_name, value): Checks if the given row falls within the given numeric range or is NaN.
+    - _get_column_titles(dataframe): Gets for each column of the given dataset the title of the attribute it belongs to.
     - _find_best_split_attribute(dataframe): Finds the best attribute to split on based on the given dataset.
-    - _split(dataframe, attribute): Splits the data into two subsets based on the given feature and threshold.
+    - _get_column_attributes(dataframe): Gets a matrix assigning the columns of the given dataset to their attributes.
+    - _score_split_attribute(dataframe, attribute, titles, column_attributes): Scores a split by the average number of attributes that remain after it.
+    - _split(dataframe, attribute): Splits the data into one subset per possible answer for the given attribute.
+    - _create_node(dataframe, attribute): Creates the node splitting on the given attribute.
+    - _get_numerical_bounds(dataframe, attribute): Gets the distinct lower and upper bounds of the given numerical attribute.
+    - _get_elementary_bounds(dataframe, attribute): Gets the sorted bounds of a numerical attribute over all constellations, which cut its range into elementary intervals.
+    - _get_interval_index(dataframe, attribute): Gets the index of all constellations by the answers to a numerical attribute they match.
+    - _get_piece_values(dataframe, attribute): Gets an answer for every piece the elementary bounds of a numerical attribute cut its answers into.
+    - _get_split_values(dataframe, attribute): Gets the answers the given attribute is split by.
+    - _get_attribute_columns(attribute): Gets the columns carrying the given attribute.
+    - _count_non_null(dataframe, attribute, values): Counts the rows and the values per active column that remain for each of the given answers.
+    - _get_compatibility_function(attribute, values): Gets a function that tells which rows of a dataframe match each of the given answers.
+    - _get_answer_keys(dataframe, attribute, values): Gets keys under which answers with the same compatible rows are cached.
     - _reduce_dataframe(dataframe, attribute, value): Reduces the given dataset by removing the given feature.
-    - get_interval_values(expressions, attribute): Gets the interval values for the given attribute based on the given expressions.
-    - predict(X): Predicts the class labels or target values for the given input samples.
+    - _get_interval_values(lower_codes, upper_codes, piece_values, attribute): Gets the interval values for the given attribute based on the given bounds.
+    - predict(answers): Predicts the social benefits of a single applicant by walking the tree.
+    - walk(get_answer): Asks for the answers along the tree like the dialogue, continuing without the tree if an answer leads to no child.
+    - predict_batch(applicants): Predicts the social benefits of many applicants at once on the flattened tree.
+    - _get_flat_tree(): Gets the tree flattened into arrays, flattening it on first use after a change.
     '''
 
-    def __init__(self, dataset:DataSet,max_depth: Optional[int] = None):
+    engines = ('view', 'bitset')
+    model_path = 'data/exported_data/model.json'
+    split_pools = ('thread', 'process')
+
+    def __init__(self, dataset:DataSet,max_depth: Optional[int] = None, engine: str = 'view', split_workers: Optional[int] = None, split_pool: str = 'thread'):
         """Initializes a DecisionTree.
 
         Keyword arguments:
         max_depth: The maximum depth of the tree. None for no limit.
+        engine: 'view' to track the remaining constellations as row indices per table, 'bitset' to track them as a packed bitset of rows.
+            The CLI uses the default, the engines are only chosen to compare them, see benchmark.py.
+        split_workers: The number of workers scoring the candidate attributes of a split concurrently. None or 1 to score them one after another.
+        split_pool: 'thread' to score in threads, which run in parallel while NumPy releases the GIL, 'process' to score in processes.
         """
+        if engine not in self.engines:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(self.engines)}.")
+        if split_pool not in self.split_pools:
+            raise ValueError(f"Unknown split pool '{split_pool}', expected one of {', '.join(self.split_pools)}.")
+
         self.dataset = dataset
         self.root = None
         self.max_depth = max_depth
-        self.current_max_depth = 0
-        self.leaf_depths = []
+        # collected from the tree on first use after it was loaded or patched, see leaf_depths
+        self._current_max_depth: Optional[int] = 0
+        self._leaf_depths: Optional[List[int]] = []
+        self.engine = engine
+        self.split_workers = split_workers
+        self.split_pool = split_pool
+        self._split_executor = None
+        self._numerical_bounds = {}
+        self._interval_indices = {}
+        self._piece_values = {}
+        # the tree flattened for predict_batch, reset whenever the tree changes
+        self._flat_tree = None
 
-    def fit(self) -> None:
+    def fit(self, workers: Optional[int] = None, parallel_depth: int = 2) -> None:
         
         """Fits the decision tree on the training data.
 
+        The subtrees below the first parallel_depth levels are independent of each other and are built in a process pool if workers is greater than one.
+        The pool receives the dataset once, without its cached constellations, which every worker rebuilds, and every subtree only as the encoded rows and columns remaining at its root.
+        The subtrees are merged in the order of the serial build, so the tree is the same for any number of workers.
+
+        Args:
+            workers: The number of processes building subtrees. None or 1 to build the tree in this process.
+            parallel_depth: The number of levels built in this process before the subtrees are handed to the pool.
+        """
+        self.leaf_depths, self.current_max_depth = [], 0
+        try:
+            if workers is None or workers <= 1:
+                self.root = self._build_tree(self.get_constellations(),depth=1)
+            else:
+                self.root = self._build_tree_parallel(workers, parallel_depth)
+        finally:
+            self.close()
+        self._flat_tree = None
+
+        self._print_summary()
+
+    def fit_to_file(self, file_path: str = model_path) -> None:
+        """Fits the decision tree and streams its nodes to a model file while it is built, instead of keeping the whole tree in memory.
+
+        Equal subtrees are built and written once and shared by their parents, see _iterate_tree. Only the nodes on the path to the current node
+        and the positions of the finished subtrees are kept in memory while the tree is built. The tree is not kept after the fit, it can be loaded from the file with load.
+
         Args:
-            X: The training input samples. Each entry is a list of feature values.
-            y: The target values (class labels for classification, real numbers for regression).
+            file_path: The path of the model file.
         """
-        self.root = self._build_tree(self.dataset.get_dataframes(),depth=1)
+        self.leaf_depths, self.current_max_depth = [], 0
+        try:
+            model_io.export_nodes_to_json(self._iterate_tree(self.get_constellations(), 1, release=True), self.dataset.get_hash(), self.max_depth, self.dataset.social_benefit_list, file_path)
+        finally:
+            self.close()
+        self.root = None
+        self._flat_tree = None
+
+        self._print_summary()
+
+    def _print_summary(self) -> None:
+        """Prints the depths and the number of leaves of the fitted tree."""
 
         average_depth = sum(self.leaf_depths)/len(self.leaf_depths)
 
@@ -60,48 +171,744 @@ class DecisionTree:
         print(f"Average depth: {average_depth}")
         print(f"Total leaf nodes: {len(self.leaf_depths)}")
 
+    def save(self, file_path: str = model_path) -> None:
+        """Saves the fitted decision tree to a model file, stamped with the hash of the dataset.
 
-    def _build_tree(self,dataframe,  depth: int ) -> TreeNode:
+        Args:
+            file_path: The path of the model file.
+        """
+        model_io.export_tree_to_json(self.root, self.dataset.get_hash(), self.max_depth, self.dataset.social_benefit_list, file_path)
 
-        # pre-pruning
-        if self.max_depth is not None and depth >= self.max_depth:
-            return self._calculate_leaf_node(dataframe,depth)
-        
+    def load(self, file_path: str = model_path) -> bool:
+        """Loads the decision tree from a model file if it was fitted on the current dataset with the same maximum depth.
 
-        #if the dataset is either empty or contains only class labels, return a leaf node with all class label
-        if len(dataframe) == 0 or len(dataframe.columns) == 1:
-            return self._calculate_leaf_node(dataframe,depth)
-        
-        best_attribute = self._find_best_split_attribute(dataframe)
+        Args:
+            file_path: The path of the model file.
 
-        if best_attribute is None:
-            return self._calculate_leaf_node(dataframe,depth)
-        
-        # create a new tree node with the best attribute
-        node = TreeNode(attribute=best_attribute)
+        Returns:
+            True if the tree was loaded, False if it has to be fitted.
+        """
+        root = model_io.load_tree_from_json(file_path, self.dataset.get_hash(), self.max_depth, self.dataset.attribute_list, self.dataset.social_benefit_list)
+        if root is None:
+            return False
+
+        self.root = root
+        self._flat_tree = None
+        self._discard_leaf_depths()
+        return True
+
+    def load_or_fit(self, file_path: str = model_path, workers: Optional[int] = None, parallel_depth: int = 2) -> None:
+        """Loads the decision tree from a model file, or fits it and saves it to the file if the file does not match the dataset.
+
+        Args:
+            file_path: The path of the model file.
+            workers: The number of processes building subtrees, see fit.
+            parallel_depth: The number of levels built in this process, see fit.
+        """
+        if self.load(file_path):
+            print(f"Tree loaded from {file_path}.")
+            return
+        self.fit(workers=workers, parallel_depth=parallel_depth)
+        self.save(file_path)
+
+    def predict(self, answers: Dict[str, Any]) -> Optional[int]:
+        """Predicts the social benefits of a single applicant by walking the tree along the answers.
+
+        The split values of a numerical attribute don't cover every piece of its thresholds, and an answer in a piece without a child
+        leads to no leaf, like in the dialogue. Then the social benefits are checked against their requirements instead, see DataSet.get_eligible_social_benefits.
+
+        Args:
+            answers: The answers of the applicant per attribute title, numbers for numerical attributes and answer options for categorical ones.
+
+        Returns:
+            The bitmask of the social benefits the applicant is eligible for, see get_social_benefits, None if an answer the tree asks for is missing.
+        """
+        node = self.root
+        while node.attribute is not None:
+            answer = answers.get(node.attribute.title)
+            if answer is None:
+                return None
+            node = node.get_child(answer)
+            if node is None:
+                return sum(1 << social_benefit.id for social_benefit in self.dataset.get_eligible_social_benefits(answers))
+        return node.social_benefits
+
+    def walk(self, get_answer: Callable[[Attribute], Any]) -> int:
+        """Asks for the answers along the tree until a leaf is reached, like the dialogue does.
+
+        If an answer leads to no child, the walk continues without the tree: the constellations are reduced by the answers given so far
+        and split on the best attribute after every further answer until only the social benefit column is left.
+
+        Args:
+            get_answer: A function asking for the answer to an attribute, returning None if the answer was invalid and has to be asked again.
+
+        Returns:
+            The bitmask of the social benefits the answers lead to, see get_social_benefits.
+        """
+        node = self.root
+        answers = []
+        while node.attribute is not None:
+            answer = get_answer(node.attribute)
+            if answer is None:
+                continue
+            answers.append((node.attribute, answer))
+            child = node.get_child(answer)
+            if child is None:
+                break
+            node = child
+
+        if node.attribute is None:
+            return node.social_benefits
+
+        # the constellations stay factorized, they are never expanded into a dataframe
+        dataframe = self.get_constellations()
+        for attribute, answer in answers:
+            dataframe = self._reduce_dataframe(dataframe, attribute, answer)
+
+        try:
+            while len(dataframe.columns) > 1:
+                best_attribute = self._find_best_split_attribute(dataframe)
+                if best_attribute is None:
+                    break
+                answer = get_answer(best_attribute)
+                if answer is None:
+                    continue
+                dataframe = self._reduce_dataframe(dataframe, best_attribute, answer)
+        finally:
+            self.close()
+
+        return self.get_social_benefits(dataframe)
+
+    def predict_batch(self, applicants: Union[pd.DataFrame, Dict[str, List]]) -> np.ndarray:
+        """Predicts the social benefits of many applicants at once.
+
+        The tree is flattened into arrays once, see FlatTree, and all applicants are passed down one level at a time with vectorized lookups.
+        The applicants whose answers lead to no child are checked against the requirements at once, see DataSet.get_eligibility.
+
+        Args:
+            applicants: The answers of the applicants, one column per attribute title and one row per applicant.
+
+        Returns:
+            An object array with the bitmask of the social benefits per applicant, like predict, None where an answer the tree asks for is missing.
+        """
+        applicants = pd.DataFrame(applicants)
+        flat_tree = self._get_flat_tree()
+        leaves = flat_tree.get_leaves(applicants)
+        predictions = flat_tree.get_social_benefits(leaves)
+
+        unmatched = np.flatnonzero(leaves == NO_CHILD)
+        if len(unmatched) > 0:
+            masks = np.array([1 << social_benefit.id for social_benefit in self.dataset.social_benefit_list], dtype=object)
+            eligibility = self.dataset.get_eligibility(applicants.iloc[unmatched])
+            predictions[unmatched] = np.where(eligibility, masks, 0).sum(axis=1)
+        return predictions
+
+    def _get_flat_tree(self) -> FlatTree:
+        """Gets the tree flattened into arrays, flattening it on first use after the tree changed.
+
+        Returns:
+            The flattened tree.
+        """
+        if self._flat_tree is None:
+            self._flat_tree = FlatTree(self.root)
+        return self._flat_tree
+
+    def add_social_benefit(self, social_benefit: SocialBenefit) -> None:
+        """Patches the fitted tree for a social benefit that was added to the dataset.
+
+        Args:
+            social_benefit: The added social benefit.
+        """
+        self._add_social_benefits([social_benefit])
+        self._flat_tree = None
+        self._discard_leaf_depths()
+
+    def _add_social_benefits(self, social_benefits: List[SocialBenefit]) -> None:
+        """Patches the fitted tree for social benefits that were added to the dataset.
+
+        The constellations of the social benefits are passed down the existing splits together and only the subtrees they reach are rebuilt, see _insert_social_benefit.
+        The nodes on the way are copied instead of changed, so subtrees shared by several parents stay shared where the patch reaches them the same way.
+
+        Args:
+            social_benefits: The added social benefits.
+        """
+        if not social_benefits:
+            return
+        # the subtrees built by the patch count their leaves apart from the tree, whose leaf depths are collected again on first use
+        self.leaf_depths, self.current_max_depth = [], 0
+        social_benefit_constellations = ConstellationView(Constellation_Union([social_benefit.get_constellation() for social_benefit in social_benefits]))
+        try:
+            patched = self._insert_social_benefit(self.root, self.get_constellations(), social_benefit_constellations, 1, {}, {})
+        finally:
+            self.close()
+        self.root = self._share_patched_node(self.root, patched)
+
+    def remove_social_benefit(self, social_benefit: SocialBenefit) -> None:
+        """Patches the fitted tree for a social benefit that was removed from the dataset.
+
+        The social benefit is removed from the leaves and nodes whose children became equivalent are replaced by their first child.
+        A renamed social benefit needs no patch, the leaves refer to social benefits by their ids.
+
+        Args:
+            social_benefit: The removed social benefit.
+        """
+        self._remove_social_benefits(1 << social_benefit.id)
+        self._flat_tree = None
+        self._discard_leaf_depths()
+
+    def update_social_benefit(self, social_benefit: SocialBenefit) -> None:
+        """Patches the fitted tree for a social benefit whose requirements were edited.
+
+        Args:
+            social_benefit: The edited social benefit.
+        """
+        self._remove_social_benefits(1 << social_benefit.id)
+        self._add_social_benefits([social_benefit])
+        self._flat_tree = None
+        self._discard_leaf_depths()
+
+    def remove_attribute(self, attribute: Attribute, changed_social_benefits: List[SocialBenefit]) -> None:
+        """Patches the fitted tree for an attribute that was removed from the dataset.
+
+        The social benefits that referenced the attribute are taken out of the tree, the nodes splitting on the attribute are replaced by their first child,
+        which is equivalent to the others once no constellation references the attribute, and the changed social benefits are passed down the tree again.
+
+        Args:
+            attribute: The removed attribute.
+            changed_social_benefits: The social benefits whose requirements changed, as returned by DataSet.remove_attribute.
+        """
+        self._remove_social_benefits(sum(1 << social_benefit.id for social_benefit in changed_social_benefits))
+        self.root = self._share_patched_node(self.root, self._remove_attribute_nodes(self.root, attribute, {}))
+        self._add_social_benefits(changed_social_benefits)
+        self._flat_tree = None
+        self._discard_leaf_depths()
+
+    def _remove_social_benefits(self, mask: int) -> None:
+        """Removes social benefits from the leaves of the tree and replaces nodes whose children became equivalent by their first child.
+
+        Args:
+            mask: The bits of the social benefits, see get_social_benefits.
+        """
+        if mask == 0:
+            return
+        patched, _ = self._remove_social_benefit(self.root, mask, {}, {})
+        self.root = self._share_patched_node(self.root, patched)
 
-        # split the dataset based on the best attribute
-        split_dataframes = self._split(dataframe,best_attribute)
+    def _share_patched_node(self, node: TreeNode, patched: Optional[TreeNode]) -> TreeNode:
+        """Gets the node that replaces a node of the tree after a patch, sharing the list of children of the patched node.
 
-        # recursively build the subtree
-        for reduced_dataframe in split_dataframes:
-            node.children.append(self._build_tree(reduced_dataframe, depth + 1))
+        The patches only visit the children of a node once, even if they are shared by several parents, and every parent gets a node of its own
+        for the patched children, which carries the answer leading to it, like the nodes sharing a subtree in _iterate_tree.
 
-        """Recursively builds the decision tree from the training data.
+        Args:
+            node: The node of the tree.
+            patched: The patched node, None if the patch left the node unchanged.
+
+        Returns:
+            The node itself if it is unchanged, otherwise a new node with the answer leading to the node.
+        """
+        if patched is None:
+            return node
+        return TreeNode(attribute=patched.attribute, social_benefits=patched.social_benefits, children=patched.children, value=node.value, thresholds=patched.thresholds)
+
+    def _insert_social_benefit(self, node: TreeNode, dataframe, social_benefit_constellations: ConstellationView, depth: int,
+                               patched: Dict[Hashable, Optional[TreeNode]], subtrees: Dict[Hashable, Tuple[Optional[TreeNode], int, int, int, int]]) -> Optional[TreeNode]:
+        """Passes the constellations of added social benefits down a subtree, rebuilding the leaves they reach.
+
+        A node on a numerical attribute whose thresholds don't include the bounds of the social benefits gets the bounds as further thresholds.
+        Its children keep standing for the answers they stood for, while the new pieces get a copy of the child of the old piece
+        if there was one, which the social benefits are passed down like the others, or else a subtree built from all constellations.
+
+        Args:
+            node: The root of the subtree.
+            dataframe: The constellations of the dataset at the root of the subtree, including the added social benefits.
+            social_benefit_constellations: The constellations of the added social benefits at the root of the subtree, not empty.
+            depth: The depth of the root of the subtree.
+            patched: The patched subtrees by the children of their root and the state of the constellations of the social benefits,
+                so a subtree shared by several parents is patched once for the same constellations.
+            subtrees: The subtrees built during the patch by the state at their root, see _iterate_tree.
+
+        Returns:
+            The root of the patched subtree without the answer leading to it, see _share_patched_node, None if the subtree is unchanged.
+        """
+
+        if node.attribute is None:
+            return self._build_tree(dataframe, depth, subtrees)
 
+        children = [(child, True) for child in node.children]
+        thresholds = node.thresholds
+        if isinstance(node.attribute, Attribute_Numerical):
+            lower_bounds, upper_bounds = self._get_numerical_bounds(social_benefit_constellations, node.attribute)
+            bounds = set(lower_bounds) | set(upper_bounds)
+            if not bounds <= set(node.thresholds):
+                thresholds = sorted(set(node.thresholds) | bounds)
+                refined_node = TreeNode(attribute=node.attribute, thresholds=thresholds)
+                pieces = {refined_node.get_piece(child.value) for child in node.children}
+                for value in self._get_split_values(dataframe, node.attribute):
+                    piece = refined_node.get_piece(value)
+                    if piece in pieces:
+                        continue
+                    pieces.add(piece)
+                    child = node.get_child(value)
+                    if child is not None:
+                        children.append((TreeNode(attribute=child.attribute, social_benefits=child.social_benefits, children=child.children, value=value, thresholds=child.thresholds), True))
+                    else:
+                        # a piece without constellations before, the subtree is built from all constellations, so nothing is left to pass down
+                        child = self._build_tree(self._reduce_dataframe(dataframe, node.attribute, value), depth + 1, subtrees)
+                        child.value = value
+                        children.append((child, False))
+                children.sort(key=lambda child: child[0].value)
 
+        patched_children = []
+        for child, insert in children:
+            reduced_social_benefit_constellations = self._reduce_dataframe(social_benefit_constellations, node.attribute, child.value) if insert else []
+            if len(reduced_social_benefit_constellations) > 0:
+                key = (id(child.children), self._get_state_key(reduced_social_benefit_constellations, depth + 1))
+                if key not in patched:
+                    patched[key] = self._insert_social_benefit(child, self._reduce_dataframe(dataframe, node.attribute, child.value), reduced_social_benefit_constellations, depth + 1, patched, subtrees)
+                child = self._share_patched_node(child, patched[key])
+            patched_children.append(child)
+
+        if thresholds is node.thresholds and all(child is old_child for child, old_child in zip(patched_children, node.children)):
+            return None
+        return TreeNode(attribute=node.attribute, children=patched_children, thresholds=thresholds)
+
+    def _remove_social_benefit(self, node: TreeNode, mask: int, patched: Dict[int, Tuple[Optional[TreeNode], int]], keys: Dict[Hashable, int]) -> Tuple[Optional[TreeNode], int]:
+        """Removes social benefits from the leaves of a subtree and replaces nodes whose children became equivalent by their first child.
+
+        Children are equivalent if their subtrees give the same results for all answers and every answer to the node leads to one of them, see _covers_answers.
 
         Args:
-            X: The training input samples at the current node.
-            y: The target values at the current node.
+            node: The root of the subtree.
+            mask: The bits of the social benefits, see get_social_benefits.
+            patched: The patched subtrees and their keys by the children of their root, so a subtree shared by several parents is patched once.
+            keys: The keys by the results of the subtrees, every key is the number of subtrees with other results found before.
+
+        Returns:
+            The root of the patched subtree without the answer leading to it, see _share_patched_node, None if the subtree is unchanged,
+            and a key that is equal for subtrees giving the same results for all answers.
+        """
+
+        if id(node.children) in patched:
+            return patched[id(node.children)]
+
+        if node.attribute is None:
+            social_benefits = node.social_benefits & ~mask
+            result = None if social_benefits == node.social_benefits else TreeNode(social_benefits=social_benefits)
+            patched[id(node.children)] = result, keys.setdefault((None, social_benefits), len(keys))
+            return patched[id(node.children)]
+
+        children = []
+        for child in node.children:
+            patched_child, key = self._remove_social_benefit(child, mask, patched, keys)
+            children.append((self._share_patched_node(child, patched_child), key))
+
+        if len(children) > 0 and all(key == children[0][1] for _, key in children) and self._covers_answers(node):
+            # if every answer leads to the same results, the question is not needed anymore
+            result, key = children[0]
+        else:
+            key = keys.setdefault((node.attribute.title, tuple(node.thresholds or ()), tuple((str(child.value), key) for child, key in children)), len(keys))
+            result = None if all(child is old_child for (child, _), old_child in zip(children, node.children)) else TreeNode(attribute=node.attribute, children=[child for child, _ in children], thresholds=node.thresholds)
+        patched[id(node.children)] = result, key
+        return result, key
+
+    def _covers_answers(self, node: TreeNode) -> bool:
+        """Tells whether every answer to the attribute of a node leads to a child.
+
+        The split values of a numerical attribute don't cover the pieces of the thresholds outside its range, and answers there lead to no child,
+        so they are checked against the requirements instead, see predict. A node with such pieces can't be replaced by a child even if all children give the same results.
+
+        Args:
+            node: The inner node.
+
+        Returns:
+            True if every piece of the thresholds of a numerical node, or every answer option of a categorical node, has a child.
+        """
+        if isinstance(node.attribute, Attribute_Numerical):
+            return len({node.get_piece(child.value) for child in node.children}) == 2 * len(node.thresholds) + 1
+        return set(node.attribute.answer_options) <= {child.value for child in node.children}
+
+    def _remove_attribute_nodes(self, node: TreeNode, attribute: Attribute, patched: Dict[int, Optional[TreeNode]]) -> Optional[TreeNode]:
+        """Replaces the nodes of a subtree splitting on the given attribute by their first child.
+
+        Unlike in _remove_social_benefit, pieces of a numerical attribute without a child don't keep the node: the attribute is not asked anymore,
+        so no answer falls into them. The children are equivalent once the social benefits referencing the attribute were removed, see remove_attribute.
+
+        Args:
+            node: The root of the subtree.
+            attribute: The attribute to remove.
+            patched: The patched subtrees by the children of their root, so a subtree shared by several parents is patched once.
+
+        Returns:
+            The root of the patched subtree without the answer leading to it, see _share_patched_node, None if the subtree is unchanged.
+        """
+
+        if id(node.children) not in patched:
+            if node.attribute is None:
+                result = None
+            elif node.attribute is attribute and len(node.children) > 0:
+                child = node.children[0]
+                result = self._share_patched_node(child, self._remove_attribute_nodes(child, attribute, patched))
+            else:
+                children = [self._share_patched_node(child, self._remove_attribute_nodes(child, attribute, patched)) for child in node.children]
+                result = None if all(child is old_child for child, old_child in zip(children, node.children)) else TreeNode(attribute=node.attribute, children=children, thresholds=node.thresholds)
+            patched[id(node.children)] = result
+        return patched[id(node.children)]
+
+    @property
+    def leaf_depths(self) -> List[int]:
+        """The depths of all leaves of the tree, every shared subtree counted once per parent, in the order of the leaves.
+
+        A fit counts the leaves while it builds them. After a load or a patch they are only collected from the tree when they are used, see _update_leaf_depths.
+        """
+        if self._leaf_depths is None:
+            self._update_leaf_depths()
+        return self._leaf_depths
+
+    @leaf_depths.setter
+    def leaf_depths(self, leaf_depths: List[int]) -> None:
+        self._leaf_depths = leaf_depths
+
+    @property
+    def current_max_depth(self) -> int:
+        """The maximum depth of the leaves of the tree, collected with leaf_depths."""
+        if self._current_max_depth is None:
+            self._update_leaf_depths()
+        return self._current_max_depth
+
+    @current_max_depth.setter
+    def current_max_depth(self, current_max_depth: int) -> None:
+        self._current_max_depth = current_max_depth
+
+    def _discard_leaf_depths(self) -> None:
+        """Discards the leaf depths and the maximum depth after the tree was loaded or patched, they are collected again on first use."""
+
+        self._leaf_depths = None
+        self._current_max_depth = None
+
+    def _update_leaf_depths(self) -> None:
+        """Collects the leaf depths and the maximum depth from the tree, walking every shared subtree once per parent."""
+
+        self._leaf_depths = []
+        nodes = [(self.root, 1)]
+        while nodes:
+            node, depth = nodes.pop()
+            if node.attribute is not None:
+                nodes.extend((child, depth + 1) for child in reversed(node.children))
+            else:
+                self._leaf_depths.append(depth)
+        self._current_max_depth = max(self._leaf_depths)
+
+    def _build_tree_parallel(self, workers: int, parallel_depth: int) -> TreeNode:
+        """Builds the first levels of the decision tree in this process and the subtrees below them in a process pool.
+
+        Args:
+            workers: The number of processes building subtrees.
+            parallel_depth: The number of levels built in this process.
+
+        Returns:
+            The root node of the constructed decision tree.
+        """
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker, initargs=(self.dataset, self.max_depth, self.engine)) as executor:
+            subtrees = []
+            root = self._submit_subtrees(self.get_constellations(), 1, parallel_depth, executor, subtrees)
+
+            # the subtrees were submitted in the order of the serial build, so their leaves are merged in that order,
+            # and equal subtrees built by different workers share the children of the first one like in the serial build
+            shared_children: Dict[Hashable, List[TreeNode]] = {}
+            for parent, future, value in subtrees:
+                if future is None:
+                    # a node built in this process, whose subtrees were all merged before, the value is the state at the node
+                    parent.children = shared_children.setdefault(value, parent.children)
+                    continue
+                subtree, leaf_depths, children_keys = future.result()
+                subtree = self._adopt_subtree(subtree, children_keys, shared_children)
+                subtree.value = value
+                if parent is None:
+                    root = subtree
+                else:
+                    parent.children[parent.children.index(future)] = subtree
+                self.leaf_depths.extend(leaf_depths)
+                self.current_max_depth = max([self.current_max_depth] + leaf_depths)
+
+        return root
+
+    def _submit_subtrees(self, dataframe, depth: int, levels: int, executor: ProcessPoolExecutor, subtrees: List[Tuple[Optional[TreeNode], Optional[Future], Any]]) -> Optional[TreeNode]:
+        """Builds the given number of levels like _build_tree and submits the subtrees below them to the process pool.
+
+        Nodes that end in a leaf within the levels are submitted as well, so all leaves are collected from the pool in the order of the serial build.
+        A submitted subtree is represented by its future among the children of its parent until it is merged.
+
+        Args:
+            dataframe: The constellations at the current node.
             depth: The current depth of the tree.
+            levels: The number of levels left to build in this process.
+            executor: The process pool.
+            subtrees: The parent, future and answer leading to every submitted subtree, and the node, None and the state of every node
+                built in this process once its children are submitted, see _get_state_key, in the order of the serial build.
+
+        Returns:
+            The node at the current depth, None if the node itself was submitted.
+        """
+
+        best_attribute = None
+        if levels > 0 and not (self.max_depth is not None and depth >= self.max_depth) and len(dataframe) > 0 and len(dataframe.columns) > 1:
+            best_attribute = self._find_best_split_attribute(dataframe)
+
+        if best_attribute is None:
+            subtrees.append((None, executor.submit(_build_subtree, dataframe.encode(), depth), None))
+            return None
+
+        node = self._create_node(dataframe, best_attribute)
+        for value, reduced_dataframe in self._split(dataframe, best_attribute):
+            child = self._submit_subtrees(reduced_dataframe, depth + 1, levels - 1, executor, subtrees)
+            if child is None:
+                _, child, _ = subtrees[-1]
+                subtrees[-1] = (node, child, value)
+            else:
+                child.value = value
+            node.children.append(child)
+        subtrees.append((node, None, self._get_state_key(dataframe, depth)))
+        return node
+
+    def _adopt_subtree(self, node: TreeNode, children_keys: List[Tuple[List[TreeNode], Hashable]], shared_children: Dict[Hashable, List[TreeNode]]) -> TreeNode:
+        """Replaces the attributes of a subtree built in another process by the attributes of the dataset with the same title,
+        and lets its nodes share the children of equal subtrees adopted before.
+
+        The subtree is walked with an explicit stack and every list of children is visited once, even if it is shared by several nodes.
+
+        Args:
+            node: The root of the subtree.
+            children_keys: The lists of children of the subtree with the state at their parent, see _get_state_key.
+            shared_children: The lists of children of the subtrees adopted before by the state at their parent, which gets the lists of this subtree.
+
+        Returns:
+            The root of the subtree.
+        """
+        keys = {id(children): key for children, key in children_keys}
+        adopted: Dict[int, List[TreeNode]] = {}
+        nodes = [node]
+        while nodes:
+            current = nodes.pop()
+            if current.attribute is not None:
+                current.attribute = self.dataset.get_attribute_from_title(current.attribute.title)
+            children_id = id(current.children)
+            if children_id not in adopted:
+                key = keys.get(children_id)
+                if key in shared_children:
+                    adopted[children_id] = shared_children[key]
+                else:
+                    adopted[children_id] = current.children
+                    if key is not None:
+                        shared_children[key] = current.children
+                    nodes.extend(current.children)
+            current.children = adopted[children_id]
+        return node
+
+    def close(self) -> None:
+        """Shuts down the pool scoring the candidate attributes of splits, if one was started."""
+        if self._split_executor is not None:
+            self._split_executor.shutdown()
+            self._split_executor = None
+
+    def _get_split_executor(self) -> Optional[Executor]:
+        """Gets the pool scoring the candidate attributes of splits, starting it on first use.
+
+        Returns:
+            The pool, None if the candidates are scored one after another.
+        """
+        if self.split_workers is None or self.split_workers <= 1:
+            return None
+        if self._split_executor is None:
+            if self.split_pool == 'thread':
+                self._split_executor = ThreadPoolExecutor(max_workers=self.split_workers)
+            else:
+                self._split_executor = ProcessPoolExecutor(max_workers=self.split_workers, initializer=_initialize_worker, initargs=(self.dataset, self.max_depth, self.engine))
+        return self._split_executor
+
+    def get_constellations(self) -> Union[ConstellationView, ConstellationBitset]:
+        """Gets the constellations of the dataset in the representation of the engine.
+
+        Returns:
+            A ConstellationView for the 'view' engine, a ConstellationBitset for the 'bitset' engine.
+        """
+
+        # the bounds of the numerical attributes may have changed with the dataset, they are collected once for all nodes
+        self._numerical_bounds = {}
+        self._interval_indices = {}
+        self._piece_values = {}
+
+        constellations = self.dataset.get_dataframes(materialize=False)
+        for attribute in self.dataset.attribute_list:
+            if isinstance(attribute, Attribute_Numerical):
+                self._get_interval_index(constellations, attribute)
+                self._get_piece_values(constellations, attribute)
+
+        if self.engine == 'bitset':
+            return ConstellationBitset(constellations.constellation)
+        return constellations
+
+    def _build_tree(self, dataframe, depth: int, subtrees: Optional[Dict[Hashable, Tuple[Optional[TreeNode], int, int, int, int]]] = None) -> TreeNode:
+        """Builds the decision tree from the training data.
+
+        Args:
+            dataframe: The constellations at the root of the tree.
+            depth: The depth of the root.
+            subtrees: The subtrees of earlier builds to share, see _iterate_tree.
 
         Returns:
             The root node of the constructed decision tree.
         """
+        for node, _ in self._iterate_tree(dataframe, depth, subtrees=subtrees):
+            pass
+        return node
 
-    
-    def _calculate_leaf_node(self,dataframe:DataSet,depth) -> TreeNode:
+    def _iterate_tree(self, dataframe, depth: int, release: bool = False, subtrees: Optional[Dict[Hashable, Tuple[Optional[TreeNode], int, int, int, int]]] = None) -> Iterator[Tuple[TreeNode, List[Tuple[int, Any]]]]:
+        """Builds the decision tree from the training data with an explicit stack and yields every node as soon as it is finished.
+
+        The children are built depth first in the order of the answers, like in a recursive build, so the leaves are found in the same order.
+        The stack only holds the nodes on the path to the current node, each with its constellations and the answers whose children are still to be built.
+
+        Different answers often leave the same constellations, which lead to the same subtree. Every finished subtree is remembered by the
+        state of its constellations, see _get_state_key, and a subtree for the same state is not built again: it gets a node of its own,
+        which carries the answer leading to it, but shares the children of the first one. So the tree becomes a directed acyclic graph.
+        Every distinct subtree is yielded once, and the nodes sharing its children refer to its position among the yielded nodes.
+
+        Args:
+            dataframe: The constellations at the root of the tree.
+            depth: The depth of the root.
+            release: If True, the nodes are not linked to their parents and only the positions of the finished subtrees are remembered,
+                so only the nodes on the stack are kept in memory. The yielded nodes have no children then.
+            subtrees: The finished subtrees of earlier builds, which are shared by this build and get its subtrees, None to start without.
+                Their positions refer to the nodes yielded by the earlier builds. If the root is one of them, a node sharing it is the only node yielded.
+
+        Yields:
+            The finished nodes with the position and the answer of each of their children, every node after its children and the root last.
+        """
+
+        # the finished subtrees by the state at their root, with their root unless released, the position of their root,
+        # the depth of their root and the range of their leaves in leaf_depths
+        if subtrees is None:
+            subtrees = {}
+        stack: List[Tuple[TreeNode, Any, int, Iterator[Any], Hashable, int, List[Tuple[int, Any]]]] = []
+        position = 0
+        value = None
+        while True:
+            key = self._get_state_key(dataframe, depth)
+            shared = key in subtrees
+            if shared:
+                subtree, subtree_position, subtree_depth, first_leaf, last_leaf = subtrees[key]
+                node = self._share_subtree(subtree, subtree_depth, first_leaf, last_leaf, depth)
+                if node is not None:
+                    node.value = value
+                finished = True
+            else:
+                leaf_count = len(self.leaf_depths)
+                node = self._start_node(dataframe, depth)
+                node.value = value
+                finished = node.attribute is None
+                if finished:
+                    yield node, []
+                    subtree_position, position = position, position + 1
+                    subtrees[key] = (None if release else node, subtree_position, depth, leaf_count, len(self.leaf_depths))
+
+            if not finished:
+                stack.append((node, dataframe, depth, iter(self._get_split_values(dataframe, node.attribute)), key, leaf_count, []))
+            else:
+                if not stack:
+                    if shared and node is not None:
+                        yield node, []
+                    return
+                stack[-1][6].append((subtree_position, value))
+                if not release:
+                    stack[-1][0].children.append(node)
+
+            # finish the nodes whose children are all built and continue with the next answer of the deepest unfinished node
+            while True:
+                node, dataframe, depth, values, key, leaf_count, children = stack[-1]
+                value = next(values, _NO_VALUE)
+                if value is not _NO_VALUE:
+                    dataframe, depth = self._reduce_dataframe(dataframe, node.attribute, value), depth + 1
+                    break
+                stack.pop()
+                yield node, children
+                subtree_position, position = position, position + 1
+                subtrees[key] = (None if release else node, subtree_position, depth, leaf_count, len(self.leaf_depths))
+                if not stack:
+                    return
+                stack[-1][6].append((subtree_position, node.value))
+                if not release:
+                    stack[-1][0].children.append(node)
+
+    def _get_state_key(self, dataframe, depth: int) -> Hashable:
+        """Gets a key that is equal for constellations with the same remaining rows and active columns, which lead to the same subtree.
+
+        The pruning depends on the depth if the tree has a maximum depth, so the depth is part of the key then.
+
+        Args:
+            dataframe: The constellations at a node.
+            depth: The depth of the node.
+
+        Returns:
+            The depth or None and a digest of the encoded rows and columns.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for part in dataframe.encode():
+            digest.update(np.ascontiguousarray(part).tobytes())
+        return (depth if self.max_depth is not None else None, digest.digest())
+
+    def _share_subtree(self, node: Optional[TreeNode], node_depth: int, first_leaf: int, last_leaf: int, depth: int) -> Optional[TreeNode]:
+        """Gets a node for a subtree that was already built, sharing the list of children of its root, and counts its leaves again.
+
+        Args:
+            node: The root of the built subtree, None if it was released.
+            node_depth: The depth the subtree was built at.
+            first_leaf: The position of the depth of the first leaf of the subtree in leaf_depths.
+            last_leaf: The position after the depth of the last leaf of the subtree in leaf_depths.
+            depth: The depth of the new node.
+
+        Returns:
+            The new node, without the answer leading to it, None if the subtree was released.
+        """
+        leaf_depths = self.leaf_depths[first_leaf:last_leaf]
+        if depth != node_depth:
+            leaf_depths = [leaf_depth + depth - node_depth for leaf_depth in leaf_depths]
+        self.leaf_depths.extend(leaf_depths)
+        self.current_max_depth = max([self.current_max_depth] + leaf_depths)
+
+        if node is None:
+            return None
+        return TreeNode(attribute=node.attribute, social_benefits=node.social_benefits, children=node.children, thresholds=node.thresholds)
+
+    def _start_node(self, dataframe, depth: int) -> TreeNode:
+        """Creates a leaf if the tree ends at the given constellations, otherwise the node splitting on the best attribute without children.
+
+        Args:
+            dataframe: The constellations at the node.
+            depth: The depth of the node.
+
+        Returns:
+            The leaf or the node.
+        """
+
+        # pre-pruning
+        if self.max_depth is not None and depth >= self.max_depth:
+            return self._calculate_leaf_node(dataframe,depth)
+
+        #if the dataset is either empty or contains only class labels, return a leaf node with all class label
+        if len(dataframe) == 0 or len(dataframe.columns) == 1:
+            return self._calculate_leaf_node(dataframe,depth)
+
+        best_attribute = self._find_best_split_attribute(dataframe)
+
+        if best_attribute is None:
+            return self._calculate_leaf_node(dataframe,depth)
+
+        # create a new tree node with the best attribute
+        return self._create_node(dataframe,best_attribute)
+
+    def _calculate_leaf_node(self,dataframe:ConstellationView,depth) -> TreeNode:
         '''
         Calculates the leaf node of the decision tree based on the given dataset.
 
@@ -122,37 +929,76 @@ class DecisionTree:
 
         # if the dataset is empty, return a leaf node with no class label
         if len(dataframe) == 0:
-            return TreeNode(social_benefits=[])
+            return TreeNode(social_benefits=0)
         else:
             # return a leaf node with the remaining class label
-            return TreeNode(social_benefits=dataframe['social_benefit'].unique())
+            return TreeNode(social_benefits=self.get_social_benefits(dataframe))
 
         # calculate the most common class label
 
         
     
         
-    def _check_numeric_range_or_nan(self,row,attribute_name,value):
+    def get_social_benefits(self, dataframe:ConstellationView) -> int:
+        '''
+        Gets the social benefits with remaining constellations as a bitmask with bit i set for the social benefit with id i.
 
-        if pd.isna(row[attribute_name]):
-            return True 
-        return row[attribute_name][0] <= value <= row[attribute_name][1] 
+        Leaves hold these bitmasks instead of the names, which are only looked up for presentation, see DataSet.get_social_benefits_from_mask.
 
-    
-    def _find_best_split_attribute(self, dataframe:DataSet,selection_method:str = None) -> Dict:
+        Parameters:
+        - dataframe (ConstellationView): The constellations at the current node.
+
+        Returns:
+        - int: The bitmask of the social benefits.
+        '''
+        return sum(1 << int(social_benefit_id) for social_benefit_id in dataframe.unique('social_benefit'))
+
+    def _get_column_titles(self, dataframe:ConstellationView) -> List[str]:
+        '''
+        Gets for each column of the given dataset the title of the attribute it belongs to.
+
+        Numerical attributes are carried by a lower and an upper bound column, which are mapped back to the title of the attribute.
+        The 'social_benefit' column keeps its name.
+
+        Parameters:
+        - dataframe (ConstellationView): The constellations at the current node.
+
+        Returns:
+        - List[str]: The attribute title of every column, in column order.
+        '''
+
+        titles = []
+        for column in dataframe.columns:
+            title = column
+            for suffix in (Attribute_Numerical.lower_suffix, Attribute_Numerical.upper_suffix):
+                if column.endswith(suffix) and self.dataset.get_attribute_from_title(column) is None:
+                    title = column[:-len(suffix)]
+            titles.append(title)
+        return titles
+
+    def _find_best_split_attribute(self, dataframe:ConstellationView,selection_method:str = None) -> Dict:
 
         # Calculation of the attribute reduction
 
-        attributes = [attribute_name for attribute_name in dataframe.columns if attribute_name != 'social_benefit']
+        titles, column_attributes = self._get_column_attributes(dataframe)
+        attributes = [self.dataset.get_attribute_from_title(title) for title in titles if title != 'social_benefit']
         
         if selection_method == None:
             best_split_attribute = None
             best_average_column_count = 100000
 
-            for attribute in attributes:
-                attribute = self.dataset.get_attribute_from_title(attribute)
-                split_dataframes = self._split(dataframe,attribute)
-                current_column_count = sum(len(df.columns) for df in split_dataframes)/len(split_dataframes)
+            # the candidates are independent of each other, so they may be scored concurrently
+            executor = self._get_split_executor()
+            if executor is None or len(attributes) <= 1:
+                column_counts = [self._score_split_attribute(dataframe, attribute, titles, column_attributes) for attribute in attributes]
+            elif isinstance(executor, ThreadPoolExecutor):
+                column_counts = list(executor.map(lambda attribute: self._score_split_attribute(dataframe, attribute, titles, column_attributes), attributes))
+            else:
+                encoded = dataframe.encode()
+                column_counts = list(executor.map(_score_split_attribute, [encoded] * len(attributes), [attribute.title for attribute in attributes]))
+
+            # ties go to the first attribute in column order, however the scores were computed
+            for attribute, current_column_count in zip(attributes, column_counts):
                 if current_column_count < best_average_column_count:
                     best_average_column_count = current_column_count
                     best_split_attribute = attribute
@@ -171,109 +1017,367 @@ class DecisionTree:
         
         
 
-    def _split(self, dataframe:pd.DataFrame, attribute:Attribute) -> Any:
-        """Splits the data into two subsets based on the given feature and threshold.
+    def _get_column_attributes(self, dataframe:ConstellationView) -> Tuple[List[str], np.ndarray]:
+        """Gets a matrix assigning the columns of the given dataset to their attributes.
+
+        Numerical attributes count as one attribute, although they are carried by two columns.
+
+        Args:
+            dataframe: The constellations at the current node.
+
+        Returns:
+            The distinct attribute titles in column order and a matrix with a row per column and a column per title.
+        """
+
+        column_titles = self._get_column_titles(dataframe)
+        titles = list(dict.fromkeys(column_titles))
+        column_attributes = np.zeros((len(column_titles), len(titles)))
+        column_attributes[np.arange(len(column_titles)), [titles.index(title) for title in column_titles]] = 1
+        return titles, column_attributes
+
+    def _score_split_attribute(self, dataframe:ConstellationView, attribute:Attribute, titles: List[str], column_attributes: np.ndarray) -> float:
+        """Scores a split by the average number of attributes that remain after it, lower is better.
+
+        Args:
+            dataframe: The constellations at the current node.
+            attribute: The attribute to split on.
+            titles: The distinct attribute titles of the dataset in column order.
+            column_attributes: The matrix assigning the columns of the dataset to their attributes.
+
+        Returns:
+            The number of remaining attributes, averaged over the answers for the attribute.
+        """
+
+        values = self._get_split_values(dataframe, attribute)
+
+        # count the values per column that remain after the split for every answer, without building the split datasets
+        _, counts = self._count_non_null(dataframe, attribute, values)
+        remaining_attributes = (counts > 0) @ column_attributes > 0
+        remaining_attributes[:, titles.index(attribute.title)] = False
+
+        return int(remaining_attributes.sum())/len(values)
+
+    def _split(self, dataframe:ConstellationView, attribute:Attribute) -> Any:
+        """Splits the data into one subset per possible answer for the given attribute.
 
         Args:
-            X: The input samples.
-            y: The target values.
-            feature_index: The index of the feature to split on.
-            threshold: The threshold value to split the samples.
+            dataframe: The constellations at the current node.
+            attribute: The attribute to split on.
 
         Returns:
-            Two tuples containing the input samples and target values for the two subsets.
+            Every answer with its reduced constellations, in the order of _get_split_values.
+        """
+
+        return [(value, self._reduce_dataframe(dataframe, attribute, value)) for value in self._get_split_values(dataframe, attribute)]
+
+    def _create_node(self, dataframe:ConstellationView, attribute:Attribute) -> TreeNode:
+        """Creates the node splitting on the given attribute.
+
+        A node splitting on a numerical attribute keeps the bounds of its constellations, which tell the answers apart that lead to different children.
+
+        Args:
+            dataframe: The constellations at the current node.
+            attribute: The attribute to split on.
+
+        Returns:
+            The node without children.
         """
-        # Logic for splitting the data goes here.
 
-        # calculate 
         if isinstance(attribute,Attribute_Numerical):
-            interval_values = self._get_interval_values(dataframe[attribute.title].dropna(),attribute)
-            return [self._reduce_dataframe(dataframe, attribute, value) for value in interval_values]
+            lower_bounds, upper_bounds = self._get_numerical_bounds(dataframe, attribute)
+            return TreeNode(attribute=attribute, thresholds=sorted(set(lower_bounds) | set(upper_bounds)))
+        return TreeNode(attribute=attribute)
+
+    def _get_numerical_bounds(self, dataframe:ConstellationView, attribute:Attribute_Numerical) -> Tuple[List[float], List[float]]:
+        """Gets the distinct lower and upper bounds of the given numerical attribute.
+
+        Args:
+            dataframe: The constellations at the current node.
+            attribute: The numerical attribute.
+
+        Returns:
+            The lower and the upper bounds in the order of the constellations, without missing bounds.
+        """
+
+        lower_bounds = [bound for bound in dataframe.unique(attribute.lower_column) if not pd.isna(bound)]
+        upper_bounds = [bound for bound in dataframe.unique(attribute.upper_column) if not pd.isna(bound)]
+        return lower_bounds, upper_bounds
+
+    def _get_elementary_bounds(self, dataframe:ConstellationView, attribute:Attribute_Numerical) -> np.ndarray:
+        """Gets the sorted bounds of a numerical attribute over all constellations, which cut its range into elementary intervals.
+
+        The bounds of the constellations at every node are among them, so they are encoded as their positions in the bounds.
+        The bounds are collected once per attribute, from the constellations the tree is built from, and include the minimum and maximum of the attribute.
+
+        Args:
+            dataframe: The constellations at the current node, whose unreduced constellations the bounds are collected from.
+            attribute: The numerical attribute.
+
+        Returns:
+            The distinct bounds in ascending order.
+        """
+
+        if attribute.title not in self._numerical_bounds:
+            constellation = dataframe.constellation
+            bounds = [constellation.get_unique(column) for column in self._get_attribute_columns(attribute) if column in constellation.columns]
+            bounds = np.concatenate(bounds + [np.array([attribute.min, attribute.max])]).astype('float64')
+            self._numerical_bounds[attribute.title] = np.unique(bounds[~np.isnan(bounds)])
+        return self._numerical_bounds[attribute.title]
+
+    def _get_interval_index(self, dataframe:ConstellationView, attribute:Attribute_Numerical) -> IntervalIndex:
+        """Gets the index of all constellations by the answers to a numerical attribute they match.
+
+        Args:
+            dataframe: The constellations at the current node, whose unreduced constellations are indexed.
+            attribute: The numerical attribute.
+
+        Returns:
+            The interval index over the elementary bounds of the attribute, built once per attribute.
+        """
+
+        if attribute.title not in self._interval_indices:
+            self._interval_indices[attribute.title] = IntervalIndex(dataframe.constellation, attribute.lower_column, attribute.upper_column, self._get_elementary_bounds(dataframe, attribute))
+        return self._interval_indices[attribute.title]
+
+    def _get_piece_values(self, dataframe:ConstellationView, attribute:Attribute_Numerical) -> np.ndarray:
+        """Gets an answer for every piece the elementary bounds of a numerical attribute cut its answers into, see IntervalIndex.
+
+        The answer for a bound is the bound itself and the answer for the open interval between two bounds is its middle.
+        The answers are computed once per attribute, so a split only picks the pieces it needs, see _get_interval_values.
+
+        Args:
+            dataframe: The constellations at the current node, whose unreduced constellations the bounds are collected from.
+            attribute: The numerical attribute.
+
+        Returns:
+            The answer per piece, NaN for the pieces below the first and above the last bound.
+        """
+
+        if attribute.title not in self._piece_values:
+            bounds = self._get_elementary_bounds(dataframe, attribute)
+            piece_values = np.full(2 * len(bounds) + 1, np.nan)
+            piece_values[1::2] = bounds
+            piece_values[2:-1:2] = (bounds[:-1] + bounds[1:]) / 2
+            self._piece_values[attribute.title] = piece_values
+        return self._piece_values[attribute.title]
+
+    def _get_split_values(self, dataframe:ConstellationView, attribute:Attribute) -> List[Any]:
+        """Gets the answers the given attribute is split by.
+
+        Args:
+            dataframe: The constellations at the current node.
+            attribute: The attribute to split on.
+
+        Returns:
+            The interval values for a numerical attribute, the answer options for a categorical attribute.
+        """
+
+        if isinstance(attribute,Attribute_Numerical):
+            bounds = self._get_elementary_bounds(dataframe, attribute)
+            lower_codes, upper_codes = (np.searchsorted(bounds, values[~np.isnan(values)]) for values in (dataframe.unique(column).astype('float64') for column in (attribute.lower_column, attribute.upper_column)))
+            return self._get_interval_values(lower_codes, upper_codes, self._get_piece_values(dataframe, attribute), attribute)
         
         else:
-            return [self._reduce_dataframe(dataframe, attribute, value) for value in attribute.answer_options]
+            return attribute.answer_options
+
+    def _get_attribute_columns(self, attribute:Attribute) -> List[str]:
+        """Gets the columns carrying the given attribute.
 
+        Args:
+            attribute: The attribute to get the columns for.
 
-    def _reduce_dataframe(self, dataframe, attribute:Attribute, value: Any) -> Any:
-        """Reduces the given dataset by removing the given feature.
+        Returns:
+            The lower and upper bound columns for a numerical attribute, the title for a categorical attribute.
+        """
+
+        if isinstance(attribute,Attribute_Numerical):
+            return [attribute.lower_column, attribute.upper_column]
+        return [attribute.title]
+
+    def _get_compatibility_function(self, attribute:Attribute, values: List[Any]) -> CompatibilityFunction:
+        """Gets a function that tells which rows match each of the given answers.
 
         Args:
-            X: The input samples.
-            y: The target values.
-            feature_index: The index of the feature to remove.
+            attribute: The answered attribute.
+            values: The answers for the attribute.
 
         Returns:
-            The input samples with the given feature removed.
+            A function returning for the columns of the attribute a boolean matrix with a row per row of the columns and a column per answer.
+            Rows without a requirement on the attribute match every answer.
         """
-        # Logic for reducing the data goes here.
+
+        # if the attribute is numerical, a row matches if its interval contains the answer
         if isinstance(attribute,Attribute_Numerical):
-            mask = dataframe.apply(self._check_numeric_range_or_nan, axis=1, args=(attribute.title, value))
-            reduced_dataframe = dataframe[mask].drop(columns=[attribute.title])
-        # if the attribute is categorical, remove all rows that don't have the given value 
+            answers = np.array(values, dtype='float64')
+
+            def compatibility_function(columns: Dict[str, np.ndarray]) -> np.ndarray:
+                compatibility = np.ones((len(next(iter(columns.values()))), len(answers)), dtype=bool)
+                if attribute.lower_column in columns:
+                    lower_bounds = columns[attribute.lower_column].astype('float64')[:, np.newaxis]
+                    compatibility &= np.isnan(lower_bounds) | (lower_bounds <= answers)
+                if attribute.upper_column in columns:
+                    upper_bounds = columns[attribute.upper_column].astype('float64')[:, np.newaxis]
+                    compatibility &= np.isnan(upper_bounds) | (answers <= upper_bounds)
+                return compatibility
+
+        # if the attribute is categorical, a row matches if its bitmask contains the answer
         else:
-            filter_criteria = pd.isna(dataframe[attribute.title]) | (dataframe[attribute.title] == value)
-            reduced_dataframe = dataframe[filter_criteria].drop(columns=[attribute.title])
+            answer_bits = np.array([attribute.get_bitmask([value]) for value in values], dtype=np.int64)
+
+            def compatibility_function(columns: Dict[str, np.ndarray]) -> np.ndarray:
+                bitmasks = columns[attribute.title]
+                if bitmasks.dtype.kind == 'i':
+                    return (bitmasks[:, np.newaxis] & answer_bits) != 0
+                bitmasks = bitmasks.astype('float64')[:, np.newaxis]
+                return np.isnan(bitmasks) | ((np.nan_to_num(bitmasks).astype(np.int64) & answer_bits) != 0)
+
+        return compatibility_function
+
+    def _count_non_null(self, dataframe:ConstellationView, attribute:Attribute, values: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Counts the rows and the values per active column that remain for each of the given answers.
+
+        Args:
+            dataframe: The constellations at the current node.
+            attribute: The answered attribute.
+            values: The answers for the attribute.
 
-        # remove all columns that have all NaN values
-        return reduced_dataframe.dropna(axis=1, how='all')
+        Returns:
+            The number of remaining rows per answer and a matrix with the number of remaining values per answer and active column.
+        """
+
+        columns = self._get_attribute_columns(attribute)
+        compatibility_function = self._get_compatibility_function(attribute, values)
+        if isinstance(dataframe, ConstellationBitset):
+            return dataframe.count_non_null(columns, compatibility_function, len(values), self._get_answer_keys(dataframe, attribute, values))
+        return dataframe.count_non_null(columns, compatibility_function, len(values))
+
+    def _get_answer_keys(self, dataframe:ConstellationBitset, attribute:Attribute, values: List[Any]) -> List[Hashable]:
+        """Gets keys under which answers with the same compatible rows are cached.
+
+        The bounds of all constellations split the range of a numerical attribute into pieces, the bounds themselves and the open intervals between them.
+        All answers within a piece match the same rows, so the piece is their key. Categorical answers are their own key.
+
+        Args:
+            dataframe: The constellations at the current node.
+            attribute: The answered attribute.
+            values: The answers for the attribute.
+
+        Returns:
+            A key per answer.
+        """
+
+        if not isinstance(attribute,Attribute_Numerical):
+            return list(values)
+
+        return self._get_interval_index(dataframe, attribute).get_pieces(values)
+
+    def _reduce_dataframe(self, dataframe:ConstellationView, attribute:Attribute, value: Any) -> ConstellationView:
+        """Reduces the given constellations to the rows matching the given value and removes the given attribute.
+
+        The reduction only narrows the row indices of the view, the tables of the constellations are neither expanded nor copied.
+        The rows matching a numerical answer are looked up in the interval index of the attribute instead of being compared with the answer.
+
+        Args:
+            dataframe: The constellations at the current node.
+            attribute: The attribute to reduce by.
+            value: The answer for the attribute.
+
+        Returns:
+            The reduced constellations without the columns of the attribute and without columns that have only NaN values.
+        """
+
+        compatibility_function = self._get_compatibility_function(attribute, [value])
+
+        if isinstance(dataframe, ConstellationBitset):
+            return dataframe.reduce(self._get_attribute_columns(attribute), lambda columns: compatibility_function(columns)[:, 0], self._get_answer_keys(dataframe, attribute, [value])[0])
+        if isinstance(attribute,Attribute_Numerical):
+            return dataframe.reduce(self._get_attribute_columns(attribute), lambda columns: compatibility_function(columns)[:, 0], self._get_interval_index(dataframe, attribute).get_rows(value))
+        return dataframe.reduce(self._get_attribute_columns(attribute), lambda columns: compatibility_function(columns)[:, 0])
         
 
-    def _get_interval_values(self,expressions,attribute:Attribute) -> List[float]:
+    def _get_interval_values(self,lower_codes:np.ndarray,upper_codes:np.ndarray,piece_values:np.ndarray,attribute:Attribute) -> List[float]:
 
         '''
-        Gets the interval values for the given attribute based on the given expressions.
+        Gets the interval values for the given attribute based on the given bounds.
+
+        The lower and upper bounds are given as their positions in the elementary bounds of the attribute. A constellation matches the pieces
+        from the piece of its lower bound to the piece of its upper bound, so the bounds cut the pieces within the range of the attribute into runs
+        of pieces matching the same constellations. Every run is represented by the answer of its first open interval, or of its bound if the run
+        is a single bound, which is picked from the answers computed once per attribute instead of being computed for every node.
 
         Parameters:
-        - expressions (List[Tuple[float,float]]): The expressions for the attribute.
+        - lower_codes (np.ndarray): The positions of the lower bounds of the intervals for the attribute in the elementary bounds.
+        - upper_codes (np.ndarray): The positions of the upper bounds of the intervals for the attribute in the elementary bounds.
+        - piece_values (np.ndarray): The answer for every piece of the elementary bounds, see _get_piece_values.
         - attribute (Attribute): The attribute to get the interval values for.
 
         Returns:
-        - List[float]: The interval values for the attribute.
+        - List[float]: The interval values for the attribute in ascending order.
 
         '''
 
-        interval_values = set()
-        
-        lower_bounds = set()
-        upper_bounds = set()
+        # the min of the attribute is always a lower bound, the max always an upper bound, and runs outside the range are left out
+        bounds = piece_values[1::2]
+        first = 2 * np.searchsorted(bounds, attribute.min) + 1
+        end = 2 * np.searchsorted(bounds, attribute.max) + 2
+        cuts = np.unique(np.concatenate([2 * np.asarray(lower_codes, dtype=np.int64) + 1, 2 * np.asarray(upper_codes, dtype=np.int64) + 2, [first, end]]))
+        cuts = cuts[(cuts >= first) & (cuts <= end)]
 
-        for exp in expressions:
-            lower, upper = exp
-            lower_bounds.add(lower)
-            upper_bounds.add(upper)
+        starts, ends = cuts[:-1], cuts[1:]
+        pieces = np.where(ends - starts == 1, starts, starts + starts % 2)
+        return piece_values[pieces].tolist()
 
-        #if min of attribute is not in lower bounds, add it
-        if attribute.min not in lower_bounds:
-            lower_bounds.add(attribute.min)
-        
-        #if max of attribute is not in upper bounds, add it
-        if attribute.max not in upper_bounds:
-            upper_bounds.add(attribute.max)
-
-        # while both sets are not empty
-
-        last = None
-        while lower_bounds and upper_bounds:
-            lower = min(lower_bounds)
-            upper = min(upper_bounds)
-            
-            if lower < upper:
-                interval_values.add((upper + lower)/2)
-                lower_bounds.remove(lower)
-                last = lower
-                continue
-            if lower == upper:
-                interval_values.add(lower)
-                upper_bounds.remove(upper)
-                continue
-            if lower > upper:
-                interval_values.add((upper + lower)/2)
-                upper_bounds.remove(upper)
-        
-        while upper_bounds:
-            upper = min(upper_bounds)
-            interval_values.add((upper + last)/2)
-            last = upper
-            upper_bounds.remove(upper)
-            
-        return interval_values
\ No newline at end of file
+# marks that all answers of a node were used
+_NO_VALUE = object()
+
+# the decision tree of a worker process of DecisionTree.fit or of its split pool, set once per process by _initialize_worker
+_worker_tree: Optional[DecisionTree] = None
+_worker_constellations = None
+
+
+def _initialize_worker(dataset: DataSet, max_depth: Optional[int], engine: str) -> None:
+    '''
+    Sets up the decision tree and the constellations of a worker process of DecisionTree.fit or of its split pool.
+
+    Parameters:
+    - dataset (DataSet): The dataset the tree is fitted on.
+    - max_depth (Optional[int]): The maximum depth of the tree.
+    - engine (str): The engine of the tree.
+    '''
+    global _worker_tree, _worker_constellations
+    _worker_tree = DecisionTree(dataset, max_depth=max_depth, engine=engine)
+    _worker_constellations = _worker_tree.get_constellations()
+
+
+def _score_split_attribute(encoded: Tuple[np.ndarray, ...], title: str) -> float:
+    '''
+    Scores a candidate attribute of a split in a worker process of DecisionTree._find_best_split_attribute.
+
+    Parameters:
+    - encoded (Tuple[np.ndarray, ...]): The encoded constellations at the node being split.
+    - title (str): The title of the candidate attribute.
+
+    Returns:
+    float: The score of the candidate, see DecisionTree._score_split_attribute.
+    '''
+    dataframe = _worker_constellations.decode(encoded)
+    titles, column_attributes = _worker_tree._get_column_attributes(dataframe)
+    return _worker_tree._score_split_attribute(dataframe, _worker_tree.dataset.get_attribute_from_title(title), titles, column_attributes)
+
+
+def _build_subtree(encoded: Tuple[np.ndarray, ...], depth: int) -> Tuple[TreeNode, List[int], List[Tuple[List[TreeNode], Hashable]]]:
+    '''
+    Builds a subtree in a worker process of DecisionTree.fit.
+
+    Parameters:
+    - encoded (Tuple[np.ndarray, ...]): The encoded constellations at the root of the subtree.
+    - depth (int): The depth of the root of the subtree.
+
+    Returns:
+    Tuple[TreeNode, List[int], List[Tuple[List[TreeNode], Hashable]]]: The root of the subtree, the depths of its leaves
+    and every distinct list of children with the state at its parent, which are pickled together so the lists stay the ones of the subtree.
+    '''
+    _worker_tree.leaf_depths = []
+    subtrees = {}
+    subtree = _worker_tree._build_tree(_worker_constellations.decode(encoded), depth, subtrees)
+    return subtree, _worker_tree.leaf_depths, [(node.children, key) for key, (node, *_) in subtrees.items()]
@@ -0,0 +1,180 @@
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from src.attribute import Attribute, Attribute_Numerical
+from src.intervalIndex import get_pieces
+from src.treeNode import TreeNode
+
+# the leaf positions of applicants that reach no leaf, because an answer is missing or because an answer leads to no child
+MISSING_ANSWER = -1
+NO_CHILD = -2
+
+class FlatTree:
+    '''
+    A fitted decision tree flattened into NumPy arrays, which passes many applicants down the tree at once.
+
+    Every node is a position in the arrays. An inner node holds the index of its attribute and the offset of its branch
+    table, which maps the code of an answer to the position of the child the answer leads to, -1 if no child stands for it.
+    Categorical answers are coded by their index in the answer options, answers that are no answer option by the number of
+    answer options, numerical answers by their piece among all
+    thresholds of the attribute in the tree: piece 2i is the open interval below threshold i and piece 2i + 1 is
+    threshold i, see intervalIndex.get_pieces. The thresholds of every node are among them, so all answers within a piece lead
+    to the same child. A leaf holds the index of its bitmask of social benefits among the distinct bitmasks of all leaves.
+
+    Methods:
+    - get_leaves(applicants): Returns the position of the leaf every applicant reaches.
+    - get_social_benefits(leaves): Returns the bitmask of the social benefits of every leaf.
+    '''
+
+    def __init__(self, root: TreeNode):
+        '''
+        Flattens the tree below a root node.
+
+        Parameters:
+        - root (TreeNode): The root node of the tree.
+        '''
+
+        nodes = list(root.iterate_subtree())
+        positions = {id(node): position for position, node in enumerate(nodes)}
+        self.root_position = positions[id(root)]
+
+        self.attributes: List[Attribute] = []
+        attribute_indices: Dict[int, int] = {}
+        for node in nodes:
+            if node.attribute is not None and id(node.attribute) not in attribute_indices:
+                attribute_indices[id(node.attribute)] = len(self.attributes)
+                self.attributes.append(node.attribute)
+
+        # the thresholds of a numerical attribute at all nodes, which cut its answers into the pieces used as codes
+        self.thresholds: Dict[int, np.ndarray] = {}
+        for node in nodes:
+            if isinstance(node.attribute, Attribute_Numerical):
+                index = attribute_indices[id(node.attribute)]
+                self.thresholds[index] = np.union1d(self.thresholds.get(index, np.array([], dtype='float64')), np.array(node.thresholds, dtype='float64'))
+
+        self.node_attributes = np.full(len(nodes), -1, dtype=np.int64)
+        self.branch_offsets = np.zeros(len(nodes), dtype=np.int64)
+        self.leaf_sets = np.full(len(nodes), -1, dtype=np.int64)
+        self.social_benefit_sets: List[int] = []
+        set_indices: Dict[int, int] = {}
+        branches: List[np.ndarray] = []
+        offset = 0
+
+        for position, node in enumerate(nodes):
+            if node.attribute is None:
+                if node.social_benefits not in set_indices:
+                    set_indices[node.social_benefits] = len(self.social_benefit_sets)
+                    self.social_benefit_sets.append(node.social_benefits)
+                self.leaf_sets[position] = set_indices[node.social_benefits]
+                continue
+
+            index = attribute_indices[id(node.attribute)]
+            branch = self._get_branch(node, index, positions)
+            self.node_attributes[position] = index
+            self.branch_offsets[position] = offset
+            branches.append(branch)
+            offset += len(branch)
+
+        self.branches = np.concatenate(branches) if branches else np.array([], dtype=np.int64)
+
+    def _get_branch(self, node: TreeNode, index: int, positions: Dict[int, int]) -> np.ndarray:
+        '''
+        Returns the branch table of an inner node, the first child wins if several children stand for the same answers, like in TreeNode.get_child.
+
+        Parameters:
+        - node (TreeNode): The inner node.
+        - index (int): The index of the attribute of the node.
+        - positions (Dict[int, int]): The position of every node by its id.
+
+        Returns:
+        np.ndarray: The position of the child per answer code, -1 if no child stands for the code.
+        '''
+
+        if index not in self.thresholds:
+            branch = np.full(len(node.attribute.answer_options) + 1, -1, dtype=np.int64)
+            for child in reversed(node.children):
+                if child.value in node.attribute.answer_options:
+                    branch[node.attribute.answer_options.index(child.value)] = positions[id(child)]
+            return branch
+
+        # the piece at the node of every piece of the attribute, the open interval above the last threshold included
+        node_thresholds = np.array(node.thresholds, dtype='float64')
+        thresholds = self.thresholds[index]
+        node_pieces = np.empty(2 * len(thresholds) + 1, dtype=np.int64)
+        node_pieces[0:-1:2] = 2 * np.searchsorted(node_thresholds, thresholds)
+        node_pieces[1::2] = get_pieces(node_thresholds, thresholds)
+        node_pieces[-1] = 2 * len(node_thresholds)
+
+        children = np.full(2 * len(node_thresholds) + 1, -1, dtype=np.int64)
+        for child in reversed(node.children):
+            children[get_pieces(node_thresholds, np.array([child.value], dtype='float64'))[0]] = positions[id(child)]
+        return children[node_pieces]
+
+    def _encode(self, applicants: pd.DataFrame) -> np.ndarray:
+        '''
+        Encodes the answers of the applicants to every attribute of the tree.
+
+        Parameters:
+        - applicants (pd.DataFrame): The answers of the applicants, one column per attribute title.
+
+        Returns:
+        np.ndarray: A matrix with the answer codes per attribute and applicant, -1 for missing answers.
+        '''
+
+        codes = np.full((len(self.attributes), len(applicants)), -1, dtype=np.int64)
+        for index, attribute in enumerate(self.attributes):
+            if attribute.title not in applicants.columns:
+                continue
+            answers = attribute.encode_answers(applicants[attribute.title])
+            if index in self.thresholds:
+                has_answer = ~np.isnan(answers)
+                codes[index, has_answer] = get_pieces(self.thresholds[index], answers[has_answer])
+            else:
+                codes[index] = np.where((answers < 0) & pd.notna(applicants[attribute.title]).to_numpy(), len(attribute.answer_options), answers)
+        return codes
+
+    def get_leaves(self, applicants: pd.DataFrame) -> np.ndarray:
+        '''
+        Passes the applicants down the tree level by level, all applicants at once.
+
+        Parameters:
+        - applicants (pd.DataFrame): The answers of the applicants, one column per attribute title.
+
+        Returns:
+        np.ndarray: The position of the leaf every applicant reaches, MISSING_ANSWER if an answer is missing and NO_CHILD if an answer leads to no child.
+        '''
+
+        codes = self._encode(applicants)
+        positions = np.full(len(applicants), self.root_position, dtype=np.int64)
+        pending = np.flatnonzero(self.node_attributes[positions] >= 0)
+
+        while len(pending) > 0:
+            nodes = positions[pending]
+            answer_codes = codes[self.node_attributes[nodes], pending]
+            children = self.branches[self.branch_offsets[nodes] + np.maximum(answer_codes, 0)]
+            children = np.where(answer_codes < 0, MISSING_ANSWER, np.where(children < 0, NO_CHILD, children))
+            positions[pending] = children
+            pending = pending[children >= 0]
+            pending = pending[self.node_attributes[positions[pending]] >= 0]
+
+        return positions
+
+    def get_social_benefits(self, leaves: np.ndarray) -> np.ndarray:
+        '''
+        Returns the bitmask of the social benefits of every leaf.
+
+        Parameters:
+        - leaves (np.ndarray): The positions of the leaves, as returned by get_leaves.
+
+        Returns:
+        np.ndarray: An object array with the bitmask of the social benefits per leaf, None where there is no leaf.
+        '''
+
+        sets = np.where(leaves >= 0, self.leaf_sets[np.maximum(leaves, 0)], -1)
+
+        # the last entry stands for applicants without a leaf
+        social_benefit_sets = np.empty(len(self.social_benefit_sets) + 1, dtype=object)
+        for index, social_benefits in enumerate(self.social_benefit_sets):
+            social_benefit_sets[index] = social_benefits
+        return social_benefit_sets[sets]
+
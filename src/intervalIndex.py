@@ -0,0 +1,130 @@
+from typing import List
+import numpy as np
+from src.constellation import Constellation, Constellation_Table, Rows
+
+class IntervalIndex:
+    '''
+    An index of the rows of a constellation by the answers to a numerical attribute that they match.
+
+    The sorted bounds of the attribute cut its range into pieces, the bounds themselves and the open intervals between
+    them: piece 2i is the open interval below bound i and piece 2i + 1 is bound i. All answers within a piece match the
+    same rows, and every row matches a contiguous range of pieces, from the piece of its lower bound to the piece of its
+    upper bound. An answer is mapped to its piece with a binary search, and the rows matching the piece are looked up
+    instead of comparing every row with the answer.
+
+    The rows of all indexed tables are numbered one after another and stored in a segment tree over the pieces: the range of
+    pieces of every row is cut into at most two nodes per level, whose ranges lie within it, and the row is stored at these nodes.
+    The rows stored at a node are a slice of one sorted array. The nodes containing a piece are the ancestors of its leaf, and every
+    row matching the piece is stored at exactly one of them, so a lookup takes a slice per level and sorts the k rows found.
+
+    Methods:
+    - get_pieces(answers): Returns the piece of every answer.
+    - get_rows(answer): Returns for every table with the attribute the rows that match the answer.
+    '''
+
+    def __init__(self, constellation: Constellation, lower_column: str, upper_column: str, bounds: np.ndarray):
+        '''
+        Indexes the tables of a constellation holding the bound columns of a numerical attribute.
+
+        Parameters:
+        - constellation (Constellation): The constellation to index.
+        - lower_column (str): The column of the lower bounds of the attribute.
+        - upper_column (str): The column of the upper bounds of the attribute.
+        - bounds (np.ndarray): The sorted distinct bounds of the attribute, including every bound of the constellation.
+        '''
+
+        self.bounds = bounds
+
+        # the first and the last piece every row matches, rows without a bound are open to that side
+        self._tables: List[Constellation_Table] = []
+        first_pieces, last_pieces = [], []
+        for table in dict.fromkeys(constellation.get_tables()):
+            if lower_column not in table.column_values and upper_column not in table.column_values:
+                continue
+            table_first_pieces = np.zeros(len(table), dtype=np.int64)
+            table_last_pieces = np.full(len(table), 2 * len(bounds), dtype=np.int64)
+            for column, pieces in ((lower_column, table_first_pieces), (upper_column, table_last_pieces)):
+                if column in table.column_values:
+                    values = table.column_values[column].astype('float64')
+                    has_value = ~np.isnan(values)
+                    pieces[has_value] = 2 * np.searchsorted(bounds, values[has_value]) + 1
+            self._tables.append(table)
+            first_pieces.append(table_first_pieces)
+            last_pieces.append(table_last_pieces)
+
+        # the number of the first row of every table, and after the last table the number of all rows
+        self._offsets = np.cumsum([0] + [len(table) for table in self._tables])
+        first_pieces = np.concatenate(first_pieces) if first_pieces else np.array([], dtype=np.int64)
+        last_pieces = np.concatenate(last_pieces) if last_pieces else np.array([], dtype=np.int64)
+
+        # the leaves of the segment tree are the pieces, node n has the children 2n and 2n + 1 and the root is node 1
+        self._leaf_count = 1 << (2 * len(bounds)).bit_length()
+        rows = np.arange(len(first_pieces))
+        lower, upper = first_pieces + self._leaf_count, last_pieces + self._leaf_count + 1
+        node_parts, row_parts = [], []
+        while True:
+            pending = lower < upper
+            if not pending.any():
+                break
+            for take, nodes in ((pending & (lower % 2 == 1), lower), (pending & (upper % 2 == 1), upper - 1)):
+                node_parts.append(nodes[take])
+                row_parts.append(rows[take])
+            lower = (lower + (pending & (lower % 2 == 1))) // 2
+            upper = (upper - (pending & (upper % 2 == 1))) // 2
+
+        nodes = np.concatenate(node_parts) if node_parts else np.array([], dtype=np.int64)
+        rows = np.concatenate(row_parts) if row_parts else np.array([], dtype=np.int64)
+        order = np.lexsort((rows, nodes))
+        self._rows = rows[order]
+        self._node_offsets = np.searchsorted(nodes[order], np.arange(2 * self._leaf_count + 1))
+
+    def get_pieces(self, answers: List[float]) -> List[int]:
+        '''
+        Returns the piece of every answer.
+
+        Parameters:
+        - answers (List[float]): The answers for the attribute.
+
+        Returns:
+        List[int]: The piece per answer.
+        '''
+        return get_pieces(self.bounds, np.array(answers, dtype='float64')).tolist()
+
+    def get_rows(self, answer: float) -> Rows:
+        '''
+        Returns for every table with the attribute the rows that match the answer.
+
+        Parameters:
+        - answer (float): The answer for the attribute.
+
+        Returns:
+        Rows: The sorted indices of the matching rows of each indexed table.
+        '''
+        node = self.get_pieces([answer])[0] + self._leaf_count
+        parts = []
+        while node >= 1:
+            parts.append(self._rows[self._node_offsets[node]:self._node_offsets[node + 1]])
+            node //= 2
+        rows = np.sort(np.concatenate(parts))
+
+        # the rows of every table are a slice of the sorted rows
+        starts = np.searchsorted(rows, self._offsets)
+        return {table: rows[starts[index]:starts[index + 1]] - self._offsets[index] for index, table in enumerate(self._tables)}
+
+def get_pieces(bounds: np.ndarray, values: np.ndarray) -> np.ndarray:
+    '''
+    Returns the piece of every value among sorted bounds, 2i for the open interval below bound i and 2i + 1 for bound i.
+    The piece above the last of n bounds is 2n. The index, the nodes of the tree and the flattened tree all code numerical answers this way.
+
+    Parameters:
+    - bounds (np.ndarray): The sorted distinct bounds.
+    - values (np.ndarray): The values, without NaN, or a single value.
+
+    Returns:
+    np.ndarray: The piece per value, a single piece for a single value.
+    '''
+    bounds = np.asarray(bounds, dtype='float64')
+    positions = np.searchsorted(bounds, values)
+    if len(bounds) == 0:
+        return 2 * positions
+    return 2 * positions + (bounds[np.minimum(positions, len(bounds) - 1)] == values)
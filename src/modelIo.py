@@ -0,0 +1,121 @@
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.attribute import Attribute
+from src.socialBenefit import SocialBenefit
+from src.treeNode import TreeNode
+
+# version of the model file format, files of other versions are not loaded
+MODEL_VERSION = 5
+
+
+def export_tree_to_json(root: TreeNode, data_hash: str, max_depth: Optional[int], social_benefit_list: List[SocialBenefit], file_path: str) -> None:
+    """
+    Exports a fitted decision tree to a JSON model file.
+
+    Parameters:
+    - root (TreeNode): The root node of the decision tree.
+    - data_hash (str): The hash of the data the tree was fitted on.
+    - max_depth (Optional[int]): The maximum depth the tree was fitted with.
+    - social_benefit_list (List[SocialBenefit]): The social benefits of the data, which the leaves refer to by position.
+    - file_path (str): The path of the model file.
+    """
+    export_nodes_to_json(_number_nodes(root), data_hash, max_depth, social_benefit_list, file_path)
+
+
+def _number_nodes(root: TreeNode) -> Iterator[Tuple[TreeNode, List[Tuple[int, Any]]]]:
+    """
+    Numbers the distinct nodes of a tree in the order of the model file, every node after its children.
+    Nodes sharing their list of children, see DecisionTree._iterate_tree, only differ in the answer leading to them and get the same position.
+
+    Parameters:
+    - root (TreeNode): The root node of the decision tree.
+
+    Returns:
+    Iterator[Tuple[TreeNode, List[Tuple[int, Any]]]]: Every node with its own position with the position and the answer of each of its children.
+    """
+    positions: Dict[int, int] = {}
+    for node in root.iterate_subtree():
+        if id(node.children) in positions:
+            continue
+        positions[id(node.children)] = len(positions)
+        yield node, [(positions[id(child.children)], child.value) for child in node.children]
+
+
+def export_nodes_to_json(nodes: Iterable[Tuple[TreeNode, List[Tuple[int, Any]]]], data_hash: str, max_depth: Optional[int], social_benefit_list: List[SocialBenefit], file_path: str) -> None:
+    """
+    Exports the nodes of a decision tree to a JSON model file, writing every node as soon as it is produced.
+
+    The model file lists the nodes every node after its children, the root last, and every node refers to its children by their positions in the list
+    and the answers leading to them. So the nodes can be streamed from a tree that is still being built, see DecisionTree.fit_to_file,
+    and a subtree shared by several parents is written once.
+    A file that was not completed is no valid JSON and is not loaded.
+    The leaves list the positions of their social benefits in the social benefit list, which is the same for all data with the same hash.
+
+    Parameters:
+    - nodes (Iterable[Tuple[TreeNode, List[Tuple[int, Any]]]]): The distinct nodes of the tree, every node after its children, with the position and the answer of each of their children.
+    - data_hash (str): The hash of the data the tree was fitted on.
+    - max_depth (Optional[int]): The maximum depth the tree was fitted with.
+    - social_benefit_list (List[SocialBenefit]): The social benefits of the data, which the leaves refer to by position.
+    - file_path (str): The path of the model file.
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(file_path, 'w', encoding='utf-8') as json_file:
+        json_file.write(f'{{"version": {json.dumps(MODEL_VERSION)}, "data_hash": {json.dumps(data_hash)}, "max_depth": {json.dumps(max_depth)}, "nodes": [')
+        social_benefit_positions = {social_benefit.id: position for position, social_benefit in enumerate(social_benefit_list)}
+        for position, (node, children) in enumerate(nodes):
+            if position > 0:
+                json_file.write(', ')
+            json.dump(node.export(children, social_benefit_positions), json_file, ensure_ascii=False)
+        json_file.write(']}')
+
+
+def load_tree_from_json(file_path: str, data_hash: str, max_depth: Optional[int], attribute_list: List[Attribute], social_benefit_list: List[SocialBenefit]) -> Optional[TreeNode]:
+    """
+    Loads a fitted decision tree from a JSON model file, if the file was fitted on the same data.
+
+    Parameters:
+    - file_path (str): The path of the model file.
+    - data_hash (str): The hash of the current data.
+    - max_depth (Optional[int]): The maximum depth the tree should be fitted with.
+    - attribute_list (List[Attribute]): A list of attributes to reference in the nodes.
+    - social_benefit_list (List[SocialBenefit]): The social benefits of the current data, whose ids the leaves get.
+
+    Returns:
+    Optional[TreeNode]: The root node of the decision tree, None if there is no model file, it has another version or it was fitted on other data or with another maximum depth.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            model = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if model.get('version') != MODEL_VERSION or model.get('data_hash') != data_hash or model.get('max_depth') != max_depth:
+        return None
+
+    attributes = {attribute.title: attribute for attribute in attribute_list}
+
+    # the children of a node are listed before the node, shared subtrees only once: every further parent gets a node of its own,
+    # which carries the answer leading to it and shares the children, like in DecisionTree._iterate_tree
+    nodes: List[TreeNode] = []
+    linked = set()
+    for json_data in model['nodes']:
+        children = []
+        for position, value in zip(json_data['children'], json_data['values']):
+            child = nodes[position]
+            if position in linked:
+                child = TreeNode(attribute=child.attribute, social_benefits=child.social_benefits, children=child.children, thresholds=child.thresholds)
+            linked.add(position)
+            child.value = value
+            children.append(child)
+
+        social_benefits = json_data['social_benefits']
+        nodes.append(TreeNode(attribute=attributes[json_data['attribute']] if json_data['attribute'] is not None else None,
+                              social_benefits=sum(1 << social_benefit_list[position].id for position in social_benefits) if social_benefits is not None else None,
+                              children=children,
+                              thresholds=json_data['thresholds']))
+
+    return nodes[-1] if nodes else None
@@ -1,9 +1,14 @@
-from typing import List, Set, Dict, Tuple
+from typing import Any, Callable, List, Optional, Dict, Tuple
 from src.attribute import Attribute
-from collections import Counter
+from src.constellation import Constellation, Constellation_Table, Constellation_Product, Constellation_Union
+import numpy as np
 import pandas as pd
-import operator
-from functools import reduce
+
+# a function taking the encoded answers of applicants per attribute title and the number of applicants, returning which applicants meet a requirement
+Predicate = Callable[[Dict[str, np.ndarray], int], np.ndarray]
+
+# a function taking the answers of a single applicant per attribute title, returning whether the applicant meets a requirement
+Check = Callable[[Dict[str, Any]], bool]
 
 class Requirement:
     """
@@ -13,18 +18,125 @@ class Requirement:
     def __init__(self):
         self.parent: 'Requirement' = None
         self.social_benefit = None
+        self._constellation: Constellation = None
+        self._predicate: Predicate = None
+        self._check: Check = None
     
+    def __getstate__(self) -> dict:
+        '''
+        Returns the state of the requirement for pickling, e.g. when the dataset is sent to worker processes.
+        The cached predicate and check are closures that can't be pickled, and the cached constellations hold dataframes that are
+        cheaper to rebuild than to pickle, so they are all left out and rebuilt on first use.
+        '''
+        state = self.__dict__.copy()
+        state['_constellation'] = None
+        state['_predicate'] = None
+        state['_check'] = None
+        return state
+
     def set_parent(self, parent: 'Requirement'):
         self.parent = parent
 
     def set_social_benefit(self, social_benefit):
         self.social_benefit = social_benefit
 
+    def invalidate(self) -> None:
+        '''
+        Discards the cached constellations, predicates and checks of the requirement and of all requirements above it, up to the social benefit.
+        Has to be called whenever the requirement is changed, the constellations of other subtrees stay cached.
+        '''
+        requirement = self
+        while requirement is not None:
+            requirement._constellation = None
+            requirement._predicate = None
+            requirement._check = None
+            if requirement.social_benefit is not None:
+                requirement.social_benefit.invalidate()
+            requirement = requirement.parent
+
+    def invalidate_attribute(self, attribute: Attribute) -> None:
+        '''
+        Discards the cached constellations of all requirements on the attribute within the requirement.
+
+        Parameters:
+        - attribute (Attribute): The attribute whose title, answer options or bounds changed.
+        '''
+        pass
+
+    def get_constellation(self) -> Constellation:
+        '''
+        Returns the constellations of the requirement, which are cached until the requirement is invalidated.
+
+        Returns:
+        Constellation: The constellations of the requirement.
+        '''
+        if self._constellation is None:
+            self._constellation = self._build_constellation()
+        return self._constellation
+
+    def get_predicate(self) -> Predicate:
+        '''
+        Returns a vectorized function telling which of many applicants meet the requirement, which is cached until the requirement is invalidated.
+
+        The function takes the answers of the applicants per attribute title, encoded by Attribute.encode_answers, and the number of applicants.
+        Applicants without an answer for an attribute don't meet a requirement on it, like applicants without any column for the attribute.
+
+        Returns:
+        Predicate: The function returning a boolean array with an entry per applicant.
+        '''
+        if self._predicate is None:
+            self._predicate = self._build_predicate()
+        return self._predicate
+
+    def get_check(self) -> Check:
+        '''
+        Returns a function telling whether a single applicant meets the requirement, which is cached until the requirement is invalidated.
+
+        The function takes the answers of the applicant per attribute title, numbers for numerical attributes and answer options for categorical ones.
+        An applicant without an answer for an attribute doesn't meet a requirement on it, like in get_predicate.
+
+        Returns:
+        Check: The function returning a bool.
+        '''
+        if self._check is None:
+            self._check = self._build_check()
+        return self._check
+
+    def get_cost(self) -> int:
+        '''
+        Returns the number of concrete requirements a check of the requirement evaluates at most.
+        '''
+        return 1
+
+    def normalize(self) -> 'Requirement':
+        '''
+        Returns a requirement with the same eligibility whose constellations have as few rows and tables as possible.
+        The requirement itself is not changed, parts that are already normal are returned as they are, so their cached constellations are reused.
+
+        An unsatisfiable requirement is normalized to an empty OR, a requirement that is always satisfied to an empty AND.
+
+        Returns:
+        Requirement: The normalized requirement.
+        '''
+        return self
+
+    def get_dataframe(self) -> pd.DataFrame:
+        '''
+        Returns the requirement as a dataframe.
+
+        Returns:
+        DataFrame: A dataframe representing the requirement.
+        '''
+        return self.get_constellation().to_dataframe()
+
 class Requirement_Logical(Requirement):
     """
     Represents logical requirements (AND, OR) that contain other requirements.
     """
 
+    # the number of checks after which the children of a check are reordered by their observed results
+    reorder_interval = 256
+
     def __init__(self, requirements: List[Requirement]) -> None:
         super().__init__()
         self.requirements = requirements
@@ -38,7 +150,8 @@ class Requirement_Logical(Requirement):
         """
 
         self.requirements.append(requirement)
-        self._update_relevant_attributes()
+        requirement.set_parent(self)
+        self.invalidate()
         print(f"Requirement {requirement.get_tree_string()} successfully added.")
     
 
@@ -52,29 +165,139 @@ class Requirement_Logical(Requirement):
 
         try:
             self.requirements.remove(requirement)
-            self._update_relevant_attributes()
+            self.invalidate()
             print(f"Requirement {requirement.get_tree_string()} successfully removed.")
         except ValueError:
             print(f"Requirement not found and cannot be removed.")
 
     def remove_requirement_by_attribute(self, attribute: Attribute) -> None:
         """
-        Removes a requirement from the list of requirements.
+        Removes all requirements on the given attribute from the list of requirements and from the nested requirements.
 
         Parameters:
-        - requirement (Requirement): The requirement to remove.
+        - attribute (Attribute): The attribute to remove the requirements by.
         """
 
-        to_remove = None
+        # every requirement on the attribute is removed, the constellations must not reference the attribute anymore
+        to_remove = []
         for requirement in self.requirements:
             if isinstance(requirement, Requirement_Concrete) and requirement.attribute == attribute:
-                to_remove = requirement
-                break
-            else:
+                to_remove.append(requirement)
+            elif isinstance(requirement, Requirement_Logical):
                 requirement.remove_requirement_by_attribute(attribute)
                 
-        if to_remove:
-            self.remove_requirement(to_remove)
+        for requirement in to_remove:
+            self.remove_requirement(requirement)
+
+    def invalidate_attribute(self, attribute: Attribute) -> None:
+        for requirement in self.requirements:
+            requirement.invalidate_attribute(attribute)
+
+    def _get_normalized_requirements(self) -> List[Requirement]:
+        '''
+        Normalizes the child requirements and flattens children of the same logical type into this requirement.
+
+        Returns:
+        List[Requirement]: The normalized child requirements.
+        '''
+        requirements = []
+        for requirement in self.requirements:
+            requirement = requirement.normalize()
+            if type(requirement) is type(self):
+                requirements.extend(requirement.requirements)
+            else:
+                requirements.append(requirement)
+        return requirements
+
+    def _merge_requirements(self, requirements: List[Requirement], merge) -> List[Requirement]:
+        '''
+        Merges concrete requirements on the same attribute and drops duplicate requirements, keeping the order of their first occurrence.
+
+        Parameters:
+        - requirements (List[Requirement]): The normalized child requirements.
+        - merge (Callable): A function returning the requirement equivalent to two concrete requirements on the same attribute, or None if they can't be merged.
+
+        Returns:
+        List[Requirement]: The merged requirements.
+        '''
+        merged_requirements = []
+        exports = []
+        for requirement in requirements:
+            if isinstance(requirement, Requirement_Concrete):
+                for index, merged_requirement in enumerate(merged_requirements):
+                    if isinstance(merged_requirement, Requirement_Concrete) and merged_requirement.attribute == requirement.attribute:
+                        merged = merge(merged_requirement, requirement)
+                        if merged is not None:
+                            merged_requirements[index] = merged
+                            exports[index] = merged.export()
+                            requirement = None
+                            break
+                if requirement is None:
+                    continue
+
+            export = requirement.export()
+            if export not in exports:
+                merged_requirements.append(requirement)
+                exports.append(export)
+        return merged_requirements
+
+    def _get_normalized(self, requirements: List[Requirement]) -> Requirement:
+        '''
+        Returns the logical requirement of the same type with the given normalized child requirements.
+
+        Parameters:
+        - requirements (List[Requirement]): The normalized child requirements.
+
+        Returns:
+        Requirement: The only child requirement, this requirement if the children didn't change, or a new logical requirement of the same type.
+        '''
+        if len(requirements) == 1:
+            return requirements[0]
+        if len(requirements) == len(self.requirements) and all(requirement is child for requirement, child in zip(requirements, self.requirements)):
+            return self
+        return type(self)(requirements=requirements)
+
+    def get_cost(self) -> int:
+        '''
+        Returns the number of concrete requirements a check of the requirement evaluates at most.
+        '''
+        return sum(requirement.get_cost() for requirement in self.requirements)
+
+    def _build_short_circuit_check(self, decisive: bool) -> Check:
+        '''
+        Builds a check evaluating the child checks until one returns the decisive result, which is then the result of the check.
+
+        The check counts per child how often it was evaluated and how often it was decisive, and every reorder_interval checks
+        it sorts the children by their rate of decisive results per cost, so the children most likely to end the check cheaply come first.
+
+        Parameters:
+        - decisive (bool): The result that ends the check, False for an AND and True for an OR.
+
+        Returns:
+        Check: The check, returning the opposite of the decisive result if no child is decisive.
+        '''
+        checks = [requirement.get_check() for requirement in self.requirements]
+        costs = [requirement.get_cost() for requirement in self.requirements]
+        evaluations = [0] * len(checks)
+        decisions = [0] * len(checks)
+        order = list(range(len(checks)))
+        reorder_interval = self.reorder_interval
+        count = 0
+
+        def check(answers: Dict[str, Any]) -> bool:
+            nonlocal count
+            count += 1
+            if count % reorder_interval == 0:
+                order.sort(key=lambda index: -(decisions[index] + 1) / ((evaluations[index] + 2) * costs[index]))
+
+            for index in order:
+                evaluations[index] += 1
+                if checks[index](answers) == decisive:
+                    decisions[index] += 1
+                    return decisive
+            return not decisive
+
+        return check
 
 class Logical_AND(Requirement_Logical):
 
@@ -93,6 +316,26 @@ class Logical_AND(Requirement_Logical):
         
         '''
         return 'AND'
+
+    def normalize(self) -> Requirement:
+        '''
+        Returns a requirement with the same eligibility whose constellations have as few rows and tables as possible.
+
+        Nested ANDs are flattened, requirements on the same attribute are intersected and the AND is unsatisfiable if one of its children is.
+
+        Returns:
+        Requirement: The normalized requirement.
+        '''
+        requirements = self._get_normalized_requirements()
+        if any(isinstance(requirement, Logical_OR) and len(requirement.requirements) == 0 for requirement in requirements):
+            return Logical_OR(requirements=[])
+
+        merged_requirements = []
+        for requirement in self._merge_requirements(requirements, lambda first, second: first.intersect(second)):
+            if isinstance(requirement, Requirement_Concrete) and requirement.is_unsatisfiable():
+                return Logical_OR(requirements=[])
+            merged_requirements.append(requirement)
+        return self._get_normalized(merged_requirements)
     
     def export(self) -> Dict:
 
@@ -108,22 +351,42 @@ class Logical_AND(Requirement_Logical):
             'content': [requirement.export() for requirement in self.requirements]
         }
     
-    def get_dataframe(self) -> pd.DataFrame:
+    def _build_constellation(self) -> Constellation:
 
         '''
-        Returns the requirement as a dataframe.
+        Builds the constellations of the requirement.
 
         Returns:
-        DataFrame: A dataframe representing the requirement.
+        Constellation: The cartesian product of the constellations of the child requirements, kept as a product of the child tables.
+        '''
+
+        return Constellation_Product([requirement.get_constellation() for requirement in self.requirements])
+
+    def _build_check(self) -> Check:
+        '''
+        Builds the check of the requirement, which stops at the first child requirement that is not met.
+
+        Returns:
+        Check: A function returning whether an applicant meets all child requirements.
+        '''
+        return self._build_short_circuit_check(False)
+
+    def _build_predicate(self) -> Predicate:
         '''
+        Builds the predicate of the requirement.
 
-        # we get the dataframes for each requirement and concatenate them
-        dataframes = [requirement.get_dataframe() for requirement in self.requirements]
-        constellations = reduce(operator.mul,(len(dataframe) for dataframe in dataframes))
+        Returns:
+        Predicate: A function returning which applicants meet all child requirements, all applicants for an empty AND.
+        '''
+        predicates = [requirement.get_predicate() for requirement in self.requirements]
 
-        # dataframes are concatenated to match the length of the new dataframe
-        adjusted_dataframes = [pd.concat([dataframe]*(constellations // len(dataframe)), ignore_index=True) for dataframe in dataframes]
-        return pd.concat(adjusted_dataframes, axis=1)
+        def predicate(answers: Dict[str, np.ndarray], count: int) -> np.ndarray:
+            eligible = np.ones(count, dtype=bool)
+            for requirement_predicate in predicates:
+                eligible &= requirement_predicate(answers, count)
+            return eligible
+
+        return predicate
 
 class Logical_OR(Requirement_Logical):
     
@@ -133,17 +396,62 @@ class Logical_OR(Requirement_Logical):
     its structure and behaviors but specifies evaluation logic specific to the OR operation.
     '''
     
-    def get_dataframe(self) -> pd.DataFrame:
+    def _build_constellation(self) -> Constellation:
 
         '''
-        Returns the requirement as a dataframe.
+        Builds the constellations of the requirement.
 
         Returns:
-        DataFrame: A dataframe representing the requirement.
+        Constellation: The concatenation of the constellations of the child requirements.
         '''
 
-        dataframes = [requirement.get_dataframe() for requirement in self.requirements]
-        return pd.concat(dataframes, ignore_index=True)
+        return Constellation_Union([requirement.get_constellation() for requirement in self.requirements])
+
+    def _build_check(self) -> Check:
+        '''
+        Builds the check of the requirement, which stops at the first child requirement that is met.
+
+        Returns:
+        Check: A function returning whether an applicant meets any child requirement.
+        '''
+        return self._build_short_circuit_check(True)
+
+    def _build_predicate(self) -> Predicate:
+        '''
+        Builds the predicate of the requirement.
+
+        Returns:
+        Predicate: A function returning which applicants meet any child requirement, no applicant for an empty OR.
+        '''
+        predicates = [requirement.get_predicate() for requirement in self.requirements]
+
+        def predicate(answers: Dict[str, np.ndarray], count: int) -> np.ndarray:
+            eligible = np.zeros(count, dtype=bool)
+            for requirement_predicate in predicates:
+                eligible |= requirement_predicate(answers, count)
+            return eligible
+
+        return predicate
+
+    def normalize(self) -> Requirement:
+        '''
+        Returns a requirement with the same eligibility whose constellations have as few rows and tables as possible.
+
+        Nested ORs are flattened, duplicates are dropped, overlapping requirements on the same attribute are united and the OR is always satisfied if one of its children is.
+
+        Returns:
+        Requirement: The normalized requirement.
+        '''
+        requirements = self._get_normalized_requirements()
+        if any(isinstance(requirement, Logical_AND) and len(requirement.requirements) == 0 for requirement in requirements):
+            return Logical_AND(requirements=[])
+
+        # uniting two requirements may make them overlap with a third one
+        merged_requirements = self._merge_requirements(requirements, lambda first, second: first.unite(second))
+        while len(merged_requirements) < len(requirements):
+            requirements = merged_requirements
+            merged_requirements = self._merge_requirements(requirements, lambda first, second: first.unite(second))
+        return self._get_normalized(merged_requirements)
         
     def get_tree_string(self) -> str:
         '''
@@ -174,6 +482,10 @@ class Requirement_Concrete(Requirement):
         super().__init__()
         self.attribute = attribute
 
+    def invalidate_attribute(self, attribute: Attribute) -> None:
+        if self.attribute == attribute:
+            self.invalidate()
+
 
 class Requirement_Numerical(Requirement_Concrete):
 
@@ -203,6 +515,7 @@ class Requirement_Numerical(Requirement_Concrete):
         '''
         if comparison_operator in self.comparison_operators:
             self.comparison_operator = comparison_operator
+            self.invalidate()
         else:
             print(f"Invalid comparison operator {comparison_operator}.")
 
@@ -217,6 +530,72 @@ class Requirement_Numerical(Requirement_Concrete):
         '''
 
         return f'{self.attribute.title} {self.comparison_operator} {self.required_value}'
+
+    def get_interval(self) -> Tuple[float, float]:
+        '''
+        Returns the bounds of the required interval.
+
+        Returns:
+        Tuple[float, float]: The lower and the upper bound, both included.
+        '''
+
+        # depending on the comparison operator, the bounds are taken from the required value or the range of the attribute
+        if self.comparison_operator == '[]':
+            return self.required_value[0], self.required_value[1]
+        elif self.comparison_operator == '==':
+            return self.required_value[0], self.required_value[0]
+        elif self.comparison_operator == '<=':
+            return self.attribute.min, self.required_value[0]
+        elif self.comparison_operator == '>=':
+            return self.required_value[0], self.attribute.max
+
+    def normalize(self) -> Requirement:
+        if self.is_unsatisfiable():
+            return Logical_OR(requirements=[])
+        return self
+
+    def is_unsatisfiable(self) -> bool:
+        '''
+        Returns True if no value lies in the required interval.
+        '''
+        lower, upper = self.get_interval()
+        return lower > upper
+
+    def intersect(self, requirement: 'Requirement_Numerical') -> 'Requirement_Numerical':
+        '''
+        Returns the requirement on the intersection of the required intervals of both requirements on the same attribute.
+
+        Parameters:
+        - requirement (Requirement_Numerical): The other requirement.
+
+        Returns:
+        Requirement_Numerical: One of the requirements if its interval lies within the other, a new requirement otherwise, which may be unsatisfiable.
+        '''
+        (lower, upper), (other_lower, other_upper) = self.get_interval(), requirement.get_interval()
+        if other_lower <= lower and upper <= other_upper:
+            return self
+        if lower <= other_lower and other_upper <= upper:
+            return requirement
+        return Requirement_Numerical(attribute=self.attribute, comparison_operator='[]', required_value=[max(lower, other_lower), min(upper, other_upper)])
+
+    def unite(self, requirement: 'Requirement_Numerical') -> Optional['Requirement_Numerical']:
+        '''
+        Returns the requirement on the union of the required intervals of both requirements on the same attribute, if they overlap.
+
+        Parameters:
+        - requirement (Requirement_Numerical): The other requirement.
+
+        Returns:
+        Optional[Requirement_Numerical]: One of the requirements if its interval contains the other, a new requirement if they overlap, None if the intervals are disjoint.
+        '''
+        (lower, upper), (other_lower, other_upper) = self.get_interval(), requirement.get_interval()
+        if lower > other_upper or other_lower > upper:
+            return None
+        if lower <= other_lower and other_upper <= upper:
+            return self
+        if other_lower <= lower and upper <= other_upper:
+            return requirement
+        return Requirement_Numerical(attribute=self.attribute, comparison_operator='[]', required_value=[min(lower, other_lower), max(upper, other_upper)])
     
     def export(self) -> Dict:
 
@@ -233,23 +612,50 @@ class Requirement_Numerical(Requirement_Concrete):
             }
         }
     
-    def get_dataframe(self) -> pd.DataFrame:
+    def _build_constellation(self) -> Constellation:
         '''
-        Returns the requirement as a dataframe.
+        Builds the constellations of the requirement.
 
         Returns:
-        DataFrame: A dataframe representing the requirement.
+        Constellation: A table with the bounds of the required interval.
         '''
 
-        # depending on the comparison operator, we return a dataframe with the required value
-        if self.comparison_operator == '[]':
-            return pd.DataFrame({self.attribute.title: [(self.required_value[0],self.required_value[1])]})
-        if self.comparison_operator == '==':
-            return pd.DataFrame({self.attribute.title: [(self.required_value[0],self.required_value[0])]})
-        if self.comparison_operator == '<=':
-            return pd.DataFrame({self.attribute.title: [(self.attribute.min,self.required_value[0])]})
-        if self.comparison_operator == '>=':
-            return pd.DataFrame({self.attribute.title: [(self.required_value[0],self.attribute.max)]})
+        lower, upper = self.get_interval()
+        return Constellation_Table(pd.DataFrame({self.attribute.lower_column: [lower], self.attribute.upper_column: [upper]}, dtype='float64'), self.attribute)
+
+    def _build_predicate(self) -> Predicate:
+        '''
+        Builds the predicate of the requirement.
+
+        Returns:
+        Predicate: A function returning which applicants answered a number within the required interval.
+        '''
+        title = self.attribute.title
+        lower, upper = self.get_interval()
+
+        def predicate(answers: Dict[str, np.ndarray], count: int) -> np.ndarray:
+            if title not in answers:
+                return np.zeros(count, dtype=bool)
+            # comparisons with missing answers are False
+            return (lower <= answers[title]) & (answers[title] <= upper)
+
+        return predicate
+
+    def _build_check(self) -> Check:
+        '''
+        Builds the check of the requirement.
+
+        Returns:
+        Check: A function returning whether an applicant answered a number within the required interval.
+        '''
+        title = self.attribute.title
+        lower, upper = self.get_interval()
+
+        def check(answers: Dict[str, Any]) -> bool:
+            answer = answers.get(title)
+            return answer is not None and lower <= answer <= upper
+
+        return check
 
 class Requirement_Categorical(Requirement_Concrete):
 
@@ -267,15 +673,93 @@ class Requirement_Categorical(Requirement_Concrete):
         
         '''        
         return f'{self.attribute.title} in {self.required_value}'
+
+    def normalize(self) -> Requirement:
+        if self.is_unsatisfiable():
+            return Logical_OR(requirements=[])
+        return self
+
+    def is_unsatisfiable(self) -> bool:
+        '''
+        Returns True if no answer option is required.
+        '''
+        return len(self.required_value) == 0
+
+    def intersect(self, requirement: 'Requirement_Categorical') -> 'Requirement_Categorical':
+        '''
+        Returns the requirement on the answer options required by both requirements on the same attribute.
+
+        Parameters:
+        - requirement (Requirement_Categorical): The other requirement.
+
+        Returns:
+        Requirement_Categorical: One of the requirements if its options are among the other's, a new requirement otherwise, which may be unsatisfiable.
+        '''
+        if set(self.required_value) <= set(requirement.required_value):
+            return self
+        if set(requirement.required_value) <= set(self.required_value):
+            return requirement
+        return Requirement_Categorical(attribute=self.attribute, required_value=[value for value in self.required_value if value in requirement.required_value])
+
+    def unite(self, requirement: 'Requirement_Categorical') -> 'Requirement_Categorical':
+        '''
+        Returns the requirement on the answer options required by either requirement on the same attribute.
+
+        Parameters:
+        - requirement (Requirement_Categorical): The other requirement.
+
+        Returns:
+        Requirement_Categorical: One of the requirements if its options include the other's, a new requirement otherwise.
+        '''
+        if set(requirement.required_value) <= set(self.required_value):
+            return self
+        if set(self.required_value) <= set(requirement.required_value):
+            return requirement
+        return Requirement_Categorical(attribute=self.attribute, required_value=self.required_value + [value for value in requirement.required_value if value not in self.required_value])
     
-    def get_dataframe(self) -> pd.DataFrame:
+    def _build_constellation(self) -> Constellation:
         '''
-        Returns the requirement as a dataframe.
+        Builds the constellations of the requirement.
 
         Returns:
-        DataFrame: A dataframe representing the requirement.
+        Constellation: A table with a single row holding the integer bitmask of the required values.
+        '''
+        required_values = [f'{required_value}' for required_value in self.required_value]
+        return Constellation_Table(pd.DataFrame({self.attribute.title: [self.attribute.get_bitmask(required_values)]}, dtype='int64'), self.attribute)
+
+    def _build_predicate(self) -> Predicate:
         '''
-        return pd.DataFrame({self.attribute.title: [f'{required_value}' for required_value in self.required_value]})
+        Builds the predicate of the requirement.
+
+        Returns:
+        Predicate: A function returning which applicants answered one of the required values, looking up the answer indices in the bitmask of the required values.
+        '''
+        title = self.attribute.title
+        bitmask = np.int64(self.attribute.get_bitmask([f'{required_value}' for required_value in self.required_value]))
+
+        def predicate(answers: Dict[str, np.ndarray], count: int) -> np.ndarray:
+            if title not in answers:
+                return np.zeros(count, dtype=bool)
+            codes = answers[title]
+            return (codes >= 0) & ((bitmask >> np.maximum(codes, 0)) & 1 == 1)
+
+        return predicate
+
+    def _build_check(self) -> Check:
+        '''
+        Builds the check of the requirement.
+
+        Returns:
+        Check: A function returning whether an applicant answered one of the required values that is an answer option.
+        '''
+        title = self.attribute.title
+        required_values = {f'{required_value}' for required_value in self.required_value}
+        accepted_answers = frozenset(answer_option for answer_option in self.attribute.answer_options if answer_option in required_values)
+
+        def check(answers: Dict[str, Any]) -> bool:
+            return answers.get(title) in accepted_answers
+
+        return check
     
     def export(self) -> Dict:
         '''
@@ -1,7 +1,7 @@
-from typing import List, Set
-from src.requirement import Requirement, Requirement_Concrete
+from typing import Any, Dict, Optional
+from src.requirement import Check, Predicate, Requirement, Requirement_Concrete, Logical_AND, Logical_OR
 from src.attribute import Attribute
-from collections import Counter
+from src.constellation import Constellation, Constellation_Table, Constellation_Product
 import pandas as pd
 
 class SocialBenefit:
@@ -9,20 +9,55 @@ class SocialBenefit:
     '''
     The class SocialBenefit represents a social benefit and its requirements.
 
+    Every social benefit gets an integer id from the dataset it is added to, which labels its constellations instead of the name, so renaming it keeps its constellations valid.
+    The dataset gives every social benefit the smallest id no other social benefit of it has, see DataSet.add_social_benefit, so the bitmasks of social benefit ids stay as narrow as the dataset.
+
+    A social benefit without any concrete requirement, like a newly added one or one whose last requirement was removed, is never eligible until it gets requirements.
+
     '''
 
     def __init__(self, name: str, requirement: Requirement):
+        # set by the dataset when the social benefit is added to it
+        self.id: Optional[int] = None
         self.name = name
         self.requirement = requirement
+        self.requirement.set_social_benefit(self)
+        self._constellation: Constellation = None
+        self._predicate: Predicate = None
+        self._check: Check = None
+
+    def __getstate__(self) -> dict:
+        '''
+        Returns the state of the social benefit for pickling, e.g. when the dataset is sent to worker processes.
+        The cached predicate and check are closures that can't be pickled, and the cached constellations hold dataframes that are
+        cheaper to rebuild than to pickle, so they are all left out and rebuilt on first use.
+        '''
+        state = self.__dict__.copy()
+        state['_constellation'] = None
+        state['_predicate'] = None
+        state['_check'] = None
+        return state
+
+    def invalidate(self) -> None:
+        '''
+        Discards the cached constellations, predicate and check of the social benefit. Has to be called whenever the name or the requirement changes.
+        '''
+        self._constellation = None
+        self._predicate = None
+        self._check = None
 
     
-    def remove_requirement(self) -> None:
+    def remove_requirement(self, requirement: Requirement = None) -> None:
         '''
-        Removes the requirement from the social benefit.
+        Removes the requirement from the social benefit, leaving an empty AND requirement.
+
+        Parameters:
+        - requirement (Requirement): The removed requirement, which is always the requirement of the social benefit.
 
         '''
-        self.requirement = []
-        self.set_relevant_attributes()
+        self.requirement = Logical_AND(requirements=[])
+        self.requirement.set_social_benefit(self)
+        self.invalidate()
         print(f"Requirement successfully removed.")
 
         
@@ -55,6 +90,75 @@ class SocialBenefit:
             'requirements': self.requirement.export()
         }
     
+    def has_requirements(self) -> bool:
+        '''
+        Tells whether the social benefit has at least one concrete requirement. Social benefits without are never eligible.
+
+        Returns:
+        bool: True if the requirements contain a concrete requirement.
+
+        '''
+        return self.requirement.get_cost() > 0
+
+    def _get_normalized_requirement(self) -> Requirement:
+        '''
+        Returns the normalized requirements of the social benefit, an unsatisfiable empty OR if it has no concrete requirement.
+
+        Returns:
+        Requirement: The requirement the constellations, predicate and check are built from.
+
+        '''
+        return self.requirement.normalize() if self.has_requirements() else Logical_OR(requirements=[])
+
+    def get_constellation(self) -> Constellation:
+        '''
+        Returns the constellations of the social benefit requirements, labelled with the id of the social benefit.
+        The requirements are normalized first, so that equivalent requirements don't add rows or tables.
+        The constellations are cached until the social benefit or one of its requirements is invalidated.
+
+        Returns:
+        Constellation: The constellations of the requirements with an integer 'social_benefit' column.
+
+        '''
+        if self._constellation is None:
+            label = Constellation_Table(pd.DataFrame({'social_benefit': [self.id]}, dtype='int64'))
+            self._constellation = Constellation_Product([self._get_normalized_requirement().get_constellation(), label])
+
+        return self._constellation
+    
+    def get_predicate(self) -> Predicate:
+        '''
+        Returns a vectorized function telling which of many applicants are eligible for the social benefit, see Requirement.get_predicate.
+        The predicate is built from the normalized requirements and cached until the social benefit or one of its requirements is invalidated.
+
+        Returns:
+        Predicate: The function returning a boolean array with an entry per applicant.
+
+        '''
+        if self._predicate is None:
+            self._predicate = self._get_normalized_requirement().get_predicate()
+
+        return self._predicate
+
+    def is_eligible(self, answers: Dict[str, Any]) -> bool:
+        '''
+        Checks whether a single applicant is eligible for the social benefit, see Requirement.get_check.
+
+        The check is compiled once from the normalized requirements into nested functions, which are cached until the social benefit
+        or one of its requirements is invalidated. ANDs and ORs stop at the first decisive child and reorder their children by the observed results.
+
+        Parameters:
+        - answers (Dict[str, Any]): The answers of the applicant per attribute title.
+
+        Returns:
+        bool: True if the applicant is eligible.
+
+        '''
+        if self._check is None:
+            self._check = self._get_normalized_requirement().get_check()
+
+        return self._check(answers)
+
     def get_dataframe(self)-> pd.DataFrame:
         '''
         Returns the social benefit requirements as a dataframe.
@@ -63,7 +167,4 @@ class SocialBenefit:
         DataFrame: A dataframe representing the social benefit requirements.
 
         '''
-        dataframe = self.requirement.get_dataframe()
-        dataframe['social_benefit'] = self.name
-
-        return dataframe
+        return self.get_constellation().to_dataframe()
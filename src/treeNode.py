@@ -1,22 +1,123 @@
+from src.attribute import Attribute_Numerical
+from src.intervalIndex import get_pieces
+
 class TreeNode:
-    def __init__(self, attribute=None, social_benefits=None, children=None):
+    def __init__(self, attribute=None, social_benefits=None, children=None, value=None, thresholds=None):
         """
         Initializes the TreeNode object with an attribute, social benefits, and children.
         Parameters:
         - attribute (Attribute): The attribute associated with the node.
-        - social_benefits (List[SocialBenefit]): The social benefits associated with the node.
+        - social_benefits (int): The social benefits of a leaf as a bitmask with bit i set for the social benefit with id i. None for inner nodes.
         - children (List[TreeNode]): The children of the node.
+        - value (Any): The answer to the attribute of the parent node that leads to this node. None for the root.
+        - thresholds (List[float]): The sorted bounds of the constellations at a node splitting on a numerical attribute.
         """
         self.attribute = attribute
         self.social_benefits = social_benefits
         self.children = children if children is not None else []
-    
-    def export(self):
+        self.value = value
+        self.thresholds = thresholds
+
+    @property
+    def children(self):
         """
-        Converts the current node to a JSON object.
+        The children of the node. Assigning other children discards the lookup of get_child, which is built again on first use.
+        """
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        self._children = children
+        self._child_lookup = None
+
+    def get_child(self, answer):
+        """
+        Gets the child that the given answer to the attribute of the node leads to.
+
+        The bounds in thresholds cut the numbers into pieces, the bounds themselves and the open intervals between them.
+        All answers within a piece match the same constellations, so a numerical answer leads to the child whose value lies in the same piece.
+        The children are looked up by the piece of a numerical answer or by a categorical answer itself, see _get_child_lookup.
+
+        Parameters:
+        - answer (Any): The answer to the attribute of the node.
+
+        Returns:
+        - TreeNode: The child the answer leads to, None if no child stands for the answer.
+        """
+        if self._child_lookup is None:
+            self._child_lookup = self._get_child_lookup()
+
+        if isinstance(self.attribute, Attribute_Numerical):
+            return self._child_lookup[self.get_piece(answer)]
+        return self._child_lookup.get(answer)
+
+    def _get_child_lookup(self):
+        """
+        Builds the lookup of the children by the answers leading to them, the first child standing for an answer winning.
+        The children are only complete once the tree is built or loaded, so the lookup is built on the first call of get_child.
+
+        Returns:
+        - Union[List[TreeNode], Dict[Any, TreeNode]]: For a numerical attribute the child per piece of thresholds, None for the pieces without a child,
+          otherwise the child per answer option.
+        """
+        if isinstance(self.attribute, Attribute_Numerical):
+            children = [None] * (2 * len(self.thresholds) + 1)
+            for child in self.children:
+                piece = self.get_piece(child.value)
+                if children[piece] is None:
+                    children[piece] = child
+            return children
+
+        children = {}
+        for child in self.children:
+            children.setdefault(child.value, child)
+        return children
+
+    def get_piece(self, number):
+        """
+        Gets the piece of the numbers cut by the bounds in thresholds that the given number lies in.
+
+        Parameters:
+        - number (float): The answer to the numerical attribute of the node.
+
+        Returns:
+        - int: The piece, 2i for the open interval below threshold i and 2i + 1 for threshold i, see intervalIndex.get_pieces.
+        """
+        return int(get_pieces(self.thresholds, number))
+
+    def iterate_subtree(self):
+        """
+        Iterates over the nodes of the subtree of the current node without recursion, every node after its children and the children in their order.
+        A node shared by several parents is only visited once.
+
+        Returns:
+        - Iterator[TreeNode]: The distinct nodes of the subtree, the current node last.
+        """
+        visited = set()
+        nodes = [(self, False)]
+        while nodes:
+            node, expanded = nodes.pop()
+            if expanded:
+                yield node
+            elif id(node) not in visited:
+                visited.add(id(node))
+                nodes.append((node, True))
+                nodes.extend((child, False) for child in reversed(node.children))
+
+    def export(self, children, social_benefit_positions):
+        """
+        Converts the current node to a JSON object. The children are exported separately, the object only refers to them by their positions
+        in the model file, together with the answers leading to them, so nodes sharing their children are exported once.
+        The social benefits of a leaf are exported as their positions in the social benefit list, as their ids differ between runs.
+
+        Parameters:
+        - children (List[Tuple[int, Any]]): The position of every child in the model file and the answer leading to it.
+        - social_benefit_positions (Dict[int, int]): The position of every social benefit in the social benefit list by its id.
         """
         return {
-            'feature': self.feature,
-            'value': self.value,
-            'children': [child.to_json() for child in self.children]
-        }
\ No newline at end of file
+            'attribute': self.attribute.title if self.attribute is not None else None,
+            'thresholds': [float(threshold) for threshold in self.thresholds] if self.thresholds is not None else None,
+            'social_benefits': [position for social_benefit_id, position in social_benefit_positions.items() if self.social_benefits >> social_benefit_id & 1] if self.social_benefits is not None else None,
+            'children': [position for position, _ in children],
+            'values': [value.item() if hasattr(value, 'item') else value for _, value in children]
+        }
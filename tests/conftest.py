@@ -0,0 +1,120 @@
+import contextlib
+import io
+import json
+import random
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.attribute import Attribute_Numerical
+from src.dataset import DataSet
+from src.decisionTree import DecisionTree
+
+
+def generate_data(seed: int, social_benefit_count: int = 12) -> Dict:
+    '''
+    Generates a random catalog of attributes and social benefits in the format of the exported data.
+
+    Parameters:
+    - seed (int): The seed of the random numbers.
+    - social_benefit_count (int): The number of social benefits.
+
+    Returns:
+    Dict: The attributes and social benefits as exported by datasetIo.export_data_to_json.
+    '''
+    rng = random.Random(seed)
+    categorical_attributes = [{'type': 'attribute_categorical', 'title': f'c{index}', 'question': f'c{index}?', 'answer_options': [f'o{option}' for option in range(rng.randint(2, 4))]} for index in range(5)]
+    numerical_attributes = [{'type': 'attribute_numerical', 'title': f'n{index}', 'question': f'n{index}?', 'min': 0, 'max': 100} for index in range(4)]
+
+    def concrete_requirement():
+        if rng.random() < 0.5:
+            attribute = rng.choice(categorical_attributes)
+            required_value = rng.sample(attribute['answer_options'], rng.randint(1, len(attribute['answer_options']) - 1))
+            return {'type': 'attribute_categorical', 'content': {'title': attribute['title'], 'required_value': required_value}}
+        attribute = rng.choice(numerical_attributes)
+        comparison_operator = rng.choice(['<=', '>=', '==', '[]'])
+        lower_bound = rng.randint(0, 90)
+        required_value = [lower_bound, rng.randint(lower_bound, 100)] if comparison_operator == '[]' else [rng.randint(0, 100)]
+        return {'type': 'attribute_numerical', 'content': {'title': attribute['title'], 'comparison_operator': comparison_operator, 'required_value': required_value}}
+
+    def requirement():
+        if rng.random() < 0.3:
+            return {'type': 'OR', 'content': [concrete_requirement() for _ in range(rng.randint(2, 3))]}
+        return concrete_requirement()
+
+    social_benefits = [{'name': f'b{index}', 'requirements': {'type': 'AND', 'content': [requirement() for _ in range(rng.randint(1, 4))]}} for index in range(social_benefit_count)]
+    return {'attributes': categorical_attributes + numerical_attributes, 'social_benefits': social_benefits}
+
+
+@pytest.fixture
+def working_directory(tmp_path, monkeypatch):
+    '''
+    Changes into an empty directory with the layout of the repository, so the data and models written by the tests stay there.
+    '''
+    (tmp_path / 'data' / 'exported_data').mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(params=[1, 2, 3])
+def dataset(request, working_directory) -> DataSet:
+    '''
+    Loads a random catalog, one per seed, as exported data.
+    '''
+    with open(working_directory / 'data' / 'exported_data' / 'exported_data.json', 'w', encoding='utf-8') as file:
+        json.dump(generate_data(request.param), file)
+    return DataSet()
+
+
+@pytest.fixture
+def quiet():
+    '''
+    Silences the progress messages of the dataset and the decision tree.
+    '''
+    return lambda: contextlib.redirect_stdout(io.StringIO())
+
+
+@pytest.fixture
+def applicants(dataset) -> pd.DataFrame:
+    '''
+    Generates fully answered applicants, whose numerical answers lie on, between and beyond the bounds of the requirements.
+    '''
+    rng = random.Random(0)
+    decision_tree = DecisionTree(dataset)
+    constellations = decision_tree.get_constellations()
+    bounds = {attribute.title: list(decision_tree._get_elementary_bounds(constellations, attribute)) for attribute in dataset.attribute_list if isinstance(attribute, Attribute_Numerical)}
+
+    def answer(attribute):
+        if not isinstance(attribute, Attribute_Numerical):
+            return rng.choice(attribute.answer_options)
+        candidates = bounds[attribute.title] + [bound + 0.5 for bound in bounds[attribute.title]] + [-5.0, 1000.0]
+        return float(rng.choice(candidates))
+
+    return pd.DataFrame([{attribute.title: answer(attribute) for attribute in dataset.attribute_list} for _ in range(500)])
+
+
+def get_expected_masks(dataset: DataSet, applicants: pd.DataFrame) -> List[int]:
+    '''
+    Gets the bitmasks of the social benefits the applicants are eligible for by checking their requirements.
+    '''
+    masks = np.array([1 << social_benefit.id for social_benefit in dataset.social_benefit_list], dtype=object)
+    return list(np.where(dataset.get_eligibility(applicants), masks, 0).sum(axis=1))
+
+
+def expand(node, value=None) -> List[Tuple]:
+    '''
+    Lists the nodes of a subtree with the answers leading to them, visiting shared subtrees once per parent.
+    '''
+    nodes = [(node.attribute.title if node.attribute is not None else None, value, tuple(node.thresholds or ()), node.social_benefits)]
+    for child in node.children:
+        nodes.extend(expand(child, child.value))
+    return nodes
+
+
+def count_children_lists(node) -> int:
+    '''
+    Counts the distinct lists of children in a subtree, which nodes sharing a subtree have in common.
+    '''
+    return len({id(node.children) for node in node.iterate_subtree()})
@@ -0,0 +1,29 @@
+import pytest
+
+from src.attribute import Attribute_Categorical
+from src.cli import CLI
+from src.requirement import Requirement_Categorical
+
+
+def test_bitmasks_of_all_answer_options_fit_into_the_constellations():
+    answer_options = [f'option {index}' for index in range(Attribute_Categorical.max_answer_options)]
+    attribute = Attribute_Categorical('c', 'Which one?', answer_options)
+
+    dataframe = Requirement_Categorical(attribute, answer_options[-1:]).get_dataframe()
+    assert dataframe['c'].tolist() == [1 << (len(answer_options) - 1)]
+    with pytest.raises(ValueError):
+        Attribute_Categorical('c', 'Which one?', answer_options + ['one too many'])
+
+
+def test_too_many_answer_options_keep_the_previous_ones(dataset, quiet):
+    attribute = next(attribute for attribute in dataset.attribute_list if isinstance(attribute, Attribute_Categorical))
+    answer_options = attribute.answer_options
+    with pytest.raises(ValueError):
+        attribute.answer_options = [f'option {index}' for index in range(Attribute_Categorical.max_answer_options + 1)]
+    assert attribute.answer_options is answer_options
+
+    cli = CLI(dataset)
+    cli.get_user_input_text = lambda question: ','.join(f'option {index}' for index in range(Attribute_Categorical.max_answer_options + 1))
+    with quiet():
+        cli.edit_attribute_answer_options(attribute)
+    assert attribute.answer_options is answer_options
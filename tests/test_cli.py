@@ -0,0 +1,21 @@
+from src.cli import CLI
+from src.dataset import DataSet
+from src.decisionTree import DecisionTree
+from tests.conftest import get_expected_masks
+
+
+def test_patched_tree_is_saved_for_the_edited_dataset(dataset, applicants, quiet):
+    cli = CLI(dataset)
+    with quiet():
+        cli.fit_decision_tree()
+        social_benefit = dataset.social_benefit_list[0]
+        dataset.remove_social_benefit(social_benefit)
+        cli.update_decision_tree(removed_social_benefit=social_benefit)
+        dataset.rename_social_benefit(dataset.social_benefit_list[0], 'renamed')
+        cli.save_decision_tree()
+        dataset.export()
+        loaded_dataset = DataSet()
+        loaded_tree = DecisionTree(loaded_dataset)
+
+        assert loaded_tree.load(DecisionTree.model_path)
+    assert list(loaded_tree.predict_batch(applicants)) == get_expected_masks(loaded_dataset, applicants)
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from src.attribute import Attribute_Numerical
+from src.decisionTree import DecisionTree
+from tests.conftest import expand
+
+
+def filter_constellations(dataframe: pd.DataFrame, attribute, value) -> pd.DataFrame:
+    '''
+    Keeps the constellations matching the given answer, without the columns of the answered attribute.
+    '''
+    if isinstance(attribute, Attribute_Numerical):
+        matches = pd.Series(True, index=dataframe.index)
+        if attribute.lower_column in dataframe.columns:
+            matches &= dataframe[attribute.lower_column].isna() | (dataframe[attribute.lower_column] <= value)
+        if attribute.upper_column in dataframe.columns:
+            matches &= dataframe[attribute.upper_column].isna() | (dataframe[attribute.upper_column] >= value)
+        columns = [attribute.lower_column, attribute.upper_column]
+    else:
+        bitmasks = dataframe[attribute.title]
+        matches = bitmasks.isna() | ((bitmasks.fillna(0).astype('int64') & attribute.get_bitmask([value])) != 0)
+        columns = [attribute.title]
+    return dataframe[matches].drop(columns=columns, errors='ignore')
+
+
+@pytest.mark.parametrize('engine', DecisionTree.engines)
+def test_leaves_hold_the_social_benefits_of_the_remaining_constellations(dataset, quiet, engine):
+    decision_tree = DecisionTree(dataset, max_depth=4, engine=engine)
+    with quiet():
+        decision_tree.fit()
+
+    paths = [(decision_tree.root, dataset.get_dataframes())]
+    while paths:
+        node, dataframe = paths.pop()
+        if node.attribute is None:
+            assert node.social_benefits == sum(1 << int(social_benefit_id) for social_benefit_id in dataframe['social_benefit'].unique())
+            continue
+        for child in node.children:
+            paths.append((child, filter_constellations(dataframe, node.attribute, child.value)))
+
+
+def test_engines_build_the_same_tree(dataset, quiet):
+    trees = [DecisionTree(dataset, engine=engine) for engine in DecisionTree.engines]
+    with quiet():
+        for decision_tree in trees:
+            decision_tree.fit()
+    assert expand(trees[0].root) == expand(trees[1].root)
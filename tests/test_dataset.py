@@ -0,0 +1,64 @@
+import warnings
+
+import pandas as pd
+
+from src.attribute import Attribute_Categorical
+from src.dataset import DataSet
+from src.requirement import Logical_AND, Requirement_Categorical
+from src.socialBenefit import SocialBenefit
+
+
+def test_products_merge_repeated_columns(dataset):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)
+        dataframe = dataset.get_dataframes()
+
+    assert not dataframe.columns.has_duplicates
+    assert pd.api.types.is_integer_dtype(dataframe['social_benefit'])
+
+
+def test_products_merge_categorical_columns_named_like_bounds():
+    attribute = Attribute_Categorical('x_lower', 'Which one?', ['a', 'b', 'c'])
+    requirement = Logical_AND([Requirement_Categorical(attribute, ['a', 'b']), Requirement_Categorical(attribute, ['b', 'c'])])
+
+    assert requirement.get_dataframe()['x_lower'].tolist() == [attribute.get_bitmask(['b'])]
+
+
+def test_renaming_keeps_the_lookups_in_sync(dataset):
+    attribute = dataset.get_attribute_from_title('c0')
+    dataset.rename_attribute(attribute, 'renamed')
+
+    assert dataset.get_attribute_from_title('renamed') is attribute
+    assert dataset.get_attribute_from_title('c0') is None
+    assert dataset.check_attribute_title('renamed') and not dataset.check_attribute_title('c0')
+    assert 'c0' not in dataset.get_dataframes().columns
+
+    social_benefit, other_social_benefit = dataset.social_benefit_list[:2]
+    name, other_name = social_benefit.name, other_social_benefit.name
+    dataset.rename_social_benefit(social_benefit, other_name)
+    assert dataset.get_social_benefit_from_name(name) is None
+    assert dataset.get_social_benefit_from_name(other_name) is other_social_benefit
+
+    # the name points to the next social benefit with it once the first one is renamed or removed
+    dataset.rename_social_benefit(other_social_benefit, 'renamed')
+    assert dataset.get_social_benefit_from_name(other_name) is social_benefit
+    assert dataset.get_social_benefit_from_name('renamed') is other_social_benefit
+    dataset.remove_social_benefit(social_benefit)
+    assert dataset.get_social_benefit_from_name(other_name) is None
+
+
+def test_social_benefits_get_dense_ids_reusing_the_ids_of_removed_ones(dataset):
+    social_benefit_count = len(dataset.social_benefit_list)
+    assert [social_benefit.id for social_benefit in dataset.social_benefit_list] == list(range(social_benefit_count))
+    assert [social_benefit.id for social_benefit in DataSet().social_benefit_list] == list(range(social_benefit_count))
+
+    removed_social_benefit = dataset.social_benefit_list[3]
+    dataset.remove_social_benefit(removed_social_benefit)
+    added_social_benefit = SocialBenefit('added', Logical_AND(requirements=[]))
+    dataset.add_social_benefit(added_social_benefit)
+    dataset.add_social_benefit(removed_social_benefit)
+
+    assert added_social_benefit.id == 3 and removed_social_benefit.id == social_benefit_count
+    assert dataset.get_social_benefit_from_id(3) is added_social_benefit
+    assert dataset.get_social_benefits_from_mask(1 << 3 | 1 << social_benefit_count) == [added_social_benefit, removed_social_benefit]
+    assert set(dataset.get_dataframes()['social_benefit']) <= set(range(social_benefit_count + 1))
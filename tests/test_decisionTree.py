@@ -0,0 +1,80 @@
+import pytest
+
+from src.decisionTree import DecisionTree
+from tests.conftest import get_expected_masks
+
+
+def test_patched_tree_predicts_like_a_fitted_one(dataset, applicants, quiet):
+    social_benefit = dataset.social_benefit_list[-1]
+    with quiet():
+        dataset.remove_social_benefit(social_benefit)
+        decision_tree = DecisionTree(dataset)
+        decision_tree.fit()
+        dataset.add_social_benefit(social_benefit)
+        decision_tree.add_social_benefit(social_benefit)
+        fitted_tree = DecisionTree(dataset)
+        fitted_tree.fit()
+
+    assert list(decision_tree.predict_batch(applicants)) == list(fitted_tree.predict_batch(applicants)) == get_expected_masks(dataset, applicants)
+
+
+def test_tree_patched_for_a_removed_social_benefit_predicts_like_a_fitted_one(dataset, applicants, quiet):
+    decision_tree = DecisionTree(dataset)
+    with quiet():
+        decision_tree.fit()
+        social_benefit = dataset.social_benefit_list[0]
+        dataset.remove_social_benefit(social_benefit)
+        decision_tree.remove_social_benefit(social_benefit)
+        fitted_tree = DecisionTree(dataset)
+        fitted_tree.fit()
+
+    assert list(decision_tree.predict_batch(applicants)) == list(fitted_tree.predict_batch(applicants)) == get_expected_masks(dataset, applicants)
+
+
+def test_tree_patched_for_an_edited_social_benefit_predicts_like_a_fitted_one(dataset, applicants, quiet):
+    decision_tree = DecisionTree(dataset)
+    with quiet():
+        decision_tree.fit()
+        social_benefit = dataset.social_benefit_list[0]
+        social_benefit.requirement.remove_requirement(social_benefit.requirement.requirements[0])
+        decision_tree.update_social_benefit(social_benefit)
+        fitted_tree = DecisionTree(dataset)
+        fitted_tree.fit()
+
+    assert list(decision_tree.predict_batch(applicants)) == list(fitted_tree.predict_batch(applicants)) == get_expected_masks(dataset, applicants)
+
+
+@pytest.mark.parametrize('title', ['c0', 'n0'])
+def test_tree_patched_for_a_removed_attribute_predicts_like_a_fitted_one(dataset, applicants, quiet, title):
+    decision_tree = DecisionTree(dataset)
+    attribute = dataset.get_attribute_from_title(title)
+    with quiet():
+        decision_tree.fit()
+        changed_social_benefits = dataset.remove_attribute(attribute)
+        decision_tree.remove_attribute(attribute, changed_social_benefits)
+        fitted_tree = DecisionTree(dataset)
+        fitted_tree.fit()
+    applicants = applicants.drop(columns=[title])
+
+    assert not set(dataset.get_dataframes().columns) & {title, f'{title}_lower', f'{title}_upper'}
+    assert list(decision_tree.predict_batch(applicants)) == list(fitted_tree.predict_batch(applicants)) == get_expected_masks(dataset, applicants)
+
+
+def test_patched_tree_collects_its_leaf_depths_on_first_use(dataset, quiet):
+    decision_tree = DecisionTree(dataset)
+    with quiet():
+        decision_tree.fit()
+        social_benefit = dataset.social_benefit_list[0]
+        social_benefit.requirement.remove_requirement(social_benefit.requirement.requirements[0])
+        decision_tree.update_social_benefit(social_benefit)
+    assert decision_tree._leaf_depths is None
+
+    leaf_depths = []
+    nodes = [(decision_tree.root, 1)]
+    while nodes:
+        node, depth = nodes.pop()
+        if node.attribute is None:
+            leaf_depths.append(depth)
+        nodes.extend((child, depth + 1) for child in reversed(node.children))
+    assert decision_tree.leaf_depths == leaf_depths
+    assert decision_tree.current_max_depth == max(leaf_depths)
@@ -0,0 +1,41 @@
+import numpy as np
+
+from src.attribute import Attribute_Categorical, Attribute_Numerical
+from src.decisionTree import DecisionTree
+from src.treeNode import TreeNode
+from tests.conftest import get_expected_masks
+
+
+def test_walk_finds_the_social_benefits_of_the_answers(dataset, applicants, quiet):
+    decision_tree = DecisionTree(dataset)
+    with quiet():
+        decision_tree.fit()
+    applicants = applicants.head(100)
+
+    assert [decision_tree.walk(lambda attribute: answers[attribute.title]) for answers in applicants.to_dict('records')] == get_expected_masks(dataset, applicants)
+
+
+def test_children_are_looked_up_like_they_are_scanned(dataset, quiet):
+    decision_tree = DecisionTree(dataset)
+    with quiet():
+        decision_tree.fit()
+
+    for node in decision_tree.root.iterate_subtree():
+        if node.attribute is None:
+            continue
+        if isinstance(node.attribute, Attribute_Numerical):
+            answers = [*node.thresholds, *(np.array(node.thresholds[:-1]) + np.diff(node.thresholds) / 2), node.thresholds[0] - 1, node.thresholds[-1] + 1] if node.thresholds else [0]
+            scan = lambda answer: next((child for child in node.children if node.get_piece(child.value) == node.get_piece(answer)), None)
+        else:
+            answers = [*node.attribute.answer_options, 'no option']
+            scan = lambda answer: next((child for child in node.children if child.value == answer), None)
+        assert all(node.get_child(answer) is scan(answer) for answer in answers)
+
+
+def test_assigned_children_are_looked_up():
+    attribute = Attribute_Categorical('c', 'Which one?', ['a', 'b'])
+    node = TreeNode(attribute=attribute, children=[TreeNode(social_benefits=1, value='a')])
+    assert node.get_child('b') is None
+
+    node.children = [TreeNode(social_benefits=2, value='b')]
+    assert node.get_child('b').social_benefits == 2 and node.get_child('a') is None
@@ -0,0 +1,31 @@
+import numpy as np
+
+from src.decisionTree import DecisionTree
+from src.flatTree import NO_CHILD
+from tests.conftest import get_expected_masks
+
+
+def test_predictions_match_the_requirements(dataset, applicants, quiet):
+    decision_tree = DecisionTree(dataset)
+    with quiet():
+        decision_tree.fit()
+    expected = get_expected_masks(dataset, applicants)
+
+    assert [decision_tree.predict(answers) for answers in applicants.to_dict('records')] == expected
+    assert list(decision_tree.predict_batch(applicants)) == expected
+
+
+def test_predictions_fall_back_to_the_requirements(dataset, applicants, quiet):
+    decision_tree = DecisionTree(dataset)
+    with quiet():
+        decision_tree.fit()
+    leaves = decision_tree._get_flat_tree().get_leaves(applicants)
+    assert (leaves == NO_CHILD).any()
+    assert list(decision_tree.predict_batch(applicants)[leaves == NO_CHILD]) == list(np.array(get_expected_masks(dataset, applicants), dtype=object)[leaves == NO_CHILD])
+
+
+def test_missing_answers_predict_nothing(dataset, applicants, quiet):
+    decision_tree = DecisionTree(dataset)
+    with quiet():
+        decision_tree.fit()
+    assert decision_tree.predict({}) is None
@@ -0,0 +1,41 @@
+import pytest
+
+from src.decisionTree import DecisionTree
+from tests.conftest import expand
+
+
+@pytest.mark.parametrize('max_depth', [None, 4])
+def test_saved_tree_loads_the_same(dataset, applicants, quiet, max_depth):
+    decision_tree = DecisionTree(dataset, max_depth=max_depth)
+    with quiet():
+        decision_tree.fit()
+        decision_tree.save('model.json')
+    loaded_tree = DecisionTree(dataset, max_depth=max_depth)
+    with quiet():
+        assert loaded_tree.load('model.json')
+
+    assert expand(loaded_tree.root) == expand(decision_tree.root)
+    assert loaded_tree.leaf_depths == decision_tree.leaf_depths
+    assert list(loaded_tree.predict_batch(applicants)) == list(decision_tree.predict_batch(applicants))
+
+
+def test_model_of_other_data_is_not_loaded(dataset, quiet):
+    decision_tree = DecisionTree(dataset)
+    with quiet():
+        decision_tree.fit()
+        decision_tree.save('model.json')
+        dataset.remove_social_benefit(dataset.social_benefit_list[0])
+        assert not DecisionTree(dataset).load('model.json')
+
+
+def test_streamed_tree_loads_like_a_saved_one(dataset, quiet):
+    decision_tree = DecisionTree(dataset)
+    streamed_tree = DecisionTree(dataset)
+    with quiet():
+        decision_tree.fit()
+        decision_tree.save('model.json')
+        streamed_tree.fit_to_file('streamed_model.json')
+        assert streamed_tree.load('streamed_model.json')
+    assert expand(streamed_tree.root) == expand(decision_tree.root)
+    with open('model.json', encoding='utf-8') as model_file, open('streamed_model.json', encoding='utf-8') as streamed_model_file:
+        assert model_file.read() == streamed_model_file.read()
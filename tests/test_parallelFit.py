@@ -0,0 +1,35 @@
+import pickle
+
+import pytest
+
+from src.decisionTree import DecisionTree
+from tests.conftest import count_children_lists, expand
+
+
+@pytest.mark.parametrize('max_depth', [None, 4])
+def test_parallel_fit_builds_and_shares_the_same_tree(dataset, applicants, quiet, max_depth):
+    decision_tree = DecisionTree(dataset, max_depth=max_depth)
+    parallel_tree = DecisionTree(dataset, max_depth=max_depth)
+    with quiet():
+        decision_tree.fit()
+        parallel_tree.fit(workers=2)
+
+    assert expand(parallel_tree.root) == expand(decision_tree.root)
+    assert parallel_tree.leaf_depths == decision_tree.leaf_depths
+    assert count_children_lists(parallel_tree.root) == count_children_lists(decision_tree.root)
+    assert all(node.attribute is dataset.get_attribute_from_title(node.attribute.title) for node in parallel_tree.root.iterate_subtree() if node.attribute is not None)
+    assert list(parallel_tree.predict_batch(applicants)) == list(decision_tree.predict_batch(applicants))
+
+
+def test_workers_receive_the_dataset_without_cached_constellations(dataset):
+    DecisionTree(dataset).get_constellations()
+    pickled_dataset = pickle.loads(pickle.dumps(dataset))
+
+    for social_benefit in pickled_dataset.social_benefit_list:
+        assert social_benefit._constellation is None
+        requirements = [social_benefit.requirement]
+        while requirements:
+            requirement = requirements.pop()
+            assert requirement._constellation is None
+            requirements.extend(getattr(requirement, 'requirements', []))
+    assert len(pickled_dataset.get_dataframes()) == len(dataset.get_dataframes())
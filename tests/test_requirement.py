@@ -0,0 +1,84 @@
+import numpy as np
+
+from src.requirement import Logical_AND, Logical_OR, Requirement_Categorical, Requirement_Numerical
+from src.socialBenefit import SocialBenefit
+
+
+def build_social_benefit(dataset):
+    '''
+    Adds a social benefit requiring c0 to be its first answer option and n0 <= 10 or n1 >= 90, with the parents set like when loading the data.
+    '''
+    categorical_attribute = dataset.get_attribute_from_title('c0')
+    requirements = [Requirement_Numerical(dataset.get_attribute_from_title('n0'), '<=', [10]), Requirement_Numerical(dataset.get_attribute_from_title('n1'), '>=', [90])]
+    logical_or = Logical_OR(requirements)
+    logical_and = Logical_AND([Requirement_Categorical(categorical_attribute, [categorical_attribute.answer_options[0]]), logical_or])
+    for parent in (logical_or, logical_and):
+        for requirement in parent.requirements:
+            requirement.set_parent(parent)
+    social_benefit = SocialBenefit('benefit', logical_and)
+    dataset.add_social_benefit(social_benefit)
+    return social_benefit
+
+
+def test_editing_a_requirement_invalidates_the_cached_constellations_up_to_the_social_benefit(dataset):
+    social_benefit = build_social_benefit(dataset)
+    categorical_requirement, logical_or = social_benefit.requirement.requirements
+    edited_requirement = logical_or.requirements[0]
+    constellation = social_benefit.get_constellation()
+    categorical_constellation = categorical_requirement.get_constellation()
+    other_constellation = logical_or.requirements[1].get_constellation()
+    assert social_benefit.get_constellation() is constellation
+
+    edited_requirement.required_value = [20]
+    edited_requirement.invalidate()
+
+    assert social_benefit.get_constellation() is not constellation
+    assert 20 in social_benefit.get_dataframe()['n0_upper'].tolist()
+    assert categorical_requirement.get_constellation() is categorical_constellation
+    assert logical_or.requirements[1].get_constellation() is other_constellation
+
+
+def test_adding_a_requirement_invalidates_the_cached_checks_up_to_the_social_benefit(dataset):
+    social_benefit = build_social_benefit(dataset)
+    logical_or = social_benefit.requirement.requirements[1]
+    answers = {'c0': dataset.get_attribute_from_title('c0').answer_options[0], 'n0': 50, 'n1': 50, 'n2': 50}
+    encoded_answers = {title: np.array([0 if title == 'c0' else 50.0]) for title in answers}
+    assert not social_benefit.is_eligible(answers)
+    assert not social_benefit.get_predicate()(encoded_answers, 1)[0]
+
+    logical_or.add_requirement(Requirement_Numerical(dataset.get_attribute_from_title('n2'), '==', [50]))
+
+    assert social_benefit.is_eligible(answers)
+    assert social_benefit.get_predicate()(encoded_answers, 1)[0]
+
+
+def test_normalized_and_intersects_requirements_on_the_same_attribute(dataset):
+    numerical_attribute, categorical_attribute = dataset.get_attribute_from_title('n0'), dataset.get_attribute_from_title('c0')
+    options = categorical_attribute.answer_options
+    requirement = Logical_AND([Logical_AND([Requirement_Numerical(numerical_attribute, '>=', [20]), Requirement_Categorical(categorical_attribute, options)]),
+                               Requirement_Numerical(numerical_attribute, '<=', [50]), Requirement_Categorical(categorical_attribute, options[:1])])
+
+    assert requirement.normalize().export() == Logical_AND([Requirement_Numerical(numerical_attribute, '[]', [20, 50]), Requirement_Categorical(categorical_attribute, options[:1])]).export()
+    assert Logical_AND([Requirement_Numerical(numerical_attribute, '<=', [10]), Requirement_Numerical(numerical_attribute, '>=', [20])]).normalize().export() == Logical_OR([]).export()
+
+
+def test_normalized_or_unites_overlapping_requirements(dataset):
+    attribute = dataset.get_attribute_from_title('n0')
+    requirement = Logical_OR([Requirement_Numerical(attribute, '[]', [0, 10]), Requirement_Numerical(attribute, '[]', [20, 30]), Logical_OR([Requirement_Numerical(attribute, '[]', [5, 25])]),
+                              Requirement_Numerical(attribute, '==', [60]), Requirement_Numerical(attribute, '==', [60])])
+
+    assert requirement.normalize().export() == Logical_OR([Requirement_Numerical(attribute, '[]', [0, 30]), Requirement_Numerical(attribute, '==', [60])]).export()
+    assert Logical_OR([Requirement_Numerical(attribute, '==', [60]), Logical_AND([])]).normalize().export() == Logical_AND([]).export()
+
+
+def test_normal_requirements_are_kept(dataset):
+    social_benefit = build_social_benefit(dataset)
+    assert social_benefit.requirement.normalize() is social_benefit.requirement
+
+
+def test_normalized_requirements_have_the_same_eligibility_and_fewer_constellations(dataset, applicants):
+    answers = {attribute.title: attribute.encode_answers(applicants[attribute.title]) for attribute in dataset.attribute_list}
+    for social_benefit in dataset.social_benefit_list:
+        normalized_requirement = social_benefit.requirement.normalize()
+        assert (normalized_requirement.get_predicate()(answers, len(applicants)) == social_benefit.requirement.get_predicate()(answers, len(applicants))).all()
+        assert len(normalized_requirement.get_constellation()) <= len(social_benefit.requirement.get_constellation())
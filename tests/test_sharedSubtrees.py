@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from src.decisionTree import DecisionTree
+from tests.conftest import count_children_lists
+
+
+@pytest.mark.parametrize('max_depth', [None, 4])
+def test_subtrees_are_shared_by_the_state_of_their_constellations(dataset, quiet, max_depth):
+    decision_tree = DecisionTree(dataset, max_depth=max_depth)
+    with quiet():
+        decision_tree.fit()
+
+    # every list of children stands for exactly one state of the constellations, and every state for exactly one list of children
+    states, children_lists = {}, {}
+    visits = 0
+    paths = [(decision_tree.root, decision_tree.get_constellations(), 1)]
+    while paths:
+        node, dataframe, depth = paths.pop()
+        visits += 1
+        key = decision_tree._get_state_key(dataframe, depth)
+        assert children_lists.setdefault(key, id(node.children)) == id(node.children)
+        if id(node.children) in states:
+            assert states[id(node.children)] == key
+            continue
+        states[id(node.children)] = key
+        paths.extend((child, decision_tree._reduce_dataframe(dataframe, node.attribute, child.value), depth + 1) for child in node.children)
+
+    assert visits > len(states) == count_children_lists(decision_tree.root)
+
+
+def test_saved_tree_keeps_the_shared_subtrees(dataset, quiet):
+    decision_tree = DecisionTree(dataset)
+    with quiet():
+        decision_tree.fit()
+        decision_tree.save('model.json')
+    loaded_tree = DecisionTree(dataset)
+    with quiet():
+        assert loaded_tree.load('model.json')
+    with open('model.json', encoding='utf-8') as model_file:
+        node_count = len(json.load(model_file)['nodes'])
+
+    assert count_children_lists(loaded_tree.root) == count_children_lists(decision_tree.root) == node_count
@@ -0,0 +1,34 @@
+import numpy as np
+
+from src.attribute import Attribute_Numerical
+from src.decisionTree import DecisionTree
+
+
+def test_numerical_split_values_stand_for_every_answer_in_the_range(dataset):
+    decision_tree = DecisionTree(dataset)
+    constellations = decision_tree.get_constellations()
+
+    for attribute in dataset.attribute_list:
+        if not isinstance(attribute, Attribute_Numerical):
+            continue
+        interval_index = decision_tree._get_interval_index(constellations, attribute)
+        piece_values = decision_tree._get_piece_values(constellations, attribute)
+        answers = piece_values[(piece_values >= attribute.min) & (piece_values <= attribute.max)]
+
+        def get_rows(answer):
+            return tuple(tuple(rows.tolist()) for rows in interval_index.get_rows(answer).values())
+
+        values = decision_tree._get_split_values(constellations, attribute)
+        assert values == sorted(values)
+        # every answer in the range matches the same constellations as one of the split values
+        assert {get_rows(answer) for answer in answers} == {get_rows(value) for value in values}
+
+
+def test_split_values_cover_the_answers_below_a_lower_bound():
+    attribute = Attribute_Numerical('n', 'How much?', 0, 100)
+    bounds = np.array([0.0, 20.0, 100.0])
+    piece_values = np.full(2 * len(bounds) + 1, np.nan)
+    piece_values[1::2] = bounds
+    piece_values[2:-1:2] = (bounds[:-1] + bounds[1:]) / 2
+
+    assert DecisionTree._get_interval_values(None, np.array([0, 1]), np.array([2]), piece_values, attribute) == [10.0, 60.0]